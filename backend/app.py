@@ -1,13 +1,34 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import ORJSONResponse
 
 from .config import settings
-from .routers import auth, orgs, projects, tasks, comments, realtime, tags
+from .db import engine, async_engine, pool_stats
+from .realtime import manager
+from .events import dispatcher
+from .auth import shutdown_hasher
+from .queries import NEXT_CURSOR_HEADER
+from .profiler import ProfilerMiddleware, SERVER_TIMING_HEADER, instrument, route_stats
+from .routers import auth, orgs, projects, tasks, comments, realtime, tags, search, sync
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Connect the realtime broker (e.g. Redis pub/sub) for this worker
+    await manager.start()
+    # Deliver committed events off the request path
+    dispatcher.start()
+    try:
+        yield
+    finally:
+        await dispatcher.stop()
+        await manager.stop()
+        shutdown_hasher()
 
 
 def create_app() -> FastAPI:
-    app = FastAPI(title="Chronic API", default_response_class=ORJSONResponse)
+    app = FastAPI(title="Chronic API", default_response_class=ORJSONResponse, lifespan=lifespan)
 
     # CORS for local dev (Next.js on 3000)
     app.add_middleware(
@@ -16,7 +37,12 @@ def create_app() -> FastAPI:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=[NEXT_CURSOR_HEADER, SERVER_TIMING_HEADER],
     )
+    if settings.profiling_enabled:
+        # Outermost, so the timings include CORS and every router
+        instrument(engine, async_engine.sync_engine)
+        app.add_middleware(ProfilerMiddleware)
 
     # Routers
     app.include_router(auth.router, prefix="/api")
@@ -25,11 +51,25 @@ def create_app() -> FastAPI:
     app.include_router(tasks.router, prefix="/api")
     app.include_router(comments.router, prefix="/api")
     app.include_router(tags.router, prefix="/api")
+    app.include_router(search.router, prefix="/api")
+    app.include_router(sync.router, prefix="/api")
     app.include_router(realtime.router)
 
     @app.get("/healthz")
-    async def healthz():
-        return {"ok": True}
+    async def healthz(verbose: bool = False):
+        if not verbose:
+            return {"ok": True}
+        out = {
+            "ok": True,
+            "pools": {
+                "sync": pool_stats(engine),
+                "async": pool_stats(async_engine.sync_engine),
+            },
+            "realtime": manager.stats(),
+        }
+        if settings.profiling_enabled:
+            out["routes"] = route_stats()
+        return out
 
     return app
 
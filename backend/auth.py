@@ -1,13 +1,27 @@
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Optional
+from typing import Optional, Tuple
 from jose import jwt, JWTError
 from passlib.context import CryptContext
 from fastapi import HTTPException, status
 
 from .config import settings
+from .cache import TTLCache
 
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Hashes made at another cost verify fine and are flagged for a rehash
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.password_hash_rounds)
+
+# Stored for accounts nobody has set a password on yet (invited users): never
+# matches anything. Signup rejects existing emails, so there is no way to claim
+# one yet; that needs an invite token or email verification flow.
+UNUSABLE_PASSWORD = "!"
+
+# Verified token payloads, kept no longer than the token's own expiry
+_token_cache = TTLCache(maxsize=settings.auth_cache_size, ttl=settings.auth_cache_ttl_seconds)
 
 
 def hash_password(password: str) -> str:
@@ -15,9 +29,49 @@ def hash_password(password: str) -> str:
 
 
 def verify_password(password: str, password_hash: str) -> bool:
+    if password_hash == UNUSABLE_PASSWORD:
+        return False
     return pwd_context.verify(password, password_hash)
 
 
+def verify_and_update(password: str, password_hash: str) -> Tuple[bool, Optional[str]]:
+    """(matches, new hash when the stored one was made at a different cost)."""
+    if password_hash == UNUSABLE_PASSWORD:
+        return False, None
+    return pwd_context.verify_and_update(password, password_hash)
+
+
+# bcrypt is CPU-bound by design: run it in worker processes so a burst of logins
+# queues there instead of occupying the event loop or the request threadpool.
+# PASSWORD_HASH_WORKERS=0 runs it on the default thread executor instead.
+_hasher: Optional[Executor] = None
+
+
+def _executor() -> Optional[Executor]:
+    global _hasher
+    if _hasher is None and settings.password_hash_workers > 0:
+        # spawn: don't fork a process that is running an event loop and threads
+        _hasher = ProcessPoolExecutor(settings.password_hash_workers, mp_context=multiprocessing.get_context("spawn"))
+    return _hasher
+
+
+def shutdown_hasher() -> None:
+    global _hasher
+    if _hasher is not None:
+        _hasher.shutdown(wait=False, cancel_futures=True)
+        _hasher = None
+
+
+async def hash_password_async(password: str) -> str:
+    return await asyncio.get_running_loop().run_in_executor(_executor(), hash_password, password)
+
+
+async def verify_and_update_async(password: str, password_hash: str) -> Tuple[bool, Optional[str]]:
+    if password_hash == UNUSABLE_PASSWORD:
+        return False, None
+    return await asyncio.get_running_loop().run_in_executor(_executor(), verify_and_update, password, password_hash)
+
+
 def create_token(sub: str, scope: str = "access", expires_in_minutes: int | None = None) -> str:
     now = datetime.now(timezone.utc)
     exp = now + timedelta(minutes=expires_in_minutes or settings.access_token_exp_minutes)
@@ -26,11 +80,16 @@ def create_token(sub: str, scope: str = "access", expires_in_minutes: int | None
 
 
 def decode_token(token: str, scope: Optional[str] = None) -> dict:
-    try:
-        payload = jwt.decode(token, settings.jwt_secret, algorithms=[settings.jwt_algorithm])
-        if scope and payload.get("scope") != scope:
-            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token scope")
-        return payload
-    except JWTError:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
+    payload = _token_cache.get(token)
+    if payload is None:
+        try:
+            payload = jwt.decode(token, settings.jwt_secret, algorithms=[settings.jwt_algorithm])
+        except JWTError:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
+        exp = payload.get("exp")
+        if exp is not None:
+            _token_cache.set(token, payload, ttl=exp - time.time())
+    if scope and payload.get("scope") != scope:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token scope")
+    return payload
 
@@ -0,0 +1,138 @@
+import argparse
+import asyncio
+import sys
+from typing import List, Optional
+
+import orjson
+
+from .encode import SUBSCRIBERS
+from .report import compare, dumps, environment
+from .seed import SeedError, Shape
+
+
+def _progress(rows: dict, seconds: float) -> None:
+    total = sum(rows.values())
+    print(f"seeded {total:,} rows in {seconds:.1f}s ({total / seconds:,.0f} rows/s)", file=sys.stderr)
+
+
+def _seed(args) -> Optional[dict]:
+    from ..db import SessionLocal, engine
+    from .seed import ensure_schema, load_fixture, seed
+
+    ensure_schema(engine)
+    with SessionLocal() as db:
+        if load_fixture(db) is not None:
+            print("database already seeded; reusing it", file=sys.stderr)
+            return None
+    shape = Shape(
+        orgs=args.orgs, users_per_org=args.users, tasks=args.tasks,
+        tags_per_workspace=args.tags_per_workspace, comments_per_task=args.comments_per_task, seed=args.seed,
+    )
+    return seed(engine, shape, _progress)
+
+
+async def _run(args) -> dict:
+    from ..app import app
+    from ..config import settings
+    from ..db import SessionLocal
+    from .fanout import run_fanout
+    from .scenarios import login, run_scenario, scenarios
+    from .seed import load_fixture
+
+    report = {"meta": environment(settings.database_url, vars(args)), "seed": _seed(args), "scenarios": {}}
+    with SessionLocal() as db:
+        fixture = load_fixture(db)
+    available = scenarios(fixture)
+    unknown = set(args.only or ()) - available.keys() - {"fanout"}
+    if unknown:
+        raise SystemExit(f"unknown scenario(s): {', '.join(sorted(unknown))}")
+    selected = [n for n in available if not args.only or n in args.only]
+
+    async with app.router.lifespan_context(app):
+        clients = await login(app, fixture.emails, args.concurrency)
+        try:
+            for name in selected:
+                print(f"running {name}", file=sys.stderr)
+                report["scenarios"][name] = await run_scenario(clients, available[name], args.requests, args.warmup, args.seed)
+            if args.ws_clients and (not args.only or "fanout" in args.only):
+                print(f"running fanout ({args.ws_clients} sockets)", file=sys.stderr)
+                report["fanout"] = await run_fanout(app, clients[0], fixture, args.ws_clients, args.ws_events, args.seed)
+        finally:
+            for c in clients:
+                await c.aclose()
+    return report
+
+
+def _write(report: dict, out: Optional[str]) -> None:
+    if out:
+        with open(out, "wb") as fp:
+            fp.write(dumps(report))
+    else:
+        sys.stdout.write(dumps(report).decode())
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m backend.bench", description="Seed a scratch database and benchmark the API against it.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    def shape_args(p):
+        p.add_argument("--tasks", type=int, default=Shape.tasks)
+        p.add_argument("--orgs", type=int, default=Shape.orgs)
+        p.add_argument("--users", type=int, default=Shape.users_per_org, help="users per org")
+        p.add_argument("--tags-per-workspace", type=int, default=Shape.tags_per_workspace, help="fewer tags means more tasks per tag in tag_search")
+        p.add_argument("--comments-per-task", type=float, default=Shape.comments_per_task)
+        p.add_argument("--seed", type=int, default=Shape.seed, help="RNG seed for the data and the request mix")
+
+    p = sub.add_parser("seed", help="create the schema and seed the database (DATABASE_URL)")
+    shape_args(p)
+
+    p = sub.add_parser("run", help="seed if needed, then run the scenarios and print a JSON report")
+    shape_args(p)
+    p.add_argument("--requests", type=int, default=2000, help="timed requests per scenario")
+    p.add_argument("--warmup", type=int, default=100, help="untimed requests before each scenario")
+    p.add_argument("--concurrency", type=int, default=16)
+    p.add_argument("--ws-clients", type=int, default=200, help="sockets in the fan-out run (0 skips it)")
+    p.add_argument("--ws-events", type=int, default=50, help="broadcast events in the fan-out run")
+    p.add_argument("--only", nargs="+", metavar="SCENARIO", help="run just these (scenario names or 'fanout')")
+    p.add_argument("--out", help="write the report here instead of stdout")
+
+    p = sub.add_parser("encode", help="time broadcast encoding against 1, 100 and 1000 in-process subscribers")
+    p.add_argument("--events", type=int, default=2000, help="broadcasts per subscriber count")
+    p.add_argument("--subscribers", type=int, nargs="+", default=list(SUBSCRIBERS))
+    p.add_argument("--out", help="write the report here instead of stdout")
+
+    p = sub.add_parser("compare", help="show the deltas between two reports")
+    p.add_argument("base")
+    p.add_argument("head")
+
+    args = parser.parse_args(argv)
+    if args.command == "compare":
+        with open(args.base, "rb") as a, open(args.head, "rb") as b:
+            print(compare(orjson.loads(a.read()), orjson.loads(b.read())))
+        return 0
+    if args.command == "encode":
+        from ..config import settings
+        from .encode import run_encode
+
+        report = {"meta": environment(settings.database_url, vars(args)), "encode": asyncio.run(run_encode(args.events, args.subscribers))}
+        _write(report, args.out)
+        return 0
+    if args.command == "seed":
+        try:
+            result = _seed(args)
+        except SeedError as e:
+            parser.error(str(e))
+        if result:
+            print(dumps(result).decode(), end="")
+        return 0
+
+    try:
+        report = asyncio.run(_run(args))
+    except SeedError as e:
+        parser.error(str(e))
+    _write(report, args.out)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
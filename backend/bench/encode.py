@@ -0,0 +1,86 @@
+import asyncio
+import time
+from typing import Iterable, List
+
+from ..realtime import InMemoryBroker, WSManager
+from .report import summarize
+
+
+# Micro-benchmark of broadcast serialization: one channel with N fake
+# sockets, a task.updated-sized event broadcast `events` times. Encodes are
+# read from the manager's encoded_messages counter and must stay at one per
+# event however many sockets watch the channel; the timings cover broadcast
+# until every socket's writer has sent the text, without any network cost.
+
+SUBSCRIBERS = (1, 100, 1000)
+
+
+class _Socket:
+    """Stands in for a WebSocket: send_text only counts."""
+
+    def __init__(self, done: asyncio.Event, expected: int) -> None:
+        self.done = done
+        self.expected = expected
+        self.received = 0
+
+    async def send_text(self, text: str) -> None:
+        self.received += 1
+        if self.received == self.expected:
+            self.done.set()
+
+
+def _event(i: int) -> dict:
+    return {
+        "type": "task.updated",
+        "task": {
+            "id": f"00000000-0000-0000-0000-{i:012d}",
+            "project_id": "00000000-0000-0000-0000-000000000001",
+            "name": f"Benchmark task {i}",
+            "description": "x" * 200,
+            "priority": i % 4,
+            "status_id": "00000000-0000-0000-0000-000000000002",
+            "parent_id": None,
+            "position": float(i),
+            "updated_at": "2024-01-01T00:00:00Z",
+        },
+    }
+
+
+async def _sweep_one(subscribers: int, events: int) -> dict:
+    manager = WSManager(InMemoryBroker())
+    manager.queue_size = events + 1
+    channel = "project:bench"
+    sockets: List[_Socket] = []
+    waits = []
+    for _ in range(subscribers):
+        done = asyncio.Event()
+        ws = _Socket(done, events)
+        sockets.append(ws)
+        waits.append(done.wait())
+        await manager.subscribe(channel, ws)
+
+    samples: List[float] = []
+    before = manager.stats()["encoded_messages"]
+    t_start = time.perf_counter()
+    for i in range(events):
+        t0 = time.perf_counter()
+        await manager.broadcast(channel, _event(i))
+        samples.append((time.perf_counter() - t0) * 1000)
+    await asyncio.gather(*waits)
+    seconds = time.perf_counter() - t_start
+    calls = manager.stats()["encoded_messages"] - before
+    for ws in sockets:
+        await manager.disconnect(ws)
+    return {
+        "subscribers": subscribers,
+        "encode_calls": calls,
+        "encode_calls_per_event": round(calls / events, 3) if events else 0.0,
+        "messages": sum(ws.received for ws in sockets),
+        # Per event: broadcast() call, i.e. encode plus enqueue to every socket
+        "broadcast": summarize(samples, seconds),
+        "messages_per_s": round(subscribers * events / seconds, 1) if seconds else 0.0,
+    }
+
+
+async def run_encode(events: int, subscribers: Iterable[int] = SUBSCRIBERS) -> dict:
+    return {str(n): await _sweep_one(n, events) for n in subscribers}
@@ -0,0 +1,97 @@
+import asyncio
+import random
+import socket
+import time
+from typing import List
+
+import httpx
+import orjson
+import uvicorn
+import websockets
+
+from ..realtime import manager
+from .report import summarize
+from .seed import Fixture
+
+
+# Broadcast fan-out over real WebSockets: the app is served by an in-process
+# uvicorn on a loopback port, `clients` sockets subscribe to the busiest
+# project, and each PATCH to one of its tasks is timed from the request until
+# every socket has received the task.updated event. The sockets are read on
+# the same event loop as the server, so the figures include client overhead.
+
+async def _serve(app) -> tuple:
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind(("127.0.0.1", 0))
+    # The caller already runs the app's lifespan; this server only adds a socket
+    server = uvicorn.Server(uvicorn.Config(app, lifespan="off", log_level="warning", ws_max_queue=1024))
+    task = asyncio.create_task(server.serve(sockets=[sock]))
+    while not server.started:
+        if task.done():
+            task.result()
+        await asyncio.sleep(0.01)
+    return server, task, sock.getsockname()[1]
+
+
+async def run_fanout(app, client: httpx.AsyncClient, fixture: Fixture, clients: int, events: int, seed: int, timeout: float = 30.0) -> dict:
+    project_id = fixture.hot_project_id
+    channel = f"project:{project_id}"
+    rng = random.Random(seed)
+    server, serve_task, port = await _serve(app)
+    sockets: List = []
+    try:
+        for _ in range(clients):
+            ws = await websockets.connect(f"ws://127.0.0.1:{port}/ws", max_queue=None)
+            await ws.send(orjson.dumps({"subscribe": channel}).decode())
+            sockets.append(ws)
+        for ws in sockets:
+            while orjson.loads(await ws.recv()).get("type") != "subscribed":
+                pass
+
+        async def receive(ws, task_id: str, t0: float) -> float:
+            while True:
+                msg = orjson.loads(await ws.recv())
+                if msg.get("type") == "task.updated" and msg["task"]["id"] == task_id:
+                    return (time.perf_counter() - t0) * 1000
+
+        delivery: List[float] = []
+        complete: List[float] = []
+        errors = 0
+        t_start = time.perf_counter()
+        for _ in range(events):
+            task_id = rng.choice(fixture.task_ids[project_id])
+            t0 = time.perf_counter()
+            waits = [asyncio.create_task(receive(ws, task_id, t0)) for ws in sockets]
+            r = await client.patch(f"/api/tasks/{task_id}", json={"priority": rng.randint(0, 3)})
+            if r.status_code >= 400:
+                errors += 1
+                for w in waits:
+                    w.cancel()
+                continue
+            done, pending = await asyncio.wait(waits, timeout=timeout)
+            for w in pending:
+                w.cancel()
+            errors += len(pending)
+            times = [w.result() for w in done]
+            delivery.extend(times)
+            if times:
+                complete.append(max(times))
+        seconds = time.perf_counter() - t_start
+        stats = manager.stats()
+        return {
+            "clients": clients,
+            "events": events,
+            # Per socket: PATCH sent -> event received
+            "delivery": summarize(delivery, seconds, errors),
+            # Per event: PATCH sent -> last socket received
+            "complete": summarize(complete, seconds),
+            "messages_per_s": round(len(delivery) / seconds, 1) if seconds else 0.0,
+            "dropped": stats["dropped"],
+            "disconnects_on_overflow": stats["disconnects_on_overflow"],
+            "max_lag_ms": stats["max_lag_ms"],
+        }
+    finally:
+        await asyncio.gather(*(ws.close() for ws in sockets), return_exceptions=True)
+        server.should_exit = True
+        await serve_task
@@ -0,0 +1,87 @@
+import math
+import platform
+import subprocess
+import sys
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence
+
+import orjson
+
+
+# Reports are JSON with sorted keys and fixed precision, so two runs diff
+# cleanly; compare() prints the latency and throughput deltas side by side.
+
+COMPARED = ("throughput_rps", "p50_ms", "p95_ms", "p99_ms")
+
+
+def percentile(ordered: Sequence[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted sequence."""
+    if not ordered:
+        return 0.0
+    return ordered[max(0, min(len(ordered) - 1, math.ceil(q * len(ordered)) - 1))]
+
+
+def summarize(samples_ms: List[float], seconds: float, errors: int = 0) -> dict:
+    ordered = sorted(samples_ms)
+    n = len(ordered)
+    return {
+        "requests": n,
+        "errors": errors,
+        "seconds": round(seconds, 3),
+        "throughput_rps": round(n / seconds, 1) if seconds else 0.0,
+        "mean_ms": round(sum(ordered) / n, 3) if n else 0.0,
+        "p50_ms": round(percentile(ordered, 0.50), 3),
+        "p95_ms": round(percentile(ordered, 0.95), 3),
+        "p99_ms": round(percentile(ordered, 0.99), 3),
+        "max_ms": round(ordered[-1], 3) if n else 0.0,
+    }
+
+
+def _git(*args: str) -> Optional[str]:
+    try:
+        return subprocess.run(["git", *args], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment(database_url: str, args: dict) -> dict:
+    return {
+        "commit": _git("rev-parse", "HEAD"),
+        "dirty": bool(_git("status", "--porcelain", "--untracked-files=no")),
+        "started_at": datetime.utcnow().replace(microsecond=0).isoformat() + "Z",
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "database": database_url.split(":", 1)[0],
+        "args": args,
+    }
+
+
+def dumps(report: dict) -> bytes:
+    return orjson.dumps(report, option=orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS | orjson.OPT_APPEND_NEWLINE)
+
+
+def _rows(report: dict) -> Dict[str, dict]:
+    rows = dict(report.get("scenarios", {}))
+    if report.get("fanout"):
+        rows["fanout"] = report["fanout"]["delivery"]
+    for n, sweep in report.get("encode", {}).items():
+        rows[f"encode_{n}"] = sweep["broadcast"]
+    return rows
+
+
+def compare(base: dict, head: dict) -> str:
+    """Table of head vs base for each scenario both reports ran."""
+    lines = [f"base {(base['meta'].get('commit') or '?')[:12]}  head {(head['meta'].get('commit') or '?')[:12]}"]
+    lines.append(f"{'scenario':<18}" + "".join(f"{m:>28}" for m in COMPARED))
+    old, new = _rows(base), _rows(head)
+    for name in sorted(old.keys() & new.keys()):
+        cells = []
+        for metric in COMPARED:
+            a, b = old[name].get(metric), new[name].get(metric)
+            if a is None or b is None:
+                cells.append(f"{'-':>28}")
+                continue
+            change = f"{(b - a) / a * 100:+.1f}%" if a else "n/a"
+            cells.append(f"{a:.1f} -> {b:.1f} ({change})".rjust(28))
+        lines.append(f"{name:<18}" + "".join(cells))
+    return "\n".join(lines)
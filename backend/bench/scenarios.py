@@ -0,0 +1,105 @@
+import asyncio
+import random
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+from .report import summarize
+from .seed import BENCH_PASSWORD, WORDS, Fixture, skewed
+
+
+# HTTP load against the app in-process: httpx's ASGI transport skips sockets,
+# so the numbers are the app's own cost (routing, auth, SQL, serialization).
+# Each scenario runs `concurrency` workers, each logged in as a different
+# bench user, until `requests` have been timed after a short warm-up.
+
+# (method, path, json body) for one request
+Request = Tuple[str, str, Optional[dict]]
+
+
+@dataclass
+class Scenario:
+    name: str
+    build: Callable[[random.Random], Request]
+
+
+def scenarios(f: Fixture) -> Dict[str, Scenario]:
+    projects = list(f.projects)
+    workspaces = f.workspace_ids
+
+    def project(rng):
+        return skewed(rng, projects, 1)[0]
+
+    def list_project(rng):
+        return "GET", f"/api/tasks/project/{project(rng)}?limit=50", None
+
+    def list_workspace(rng):
+        return "GET", f"/api/tasks/workspace/{rng.choice(workspaces)}?limit=50", None
+
+    def create(rng):
+        return "POST", f"/api/tasks/project/{project(rng)}", {"name": f"bench {rng.choice(WORDS)} {rng.randrange(10**6)}", "priority": rng.randint(0, 3)}
+
+    def patch(rng):
+        p = project(rng)
+        while not f.task_ids.get(p):
+            p = rng.choice(projects)
+        return "PATCH", f"/api/tasks/{rng.choice(f.task_ids[p])}", {"priority": rng.randint(0, 3)}
+
+    def tag_search(rng):
+        w = rng.choice(workspaces)
+        tags = skewed(rng, f.tag_ids[w], rng.randint(1, 2))
+        mode = rng.choice(("and", "or"))
+        return "GET", f"/api/tasks/search?workspace_id={w}&tag_ids={','.join(dict.fromkeys(tags))}&mode={mode}&limit=50", None
+
+    def text_search(rng):
+        return "GET", f"/api/search?workspace_id={rng.choice(workspaces)}&q={rng.choice(WORDS)}+{rng.choice(WORDS)}&limit=50", None
+
+    return {s.name: s for s in (
+        Scenario("list_project", list_project),
+        Scenario("list_workspace", list_workspace),
+        Scenario("create", create),
+        Scenario("patch", patch),
+        Scenario("tag_search", tag_search),
+        Scenario("text_search", text_search),
+    )}
+
+
+async def login(app, emails: List[str], n: int) -> List[httpx.AsyncClient]:
+    """`n` clients, each signed in as the next bench user (cycling if there are fewer)."""
+    clients = []
+    for i in range(n):
+        c = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=60)
+        r = await c.post("/api/auth/login", json={"email": emails[i % len(emails)], "password": BENCH_PASSWORD})
+        r.raise_for_status()
+        clients.append(c)
+    return clients
+
+
+async def run_scenario(clients: List[httpx.AsyncClient], scenario: Scenario, requests: int, warmup: int, seed: int) -> dict:
+    remaining = warmup + requests
+    samples: List[float] = []
+    errors = 0
+    started: List[float] = []
+
+    async def worker(client: httpx.AsyncClient, rng: random.Random) -> None:
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            timed = remaining < requests
+            if timed and not started:
+                started.append(time.perf_counter())
+            method, path, body = scenario.build(rng)
+            t0 = time.perf_counter()
+            try:
+                r = await client.request(method, path, json=body)
+                failed = r.status_code >= 400
+            except httpx.HTTPError:
+                failed = True
+            if timed:
+                samples.append((time.perf_counter() - t0) * 1000)
+                errors += failed
+
+    await asyncio.gather(*(worker(c, random.Random(seed * 1000 + i)) for i, c in enumerate(clients)))
+    return summarize(samples, time.perf_counter() - started[0] if started else 0.0, errors)
@@ -0,0 +1,276 @@
+import itertools
+import os
+import random
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+from sqlalchemy import func, insert, select
+
+from ..auth import pwd_context
+from ..models import (
+    Base, Organization, User, OrgMembership, Workspace, WorkspaceMembership, Project, ProjectMembership,
+    ProjectStatus, Task, TaskAssignee, Tag, TaskTag, ProjectTag, Comment, uuid4_str, plain_text,
+)
+from ..routers.projects import default_statuses
+
+
+# Synthetic data with the shapes the app sees in practice: a few orgs, each
+# with its people, workspaces and projects. Tasks land on projects with a
+# Zipf-like skew (one big board, a long tail of small ones), and tags, assignees
+# and comments are spread unevenly the same way. Rows are generated in Python
+# from a seeded RNG and written with Core executemany batches in one
+# transaction, so the same arguments always produce the same database.
+
+BENCH_DOMAIN = "bench.example.com"
+BENCH_PASSWORD = "bench-password"
+BATCH_SIZE = 5000
+
+WORDS = (
+    "api auth billing cache calendar checkout dashboard deploy design docs email export filter "
+    "import index invoice login metrics migration mobile onboarding payment permissions pipeline "
+    "release report search settings signup sync tags timeline upload webhook"
+).split()
+VERBS = "add fix refactor review test update remove document investigate migrate".split()
+COLORS = ("#EF4444", "#F59E0B", "#10B981", "#3B82F6", "#8B5CF6", "#EC4899", "#6B7280")
+
+
+class SeedError(RuntimeError):
+    """The target database can't be seeded (it already holds data)."""
+
+
+@dataclass
+class Shape:
+    orgs: int = 3
+    users_per_org: int = 40
+    workspaces_per_org: int = 3
+    projects_per_workspace: int = 8
+    tasks: int = 100_000
+    tags_per_workspace: int = 40
+    tags_per_task: float = 1.5
+    assignees_per_task: float = 1.0
+    comments_per_task: float = 1.0
+    subtask_ratio: float = 0.1
+    seed: int = 42
+
+
+@dataclass
+class Fixture:
+    """Ids the load scenarios draw from: the first bench org and its data."""
+
+    org_id: str
+    emails: List[str]
+    workspace_ids: List[str]
+    # project id -> workspace id, biggest project first
+    projects: Dict[str, str]
+    tag_ids: Dict[str, List[str]]
+    task_ids: Dict[str, List[str]] = field(default_factory=dict)
+
+    @property
+    def hot_project_id(self) -> str:
+        return next(iter(self.projects))
+
+
+def ensure_schema(engine) -> None:
+    if engine.dialect.name == "postgresql":
+        # Search needs the generated columns and indexes that only the migrations create
+        from alembic import command
+        from alembic.config import Config
+
+        here = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        cfg = Config(os.path.join(here, "alembic.ini"))
+        cfg.set_main_option("script_location", os.path.join(here, "migrations"))
+        command.upgrade(cfg, "head")
+    else:
+        Base.metadata.create_all(engine)
+
+
+@lru_cache(maxsize=None)
+def _zipf(n: int, s: float = 0.8) -> tuple:
+    return tuple(itertools.accumulate(1 / (i + 1) ** s for i in range(n)))
+
+
+def skewed(rng: random.Random, items: list, k: int) -> list:
+    """k draws from `items`, earlier ones much more likely (Zipf-like)."""
+    return rng.choices(items, cum_weights=_zipf(len(items)), k=k)
+
+
+def _count(rng: random.Random, mean: float) -> int:
+    # Geometric-ish: most rows get few, some get many
+    n = 0
+    while rng.random() < mean / (mean + 1):
+        n += 1
+    return n
+
+
+def _doc(text: str) -> dict:
+    return {"type": "doc", "content": [{"type": "paragraph", "content": [{"type": "text", "text": text}]}]}
+
+
+def _sentence(rng: random.Random, n: int) -> str:
+    return " ".join(rng.choices(WORDS, k=n))
+
+
+class _Writer:
+    """Buffers rows per table and flushes them in executemany batches."""
+
+    def __init__(self, conn) -> None:
+        self.conn = conn
+        self.buffers: Dict[str, list] = {}
+        self.rows: Dict[str, int] = {}
+
+    def add(self, model, row: dict) -> None:
+        buf = self.buffers.setdefault(str(model.__table__.name), [])
+        buf.append(row)
+        if len(buf) >= BATCH_SIZE:
+            self.flush(model)
+
+    def flush(self, upto=None) -> None:
+        """Write buffered rows for every table up to `upto` (all by default), parents first."""
+        for model in _ORDER:
+            name = str(model.__table__.name)
+            buf = self.buffers.get(name)
+            if buf:
+                self.conn.execute(insert(model.__table__), buf)
+                self.rows[name] = self.rows.get(name, 0) + len(buf)
+                buf.clear()
+            if model is upto:
+                break
+
+
+# Parents before children, so every flush satisfies the foreign keys
+_ORDER = (
+    Organization, User, OrgMembership, Workspace, WorkspaceMembership, Project, ProjectMembership,
+    ProjectStatus, Tag, ProjectTag, Task, TaskTag, TaskAssignee, Comment,
+)
+
+
+def seed(engine, shape: Shape, progress=None) -> dict:
+    """Fill an empty database with `shape`; returns {seconds, rows: {table: n}, rows_per_s}."""
+    with engine.connect() as conn:
+        if conn.execute(select(func.count()).select_from(User)).scalar():
+            raise SeedError("database already has users; point DATABASE_URL at a scratch database")
+
+    rng = random.Random(shape.seed)
+    t0 = time.perf_counter()
+    now = datetime.utcnow().replace(microsecond=0)
+    password_hash = pwd_context.hash(BENCH_PASSWORD)
+
+    with engine.begin() as conn:
+        w = _Writer(conn)
+        orgs = []  # (org_id, [user_id], [(project_id, workspace_id, statuses)], {workspace_id: [tag_id]})
+        for o in range(shape.orgs):
+            org_id = uuid4_str()
+            w.add(Organization, {"id": org_id, "name": f"Bench Org {o + 1}", "primary_domain": BENCH_DOMAIN, "created_at": now - timedelta(days=400)})
+            users = []
+            for u in range(shape.users_per_org):
+                user_id = uuid4_str()
+                users.append(user_id)
+                w.add(User, {
+                    "id": user_id, "email": f"org{o + 1}-user{u + 1}@{BENCH_DOMAIN}", "password_hash": password_hash,
+                    "first_name": "User", "last_name": str(u + 1), "display_name": f"User {u + 1}",
+                    "theme": "nord", "created_at": now - timedelta(days=400),
+                })
+                w.add(OrgMembership, {"id": uuid4_str(), "org_id": org_id, "user_id": user_id, "role": "owner" if u == 0 else "member", "created_at": now})
+            projects = []
+            tags: Dict[str, List[str]] = {}
+            for ws in range(shape.workspaces_per_org):
+                workspace_id = uuid4_str()
+                w.add(Workspace, {"id": workspace_id, "org_id": org_id, "name": f"Workspace {ws + 1}", "created_by": users[0], "created_at": now - timedelta(days=365)})
+                for i, user_id in enumerate(users):
+                    w.add(WorkspaceMembership, {"id": uuid4_str(), "workspace_id": workspace_id, "user_id": user_id, "role": "admin" if i == 0 else "member", "created_at": now})
+                tags[workspace_id] = []
+                for t in range(shape.tags_per_workspace):
+                    tag_id = uuid4_str()
+                    name = f"{WORDS[t % len(WORDS)]}-{t // len(WORDS) + 1}" if t >= len(WORDS) else WORDS[t]
+                    tags[workspace_id].append(tag_id)
+                    w.add(Tag, {"id": tag_id, "org_id": org_id, "workspace_id": workspace_id, "name": name, "name_norm": name, "color": rng.choice(COLORS), "created_at": now - timedelta(days=365)})
+                for p in range(shape.projects_per_workspace):
+                    project_id = uuid4_str()
+                    w.add(Project, {"id": project_id, "org_id": org_id, "workspace_id": workspace_id, "name": f"Project {ws + 1}.{p + 1}", "visibility": "private", "created_by": users[0], "created_at": now - timedelta(days=365)})
+                    for user_id in [users[0]] + [u for u in users[1:] if rng.random() < 0.3]:
+                        w.add(ProjectMembership, {"id": uuid4_str(), "project_id": project_id, "user_id": user_id, "role": "editor", "created_at": now})
+                    statuses = []
+                    for st in default_statuses(project_id):
+                        status_id = uuid4_str()
+                        statuses.append((status_id, st.is_done))
+                        w.add(ProjectStatus, {"id": status_id, "project_id": project_id, "key": st.key, "label": st.label, "position": st.position, "is_done": st.is_done})
+                    projects.append((project_id, workspace_id, statuses))
+            orgs.append((org_id, users, projects, tags))
+
+        # Spread tasks over orgs, then skew them over each org's projects
+        per_org = [shape.tasks // shape.orgs + (1 if o < shape.tasks % shape.orgs else 0) for o in range(shape.orgs)]
+        for (org_id, users, projects, tags), n in zip(orgs, per_org):
+            recent: Dict[str, List[str]] = {}
+            project_tags = set()
+            for project_id, workspace_id, statuses in skewed(rng, projects, n):
+                task_id = uuid4_str()
+                created_at = now - timedelta(seconds=rng.randrange(365 * 86400))
+                status_id, done = rng.choice(statuses)
+                description = _doc(_sentence(rng, rng.randint(8, 40))) if rng.random() < 0.3 else None
+                siblings = recent.setdefault(project_id, [])
+                parent_id = rng.choice(siblings) if siblings and rng.random() < shape.subtask_ratio else None
+                w.add(Task, {
+                    "id": task_id, "org_id": org_id, "workspace_id": workspace_id, "project_id": project_id,
+                    "parent_id": parent_id, "name": f"{rng.choice(VERBS)} {rng.choice(WORDS)} {rng.choice(WORDS)}",
+                    "description": description, "description_text": plain_text(description) or None,
+                    "status_id": status_id, "priority": rng.choice((0, 1, 2, 2, 2, 3)),
+                    "due_date": (created_at + timedelta(days=rng.randint(1, 90))).date() if rng.random() < 0.5 else None,
+                    "start_date": None, "end_date": None, "is_completed": done, "is_at_risk": False,
+                    "created_by": rng.choice(users), "created_at": created_at,
+                    "completed_at": created_at + timedelta(days=rng.randint(0, 30)) if done else None,
+                })
+                siblings.append(task_id)
+                if len(siblings) > 50:
+                    del siblings[0]
+                for tag_id in set(skewed(rng, tags[workspace_id], _count(rng, shape.tags_per_task))):
+                    w.add(TaskTag, {"task_id": task_id, "tag_id": tag_id})
+                    project_tags.add((project_id, tag_id))
+                for user_id in set(rng.sample(users, min(_count(rng, shape.assignees_per_task), len(users)))):
+                    w.add(TaskAssignee, {"task_id": task_id, "user_id": user_id})
+                for _ in range(_count(rng, shape.comments_per_task)):
+                    text = _sentence(rng, rng.randint(3, 25))
+                    w.add(Comment, {
+                        "id": uuid4_str(), "org_id": org_id, "task_id": task_id, "author_id": rng.choice(users),
+                        "body": _doc(text), "body_text": text, "created_at": created_at + timedelta(minutes=rng.randint(1, 10000)),
+                    })
+            for project_id, tag_id in sorted(project_tags):
+                w.add(ProjectTag, {"project_id": project_id, "tag_id": tag_id})
+            w.flush()
+            if progress:
+                progress(w.rows, time.perf_counter() - t0)
+
+    seconds = time.perf_counter() - t0
+    total = sum(w.rows.values())
+    return {"seconds": round(seconds, 3), "rows": dict(sorted(w.rows.items())), "rows_per_s": round(total / seconds)}
+
+
+def load_fixture(db, sample: int = 2000) -> Optional[Fixture]:
+    """The first bench org's ids, or None if the database was never seeded."""
+    org = db.execute(
+        select(Organization).where(Organization.primary_domain == BENCH_DOMAIN).order_by(Organization.name).limit(1)
+    ).scalar_one_or_none()
+    if org is None:
+        return None
+    emails = db.execute(
+        select(User.email).join(OrgMembership, OrgMembership.user_id == User.id).where(OrgMembership.org_id == org.id).order_by(User.email)
+    ).scalars().all()
+    workspace_ids = db.execute(select(Workspace.id).where(Workspace.org_id == org.id).order_by(Workspace.name)).scalars().all()
+    sizes = db.execute(
+        select(Project.id, Project.workspace_id, func.count(Task.id))
+        .outerjoin(Task, Task.project_id == Project.id)
+        .where(Project.org_id == org.id)
+        .group_by(Project.id, Project.workspace_id)
+        .order_by(func.count(Task.id).desc(), Project.id)
+    ).all()
+    tag_ids: Dict[str, List[str]] = {w: [] for w in workspace_ids}
+    for tag_id, workspace_id in db.execute(select(Tag.id, Tag.workspace_id).where(Tag.org_id == org.id).order_by(Tag.name)):
+        tag_ids[workspace_id].append(tag_id)
+    fixture = Fixture(org.id, list(emails), list(workspace_ids), {p: w for p, w, _ in sizes}, tag_ids)
+    for project_id in fixture.projects:
+        fixture.task_ids[project_id] = db.execute(
+            select(Task.id).where(Task.project_id == project_id).order_by(Task.created_at.desc()).limit(sample)
+        ).scalars().all()
+    return fixture
@@ -0,0 +1,157 @@
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import event, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from .models import ChangeCounter, ChangeLogEntry, Task, TaskTag, TaskAssignee, Project, Tag, Comment
+from .versions import bump_statement
+
+
+# Delta sync. Writers record(...) which entities they changed; at commit every
+# affected workspace takes the next number from its `sync:workspace:<id>`
+# counter and one row per change is logged under it. The counter row stays
+# locked until commit, so within a workspace seq order is commit order and a
+# client holding seq N has seen exactly the commits numbered <= N. Live events
+# are stamped with the same seq, so a reconnecting client resumes from the last
+# one it received instead of refetching its lists.
+
+DEFAULT_LIMIT = 1000
+
+_CHANGES = "pending_changes"
+# events.emit()'s queue, stamped here with the seq of the commit that produced it
+_EVENTS = "pending_events"
+
+# entity -> (model, response key)
+ENTITIES = {
+    "task": (Task, "tasks"),
+    "project": (Project, "projects"),
+    "tag": (Tag, "tags"),
+    "comment": (Comment, "comments"),
+}
+
+
+def seq_key(workspace_id: str) -> str:
+    return f"sync:workspace:{workspace_id}"
+
+
+def record(db, entity: str, ids: Iterable[str], workspace_id: str, project_id: Optional[str] = None, deleted: bool = False) -> None:
+    """Log that `ids` were written (or deleted) when `db` commits (Session or AsyncSession)."""
+    pending = db.info.setdefault(_CHANGES, {})
+    for entity_id in ids:
+        pending[(workspace_id, entity, entity_id, project_id)] = deleted
+
+
+def record_task_move(db, task_id: str, old_workspace_id: str, old_project_id: Optional[str], workspace_id: str, project_id: Optional[str]) -> None:
+    """Log a task write, telling the project/workspace it left as well."""
+    record(db, "task", [task_id], workspace_id, project_id)
+    if old_workspace_id != workspace_id:
+        record(db, "task", [task_id], old_workspace_id, old_project_id, deleted=True)
+    elif old_project_id != project_id:
+        # Still visible workspace-wide; the old project's view sees the new project_id
+        record(db, "task", [task_id], old_workspace_id, old_project_id)
+
+
+@event.listens_for(Session, "before_commit")
+def _write(session: Session) -> None:
+    pending = session.info.pop(_CHANGES, None)
+    if not pending:
+        return
+    conn = session.connection()
+    bump = bump_statement(conn.dialect.name).returning(ChangeCounter.__table__.c.version)
+    seqs = {w: conn.execute(bump, {"k": seq_key(w)}).scalar_one() for w in sorted({k[0] for k in pending})}
+    conn.execute(insert(ChangeLogEntry.__table__), [
+        {"workspace_id": w, "seq": seqs[w], "entity": e, "entity_id": i, "project_id": p, "deleted": d}
+        for (w, e, i, p), d in pending.items()
+    ])
+    channels = {}
+    for w, _, _, p in pending:
+        channels[f"workspace:{w}"] = seqs[w]
+        if p:
+            channels[f"project:{p}"] = seqs[w]
+    for ev in session.info.get(_EVENTS, ()):
+        if ev.channel in channels:
+            ev.payload["seq"] = channels[ev.channel]
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard(session: Session) -> None:
+    session.info.pop(_CHANGES, None)
+
+
+async def current_seq(db: AsyncSession, workspace_id: str) -> int:
+    return (await db.execute(select(ChangeCounter.version).where(ChangeCounter.key == seq_key(workspace_id)))).scalar() or 0
+
+
+async def changes_since(
+    db: AsyncSession,
+    workspace_id: str,
+    since: Optional[int],
+    project_id: Optional[str] = None,
+    limit: int = DEFAULT_LIMIT,
+) -> dict:
+    """Current state of everything changed after `since`, plus the ids deleted since.
+
+    Returns {seq, reset, has_more, tasks, projects, tags, comments, task_tags,
+    task_assignees, deleted}; the link maps cover every returned task. Pass
+    `seq` back as `since` next time. Pages end on a commit boundary, so a page
+    may run past `limit` when one commit touched many rows. `since=None` only
+    reports the current seq.
+    """
+    current = await current_seq(db, workspace_id)
+    out: Dict[str, object] = {key: [] for _, key in ENTITIES.values()}
+    out.update(seq=current, reset=False, has_more=False, deleted={key: [] for _, key in ENTITIES.values()}, task_tags={}, task_assignees={})
+    if since is None:
+        return out
+    if since > current:
+        # A position this database never handed out: the client has to start over
+        out["reset"] = True
+        return out
+
+    scope = [ChangeLogEntry.workspace_id == workspace_id, ChangeLogEntry.seq > since]
+    if project_id:
+        scope.append(ChangeLogEntry.project_id == project_id)
+    bound = (await db.execute(
+        select(ChangeLogEntry.seq).where(*scope).order_by(ChangeLogEntry.seq).offset(limit - 1).limit(1)
+    )).scalar()
+    upto = current if bound is None else bound
+    rows = (await db.execute(
+        select(ChangeLogEntry.entity, ChangeLogEntry.entity_id, ChangeLogEntry.deleted)
+        .where(*scope, ChangeLogEntry.seq <= upto)
+        .order_by(ChangeLogEntry.seq, ChangeLogEntry.id)
+    )).all()
+    # Only the last word on each entity matters
+    latest: Dict[tuple, bool] = {}
+    for entity, entity_id, deleted in rows:
+        latest.pop((entity, entity_id), None)
+        latest[(entity, entity_id)] = deleted
+
+    for entity, (model, key) in ENTITIES.items():
+        gone = [i for (e, i), d in latest.items() if e == entity and d]
+        changed = [i for (e, i), d in latest.items() if e == entity and not d]
+        found: List = []
+        for start in range(0, len(changed), 1000):
+            stmt = select(model).where(model.id.in_(changed[start:start + 1000]))
+            if hasattr(model, "workspace_id"):
+                stmt = stmt.where(model.workspace_id == workspace_id)
+            found.extend((await db.execute(stmt)).scalars().all())
+        # Rows gone (or moved to another workspace) since they were logged
+        have = {o.id for o in found}
+        gone.extend(i for i in changed if i not in have)
+        out[key] = found
+        out["deleted"][key] = gone
+    # Tag and assignee links of the changed tasks, as in the project snapshot
+    ids = [t.id for t in out["tasks"]]
+    out["task_tags"] = await _links(db, TaskTag.task_id, TaskTag.tag_id, ids)
+    out["task_assignees"] = await _links(db, TaskAssignee.task_id, TaskAssignee.user_id, ids)
+    out.update(seq=upto, has_more=upto < current)
+    return out
+
+
+async def _links(db: AsyncSession, task_col, other_col, ids: List[str]) -> Dict[str, List[str]]:
+    links: Dict[str, List[str]] = {i: [] for i in ids}
+    for start in range(0, len(ids), 1000):
+        rows = await db.execute(select(task_col, other_col).where(task_col.in_(ids[start:start + 1000])).order_by(task_col, other_col))
+        for task_id, other_id in rows.all():
+            links[task_id].append(other_id)
+    return links
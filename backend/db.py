@@ -1,17 +1,128 @@
+import time
 from contextlib import contextmanager
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+from sqlalchemy import exc
 from .config import settings
+from .metrics import Histogram
 
 
+_ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def async_url(url: str) -> str:
+    u = make_url(url)
+    driver = _ASYNC_DRIVERS.get(u.get_backend_name())
+    return u.set(drivername=driver).render_as_string(hide_password=False) if driver else url
+
+
+class _InstrumentedPool:
+    """Mixin timing how long callers wait for a connection.
+
+    wait_ms covers time blocked in the queue (or opening a new connection);
+    checkout_ms is the full checkout including the pre-ping round trip.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.wait_ms = Histogram()
+        self.checkout_ms = Histogram()
+        self.timeouts = 0
+
+    def _do_get(self):
+        t0 = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            self.wait_ms.observe((time.perf_counter() - t0) * 1000)
+
+    def connect(self):
+        t0 = time.perf_counter()
+        try:
+            return super().connect()
+        finally:
+            self.checkout_ms.observe((time.perf_counter() - t0) * 1000)
+
+    def recreate(self):
+        # Keep the histograms across engine.dispose()
+        new = super().recreate()
+        new.wait_ms, new.checkout_ms, new.timeouts = self.wait_ms, self.checkout_ms, self.timeouts
+        return new
+
+
+class InstrumentedQueuePool(_InstrumentedPool, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_InstrumentedPool, AsyncAdaptedQueuePool):
+    pass
+
+
+def _pool_kwargs(url: str, poolclass) -> dict:
+    kw = {"pool_pre_ping": settings.db_pool_pre_ping}
+    u = make_url(url)
+    if u.get_backend_name() == "sqlite" and (u.database in (None, "", ":memory:") or "mode=memory" in str(u)):
+        # In-memory SQLite needs its single shared connection; keep the dialect default
+        return kw
+    kw.update(
+        poolclass=poolclass,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout,
+        pool_recycle=settings.db_pool_recycle,
+    )
+    return kw
+
+
+# Sync engine: Alembic, auth/org routers and scripts
 engine = create_engine(
     settings.database_url,
-    pool_pre_ping=True,
     future=True,
+    **_pool_kwargs(settings.database_url, InstrumentedQueuePool),
 )
 
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
 
+# Async engine: async route handlers
+_async_url = settings.async_database_url or async_url(settings.database_url)
+async_engine = create_async_engine(
+    _async_url,
+    **_pool_kwargs(_async_url, InstrumentedAsyncQueuePool),
+)
+
+# expire_on_commit=False so handlers can serialize rows after commit without lazy IO
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+
+def pool_stats(eng) -> dict:
+    pool = eng.pool
+    stats = {"pool": type(pool).__name__, "status": pool.status()}
+    if isinstance(pool, QueuePool):
+        stats.update(
+            size=pool.size(),
+            checked_out=pool.checkedout(),
+            checked_in=pool.checkedin(),
+            # overflow() goes negative while the base pool is not yet filled
+            overflow_in_use=max(pool.overflow(), 0),
+            max_overflow=pool._max_overflow,
+        )
+    if isinstance(pool, _InstrumentedPool):
+        stats.update(
+            timeouts=pool.timeouts,
+            wait_ms=pool.wait_ms.snapshot(),
+            checkout_ms=pool.checkout_ms.snapshot(),
+        )
+    return stats
+
 
 @contextmanager
 def session_scope():
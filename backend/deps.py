@@ -1,8 +1,12 @@
 from fastapi import Depends, HTTPException, status, Cookie
-from sqlalchemy.orm import Session
+from sqlalchemy import select, inspect as sa_inspect
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import defer, make_transient_to_detached
 
-from .db import SessionLocal
+from .db import SessionLocal, AsyncSessionLocal
 from .auth import decode_token
+from .cache import TTLCache
+from .config import settings
 from .models import User, Organization, OrgMembership
 
 
@@ -14,28 +18,71 @@ def get_db():
         db.close()
 
 
-def get_current_user(
-    db: Session = Depends(get_db),
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+# user_id -> (user columns, org columns or None). Invalidate via invalidate_principal()
+# whenever a user's row or org membership changes.
+_principal_cache = TTLCache(maxsize=settings.auth_cache_size, ttl=settings.auth_cache_ttl_seconds)
+
+# Never loaded for the principal nor kept in the cache; login reads the hash
+# itself. On the rehydrated User they are unloaded and load on access if needed.
+_SECRET_COLUMNS = frozenset({"password_hash"})
+
+
+def _snapshot(obj) -> dict:
+    return {
+        attr.key: getattr(obj, attr.key)
+        for attr in sa_inspect(obj).mapper.column_attrs
+        if attr.key not in _SECRET_COLUMNS
+    }
+
+
+def _rehydrate(cls, snap: dict):
+    # A fresh detached instance per request so sessions never share ORM state
+    obj = cls(**snap)
+    make_transient_to_detached(obj)
+    return obj
+
+
+async def _load_principal(db: AsyncSession, user_id: str):
+    user = await db.get(User, user_id, options=[defer(User.password_hash)])
+    if not user:
+        return None
+    # For v1 dev: the first org the user belongs to
+    org = (await db.execute(
+        select(Organization).join(OrgMembership, OrgMembership.org_id == Organization.id).where(OrgMembership.user_id == user_id).limit(1)
+    )).scalar_one_or_none()
+    entry = (_snapshot(user), _snapshot(org) if org else None)
+    _principal_cache.set(user_id, entry)
+    return entry
+
+
+def invalidate_principal(user_id: str) -> None:
+    _principal_cache.pop(user_id)
+
+
+async def get_current_user(
+    db: AsyncSession = Depends(get_async_db),
     access_token: str | None = Cookie(default=None, alias="access_token"),
 ):
     if not access_token:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Missing token")
     payload = decode_token(access_token, scope="access")
     user_id = payload.get("sub")
-    user = db.get(User, user_id)
-    if not user:
+    entry = _principal_cache.get(user_id) or await _load_principal(db, user_id)
+    if not entry:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
-    return user
+    return _rehydrate(User, entry[0])
 
 
-def get_current_org(
-    db: Session = Depends(get_db),
+async def get_current_org(
+    db: AsyncSession = Depends(get_async_db),
     user: User = Depends(get_current_user),
 ):
-    # For v1 dev: the first org the user belongs to
-    mem = db.query(OrgMembership).filter(OrgMembership.user_id == user.id).first()
-    if not mem:
+    entry = _principal_cache.get(user.id) or await _load_principal(db, user.id)
+    if not entry or entry[1] is None:
         raise HTTPException(status_code=400, detail="User not in an organization")
-    org = db.get(Organization, mem.org_id)
-    return org
-
+    return _rehydrate(Organization, entry[1])
@@ -0,0 +1,120 @@
+import asyncio
+import logging
+from typing import List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from .realtime import manager
+
+
+# Routers record realtime events on the session with emit(); they are handed to
+# the dispatcher only once the transaction commits (and dropped on rollback),
+# so clients never hear about writes that did not land and the request does
+# not wait on socket writes.
+
+_PENDING = "pending_events"
+
+logger = logging.getLogger(__name__)
+
+
+class Event:
+    __slots__ = ("channel", "payload", "key")
+
+    def __init__(self, channel: str, payload: dict, key: Optional[str] = None) -> None:
+        self.channel = channel
+        self.payload = payload
+        # Events sharing (channel, key) coalesce: only the latest is delivered
+        self.key = key
+
+
+def emit(db, channel: str, payload: dict, key: Optional[str] = None) -> None:
+    """Queue a realtime event to broadcast after `db` commits.
+
+    Works with both Session and AsyncSession (which shares its sync session's info).
+    """
+    db.info.setdefault(_PENDING, []).append(Event(channel, payload, key))
+
+
+@event.listens_for(Session, "after_commit")
+def _after_commit(session: Session) -> None:
+    events = session.info.pop(_PENDING, None)
+    if events:
+        dispatcher.submit(events)
+
+
+@event.listens_for(Session, "after_rollback")
+def _after_rollback(session: Session) -> None:
+    session.info.pop(_PENDING, None)
+
+
+def coalesce(events: List[Event]) -> List[Event]:
+    """Drop keyed events superseded by a later one on the same channel; keep order otherwise."""
+    last = {}
+    for i, ev in enumerate(events):
+        if ev.key is not None:
+            last[(ev.channel, ev.key)] = i
+    return [ev for i, ev in enumerate(events) if ev.key is None or last[(ev.channel, ev.key)] == i]
+
+
+class EventDispatcher:
+    """Delivers committed events off the request path.
+
+    Each wake-up drains everything queued (up to max_batch), coalesces it and
+    broadcasts channel by channel, so a burst of writes costs one pass.
+    """
+
+    def __init__(self, max_batch: int = 500) -> None:
+        self.max_batch = max_batch
+        self.queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def start(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._task and not self._task.done() and self._loop is loop:
+            return
+        self._loop = loop
+        self.queue = asyncio.Queue()
+        self._task = loop.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def submit(self, events: List[Event]) -> None:
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is None:
+            # Committed from a worker thread (sync session): hop onto the dispatcher's loop
+            if self._loop and self._task and not self._task.done():
+                self._loop.call_soon_threadsafe(self.queue.put_nowait, events)
+            return
+        self.start()
+        self.queue.put_nowait(events)
+
+    async def _run(self) -> None:
+        while True:
+            batch = list(await self.queue.get())
+            while len(batch) < self.max_batch and not self.queue.empty():
+                batch.extend(self.queue.get_nowait())
+            by_channel: dict = {}
+            for ev in coalesce(batch):
+                by_channel.setdefault(ev.channel, []).append(ev.payload)
+            for channel, payloads in by_channel.items():
+                for payload in payloads:
+                    try:
+                        await manager.broadcast(channel, payload)
+                    except Exception:
+                        # Realtime is best-effort: log it and keep delivering the rest
+                        logger.exception("broadcast of %s on %s failed", payload.get("type"), channel)
+
+
+dispatcher = EventDispatcher()
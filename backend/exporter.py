@@ -0,0 +1,127 @@
+import csv
+import io
+from typing import Dict, Iterator, List, Optional
+
+import orjson
+from sqlalchemy import func, select
+
+from .db import SessionLocal
+from .models import Task, TaskAssignee, TaskTag, Tag, Comment, Project, ProjectStatus, User
+
+
+# Streaming task export. Tasks are read through a server-side cursor
+# (stream_results + yield_per) and each chunk's assignees, tags and comments are
+# loaded with one query apiece, so memory stays flat however big the workspace.
+# CSV only needs comment counts, so comment bodies are read for JSONL alone.
+# CSV uses the importer's column names, so an export can be imported again;
+# JSONL additionally carries each task's comments.
+
+DEFAULT_CHUNK_SIZE = 1000
+FORMATS = ("csv", "jsonl")
+MEDIA_TYPES = {"csv": "text/csv", "jsonl": "application/x-ndjson"}
+
+CSV_COLUMNS = [
+    "id", "project", "name", "status", "priority", "due_date", "is_completed", "completed_at",
+    "created_at", "description", "assignees", "tags", "comments",
+]
+
+_TASK_COLUMNS = (
+    Task.id, Task.project_id, Task.name, Task.status_id, Task.priority, Task.due_date, Task.is_completed,
+    Task.completed_at, Task.created_at, Task.description, Task.description_text,
+)
+
+
+def _iso(value) -> Optional[str]:
+    return value.isoformat() if value is not None else None
+
+
+def _links(db, ids: List[str], comment_bodies: bool):
+    """Assignee emails and tag names per task, plus either each task's comments
+    (`comment_bodies`) or just how many it has."""
+    assignees: Dict[str, List[str]] = {}
+    for task_id, email in db.execute(
+        select(TaskAssignee.task_id, User.email).join(User, User.id == TaskAssignee.user_id).where(TaskAssignee.task_id.in_(ids))
+    ):
+        assignees.setdefault(task_id, []).append(email)
+    tags: Dict[str, List[str]] = {}
+    for task_id, name in db.execute(
+        select(TaskTag.task_id, Tag.name).join(Tag, Tag.id == TaskTag.tag_id).where(TaskTag.task_id.in_(ids)).order_by(Tag.name)
+    ):
+        tags.setdefault(task_id, []).append(name)
+    if not comment_bodies:
+        counts = db.execute(select(Comment.task_id, func.count()).where(Comment.task_id.in_(ids)).group_by(Comment.task_id))
+        return assignees, tags, dict(counts.all())
+    comments: Dict[str, List[dict]] = {}
+    for task_id, email, body, created_at in db.execute(
+        select(Comment.task_id, User.email, Comment.body, Comment.created_at)
+        .join(User, User.id == Comment.author_id)
+        .where(Comment.task_id.in_(ids))
+        .order_by(Comment.task_id, Comment.created_at)
+    ):
+        comments.setdefault(task_id, []).append({"author": email, "body": body, "created_at": _iso(created_at)})
+    return assignees, tags, comments
+
+
+def export_tasks(
+    org_id: str,
+    workspace_id: Optional[str] = None,
+    project_id: Optional[str] = None,
+    fmt: str = "jsonl",
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Iterator[bytes]:
+    """Yield the export as encoded chunks, one per `chunk_size` tasks.
+
+    Opens its own session: a streaming response outlives request dependencies.
+    """
+    with SessionLocal() as db:
+        projects = {pid: name for pid, name in db.execute(
+            select(Project.id, Project.name).where(Project.org_id == org_id, *([Project.workspace_id == workspace_id] if workspace_id else []))
+        )}
+        status_q = select(ProjectStatus.id, ProjectStatus.label)
+        status_q = status_q.where(ProjectStatus.project_id == project_id) if project_id else status_q.where(ProjectStatus.project_id.in_(list(projects)))
+        statuses = dict(db.execute(status_q).all())
+
+        stmt = select(*_TASK_COLUMNS).where(Task.org_id == org_id)
+        stmt = stmt.where(Task.project_id == project_id) if project_id else stmt.where(Task.workspace_id == workspace_id)
+        stmt = stmt.order_by(Task.created_at, Task.id).execution_options(stream_results=True, yield_per=chunk_size)
+
+        buf = io.StringIO()
+        writer = csv.writer(buf)
+        if fmt == "csv":
+            writer.writerow(CSV_COLUMNS)
+        for chunk in db.execute(stmt).partitions():
+            assignees, tags, comments = _links(db, [r.id for r in chunk], comment_bodies=fmt == "jsonl")
+            out = []
+            for r in chunk:
+                if fmt == "csv":
+                    writer.writerow([
+                        r.id, projects.get(r.project_id, ""), r.name, statuses.get(r.status_id, ""), r.priority,
+                        _iso(r.due_date) or "", "yes" if r.is_completed else "", _iso(r.completed_at) or "",
+                        _iso(r.created_at), r.description_text or "",
+                        ";".join(assignees.get(r.id, ())), ";".join(tags.get(r.id, ())), comments.get(r.id, 0),
+                    ])
+                else:
+                    out.append(orjson.dumps({
+                        "id": r.id,
+                        "project": projects.get(r.project_id),
+                        "name": r.name,
+                        "status": statuses.get(r.status_id),
+                        "priority": r.priority,
+                        "due_date": _iso(r.due_date),
+                        "is_completed": r.is_completed,
+                        "completed_at": _iso(r.completed_at),
+                        "created_at": _iso(r.created_at),
+                        "description": r.description,
+                        "assignees": assignees.get(r.id, []),
+                        "tags": tags.get(r.id, []),
+                        "comments": comments.get(r.id, []),
+                    }))
+            if fmt == "csv":
+                yield buf.getvalue().encode()
+                buf.seek(0)
+                buf.truncate()
+            else:
+                yield b"\n".join(out) + b"\n"
+        if fmt == "csv" and buf.tell():
+            # Header only: the export had no tasks
+            yield buf.getvalue().encode()
@@ -0,0 +1,330 @@
+import argparse
+import csv
+import io
+import re
+import sys
+import time
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import BinaryIO, Callable, Dict, Iterator, List, Optional, Tuple
+
+import orjson
+from sqlalchemy import select, insert
+from sqlalchemy.orm import Session
+
+from .changelog import record
+from .versions import touch, touch_tasks
+from .models import (
+    Task, TaskAssignee, TaskTag, Tag, ProjectTag, Project, ProjectStatus, ProjectMembership,
+    WorkspaceMembership, OrgMembership, User, uuid4_str, plain_text,
+)
+
+
+# Bulk task import: records stream in from a CSV/JSONL file, names are resolved
+# against lookup tables loaded once up front, and rows go out in executemany
+# batches (Core inserts, skipping ORM bookkeeping). Everything runs in the caller's transaction; nothing is committed here.
+#
+# Columns (CSV header or JSON keys): name (required), status (label or key),
+# priority (0-3), due_date (YYYY-MM-DD), is_completed, description (text),
+# assignees (emails) and tags (names). In CSV, list columns are separated by
+# commas or semicolons. Unknown tags are created in the project's workspace.
+
+DEFAULT_BATCH_SIZE = 1000
+MAX_REPORTED_ERRORS = 100
+FORMATS = ("csv", "jsonl")
+
+_LIST_SEP = re.compile(r"[;,]")
+_TRUE = {"1", "true", "yes", "y", "x", "done"}
+
+
+class ImportFileError(ValueError):
+    """The file can't be imported at all (as opposed to a bad row)."""
+
+
+@dataclass
+class ImportReport:
+    imported: int = 0
+    skipped: int = 0
+    tags_created: int = 0
+    errors: List[dict] = field(default_factory=list)
+    seconds: float = 0.0
+
+    def error(self, line: int, detail: str) -> None:
+        self.skipped += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line, "detail": detail})
+
+    def as_dict(self) -> dict:
+        return {
+            "imported": self.imported,
+            "skipped": self.skipped,
+            "tags_created": self.tags_created,
+            "errors": self.errors,
+            "seconds": round(self.seconds, 3),
+        }
+
+
+def detect_format(filename: Optional[str]) -> str:
+    return "csv" if (filename or "").lower().endswith(".csv") else "jsonl"
+
+
+def read_records(fp: BinaryIO, fmt: str) -> Iterator[Tuple[int, Optional[dict]]]:
+    """Yield (line number, record) lazily; record is None for unparseable JSONL lines."""
+    if fmt not in FORMATS:
+        raise ImportFileError(f"Unsupported format: {fmt}")
+    text = io.TextIOWrapper(fp, encoding="utf-8-sig", newline="")
+    try:
+        if fmt == "csv":
+            reader = csv.DictReader(text)
+            if not reader.fieldnames or "name" not in [f.strip().lower() for f in reader.fieldnames]:
+                raise ImportFileError("CSV header must include a 'name' column")
+            for row in reader:
+                yield reader.line_num, {(k or "").strip().lower(): v for k, v in row.items()}
+        else:
+            for n, line in enumerate(text, 1):
+                if not line.strip():
+                    continue
+                try:
+                    obj = orjson.loads(line)
+                except orjson.JSONDecodeError:
+                    obj = None
+                yield n, obj if isinstance(obj, dict) else None
+    except UnicodeDecodeError:
+        raise ImportFileError("File is not valid UTF-8")
+    except csv.Error as e:
+        # e.g. a NUL byte or an unterminated quote at end of file
+        raise ImportFileError(f"Malformed CSV after line {reader.line_num}: {e}")
+    finally:
+        # Leave the underlying file open for the caller
+        text.detach()
+
+
+def _names(value) -> List[str]:
+    if value is None:
+        return []
+    items = value if isinstance(value, list) else _LIST_SEP.split(str(value))
+    return [s for s in (str(v).strip() for v in items) if s]
+
+
+class TaskImporter:
+    def __init__(
+        self,
+        db: Session,
+        project: Project,
+        user_id: str,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        on_progress: Optional[Callable[[ImportReport], None]] = None,
+    ) -> None:
+        self.db = db
+        self.project = project
+        self.user_id = user_id
+        self.batch_size = batch_size
+        self.on_progress = on_progress
+        self.report = ImportReport()
+        self._started = time.perf_counter()
+        self._created_at = datetime.utcnow()
+        self._tasks: List[dict] = []
+        self._assignees: List[dict] = []
+        self._tags: List[dict] = []
+        self._assignee_ids: set = set()
+        self._tag_ids: set = set()
+
+        # Lookup tables, loaded once
+        statuses = db.execute(
+            select(ProjectStatus).where(ProjectStatus.project_id == project.id).order_by(ProjectStatus.position)
+        ).scalars().all()
+        self.default_status = statuses[0].id if statuses else None
+        self.statuses: Dict[str, str] = {}
+        for s in reversed(statuses):
+            self.statuses[s.key.lower()] = s.id
+            self.statuses[s.label.lower()] = s.id
+        self.users: Dict[str, str] = {
+            email.lower(): uid
+            for uid, email in db.execute(
+                select(User.id, User.email).join(OrgMembership, OrgMembership.user_id == User.id).where(OrgMembership.org_id == project.org_id)
+            ).all()
+        }
+        self.tags: Dict[str, str] = {
+            norm: tid for tid, norm in db.execute(select(Tag.id, Tag.name_norm).where(Tag.workspace_id == project.workspace_id)).all()
+        }
+
+    def add(self, line: int, record: Optional[dict]) -> None:
+        if record is None:
+            self.report.error(line, "Invalid JSON object")
+            return
+        name = str(record.get("name") or "").strip()
+        if not name:
+            self.report.error(line, "name required")
+            return
+        status_id = self.default_status
+        status = str(record.get("status") or "").strip()
+        if status:
+            status_id = self.statuses.get(status.lower())
+            if status_id is None:
+                self.report.error(line, f"Unknown status: {status}")
+                return
+        try:
+            priority = int(record.get("priority") if record.get("priority") not in (None, "") else 2)
+            if not 0 <= priority <= 3:
+                raise ValueError
+        except (TypeError, ValueError):
+            self.report.error(line, "priority must be 0-3")
+            return
+        due = record.get("due_date") or None
+        if due is not None:
+            try:
+                due = date.fromisoformat(str(due).strip()[:10])
+            except ValueError:
+                self.report.error(line, f"Invalid due_date: {due}")
+                return
+        user_ids = []
+        for email in _names(record.get("assignees")):
+            uid = self.users.get(email.lower())
+            if uid is None:
+                self.report.error(line, f"Unknown assignee: {email}")
+                return
+            user_ids.append(uid)
+        done = record.get("is_completed")
+        is_completed = done if isinstance(done, bool) else str(done or "").strip().lower() in _TRUE
+        description = record.get("description")
+        if isinstance(description, str):
+            description = {"type": "plain", "text": description} if description else None
+        elif not isinstance(description, dict):
+            description = None
+
+        task_id = uuid4_str()
+        # Later rows get later timestamps, as if created one by one in file order
+        created_at = self._created_at + timedelta(microseconds=self.report.imported + len(self._tasks))
+        self._tasks.append({
+            "id": task_id,
+            "org_id": self.project.org_id,
+            "workspace_id": self.project.workspace_id,
+            "project_id": self.project.id,
+            "name": name[:512],
+            "description": description,
+            # Bulk inserts bypass the ORM listener that keeps this in sync
+            "description_text": plain_text(description) if description else None,
+            "status_id": status_id,
+            "priority": priority,
+            "due_date": due,
+            "is_completed": is_completed,
+            "completed_at": created_at if is_completed else None,
+            "created_by": self.user_id,
+            "created_at": created_at,
+        })
+        for uid in dict.fromkeys(user_ids):
+            self._assignees.append({"task_id": task_id, "user_id": uid})
+            self._assignee_ids.add(uid)
+        for tag_name in dict.fromkeys(_names(record.get("tags"))):
+            tag_id = self._tag(tag_name)
+            self._tags.append({"task_id": task_id, "tag_id": tag_id})
+            self._tag_ids.add(tag_id)
+        if len(self._tasks) >= self.batch_size:
+            self.flush()
+
+    def _tag(self, name: str) -> str:
+        name = name[:64]
+        tag_id = self.tags.get(name.lower())
+        if tag_id is None:
+            tag_id = self.tags[name.lower()] = uuid4_str()
+            self.db.execute(insert(Tag.__table__), [{
+                "id": tag_id, "org_id": self.project.org_id, "workspace_id": self.project.workspace_id,
+                "name": name, "name_norm": name.lower(), "color": "#6B7280", "created_at": datetime.utcnow(),
+            }])
+            touch(self.db, f"tags:workspace:{self.project.workspace_id}")
+            record(self.db, "tag", [tag_id], self.project.workspace_id)
+            self.report.tags_created += 1
+        return tag_id
+
+    def flush(self) -> None:
+        if not self._tasks:
+            return
+        self.db.execute(insert(Task.__table__), self._tasks)
+        touch_tasks(self.db, self.project.workspace_id, self.project.id)
+        record(self.db, "task", [t["id"] for t in self._tasks], self.project.workspace_id, self.project.id)
+        if self._assignees:
+            self.db.execute(insert(TaskAssignee.__table__), self._assignees)
+        if self._tags:
+            self.db.execute(insert(TaskTag.__table__), self._tags)
+        self.report.imported += len(self._tasks)
+        self._tasks, self._assignees, self._tags = [], [], []
+        self.report.seconds = time.perf_counter() - self._started
+        if self.on_progress:
+            self.on_progress(self.report)
+
+    def finish(self) -> ImportReport:
+        self.flush()
+        prj = self.project
+        # Same side effects as assigning/tagging one task at a time
+        if self._assignee_ids:
+            have = set(self.db.execute(select(WorkspaceMembership.user_id).where(
+                WorkspaceMembership.workspace_id == prj.workspace_id, WorkspaceMembership.user_id.in_(self._assignee_ids))).scalars())
+            missing = sorted(self._assignee_ids - have)
+            if missing:
+                self.db.execute(insert(WorkspaceMembership.__table__), [{"workspace_id": prj.workspace_id, "user_id": u, "role": "member"} for u in missing])
+            have = set(self.db.execute(select(ProjectMembership.user_id).where(
+                ProjectMembership.project_id == prj.id, ProjectMembership.user_id.in_(self._assignee_ids))).scalars())
+            missing = sorted(self._assignee_ids - have)
+            if missing:
+                self.db.execute(insert(ProjectMembership.__table__), [{"project_id": prj.id, "user_id": u, "role": "editor"} for u in missing])
+        if self._tag_ids:
+            have = set(self.db.execute(select(ProjectTag.tag_id).where(
+                ProjectTag.project_id == prj.id, ProjectTag.tag_id.in_(self._tag_ids))).scalars())
+            missing = sorted(self._tag_ids - have)
+            if missing:
+                self.db.execute(insert(ProjectTag.__table__), [{"project_id": prj.id, "tag_id": t} for t in missing])
+        self.report.seconds = time.perf_counter() - self._started
+        return self.report
+
+
+def import_tasks(
+    db: Session,
+    project: Project,
+    user_id: str,
+    fp: BinaryIO,
+    fmt: str,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    on_progress: Optional[Callable[[ImportReport], None]] = None,
+) -> ImportReport:
+    importer = TaskImporter(db, project, user_id, batch_size=batch_size, on_progress=on_progress)
+    for line, record in read_records(fp, fmt):
+        importer.add(line, record)
+    return importer.finish()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    from .db import session_scope
+
+    parser = argparse.ArgumentParser(prog="python -m backend.importer", description="Import tasks into a project from CSV or JSONL.")
+    parser.add_argument("path", help="file to import ('-' for stdin)")
+    parser.add_argument("--project", required=True, help="target project id")
+    parser.add_argument("--user", required=True, help="email of the user recorded as creator")
+    parser.add_argument("--format", choices=FORMATS, help="defaults to the file extension (.csv, otherwise jsonl)")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    args = parser.parse_args(argv)
+
+    def progress(r: ImportReport) -> None:
+        rate = r.imported / r.seconds if r.seconds else 0
+        print(f"imported {r.imported} skipped {r.skipped} ({rate:,.0f} tasks/s)", file=sys.stderr)
+
+    with session_scope() as db:
+        project = db.get(Project, args.project)
+        if not project:
+            parser.error("project not found")
+        user = db.execute(select(User).where(User.email == args.user.lower())).scalar_one_or_none()
+        if not user:
+            parser.error("user not found")
+        fp = sys.stdin.buffer if args.path == "-" else open(args.path, "rb")
+        try:
+            report = import_tasks(db, project, user.id, fp, args.format or detect_format(args.path), args.batch_size, progress)
+        except ImportFileError as e:
+            parser.error(str(e))
+        finally:
+            if fp is not sys.stdin.buffer:
+                fp.close()
+    print(orjson.dumps(report.as_dict()).decode())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,39 @@
+"""add indexes for hot query paths
+
+Revision ID: 20250920_000007
+Revises: 20250912_000006
+Create Date: 2025-09-20 00:00:07
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '20250920_000007'
+down_revision = '20250912_000006'
+branch_labels = None
+depends_on = None
+
+
+INDEXES = [
+    # (name, table, columns)
+    ('ix_tasks_project_created', 'tasks', ['project_id', 'created_at', 'id']),
+    ('ix_tasks_workspace_created', 'tasks', ['workspace_id', 'created_at', 'id']),
+    ('ix_comments_task_created', 'comments', ['task_id', 'created_at']),
+    ('ix_task_tags_tag_task', 'task_tags', ['tag_id', 'task_id']),
+    ('ix_org_memberships_user_org', 'org_memberships', ['user_id', 'org_id']),
+    ('ix_workspace_memberships_user', 'workspace_memberships', ['user_id']),
+    ('ix_workspaces_org', 'workspaces', ['org_id']),
+    ('ix_projects_workspace', 'projects', ['workspace_id']),
+    ('ix_project_statuses_project_position', 'project_statuses', ['project_id', 'position']),
+]
+
+
+def upgrade() -> None:
+    for name, table, cols in INDEXES:
+        op.create_index(name, table, cols)
+
+
+def downgrade() -> None:
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
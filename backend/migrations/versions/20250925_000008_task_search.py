@@ -0,0 +1,76 @@
+"""task search: description_text, search_vector and trigram index
+
+Revision ID: 20250925_000008
+Revises: 20250920_000007
+Create Date: 2025-09-25 00:00:08
+"""
+
+import json
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.sql import text
+
+
+# revision identifiers, used by Alembic.
+revision = '20250925_000008'
+down_revision = '20250920_000007'
+branch_labels = None
+depends_on = None
+
+
+def _plain_text(doc) -> str:
+    # Mirrors backend.models.plain_text at the time of this migration
+    out = []
+
+    def walk(node):
+        if isinstance(node, dict):
+            if isinstance(node.get('text'), str):
+                out.append(node['text'])
+            for key, value in node.items():
+                if key != 'text':
+                    walk(value)
+        elif isinstance(node, list):
+            for item in node:
+                walk(item)
+
+    walk(doc)
+    return ' '.join(t for t in out if t)
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('tasks') as batch:
+        batch.add_column(sa.Column('description_text', sa.Text(), nullable=True))
+    op.create_index('ix_tasks_org_created', 'tasks', ['org_id', 'created_at', 'id'])
+
+    # Backfill description_text
+    conn = op.get_bind()
+    rows = conn.execute(text("SELECT id, description FROM tasks WHERE description IS NOT NULL")).fetchall()
+    for r in rows:
+        doc = json.loads(r.description) if isinstance(r.description, str) else r.description
+        conn.execute(
+            text("UPDATE tasks SET description_text = :t WHERE id = :id"),
+            {"t": _plain_text(doc) or None, "id": r.id},
+        )
+
+    if conn.dialect.name == 'postgresql':
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        op.execute(
+            "ALTER TABLE tasks ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ("
+            "setweight(to_tsvector('simple', coalesce(name, '')), 'A') || "
+            "setweight(to_tsvector('simple', coalesce(description_text, '')), 'B')"
+            ") STORED"
+        )
+        op.execute("CREATE INDEX ix_tasks_search_vector ON tasks USING gin (search_vector)")
+        op.execute("CREATE INDEX ix_tasks_name_trgm ON tasks USING gin (name gin_trgm_ops)")
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    if conn.dialect.name == 'postgresql':
+        op.execute("DROP INDEX IF EXISTS ix_tasks_name_trgm")
+        op.execute("DROP INDEX IF EXISTS ix_tasks_search_vector")
+        op.execute("ALTER TABLE tasks DROP COLUMN IF EXISTS search_vector")
+    op.drop_index('ix_tasks_org_created', table_name='tasks')
+    with op.batch_alter_table('tasks') as batch:
+        batch.drop_column('description_text')
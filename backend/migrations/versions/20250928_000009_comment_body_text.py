@@ -0,0 +1,58 @@
+"""comments: body_text for lightweight listings
+
+Revision ID: 20250928_000009
+Revises: 20250925_000008
+Create Date: 2025-09-28 00:00:09
+"""
+
+import json
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.sql import text
+
+
+# revision identifiers, used by Alembic.
+revision = '20250928_000009'
+down_revision = '20250925_000008'
+branch_labels = None
+depends_on = None
+
+
+def _plain_text(doc) -> str:
+    # Mirrors backend.models.plain_text at the time of this migration
+    out = []
+
+    def walk(node):
+        if isinstance(node, dict):
+            if isinstance(node.get('text'), str):
+                out.append(node['text'])
+            for key, value in node.items():
+                if key != 'text':
+                    walk(value)
+        elif isinstance(node, list):
+            for item in node:
+                walk(item)
+
+    walk(doc)
+    return ' '.join(t for t in out if t)
+
+
+def upgrade() -> None:
+    # ix_comments_task_created (task_id, created_at) already exists (20250920_000007)
+    with op.batch_alter_table('comments') as batch:
+        batch.add_column(sa.Column('body_text', sa.Text(), nullable=True))
+
+    conn = op.get_bind()
+    rows = conn.execute(text("SELECT id, body FROM comments WHERE body IS NOT NULL")).fetchall()
+    for r in rows:
+        doc = json.loads(r.body) if isinstance(r.body, str) else r.body
+        conn.execute(
+            text("UPDATE comments SET body_text = :t WHERE id = :id"),
+            {"t": _plain_text(doc) or None, "id": r.id},
+        )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('comments') as batch:
+        batch.drop_column('body_text')
@@ -0,0 +1,23 @@
+"""tasks: index parent_id for subtask trees
+
+Revision ID: 20251001_000010
+Revises: 20250928_000009
+Create Date: 2025-10-01 00:00:10
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '20251001_000010'
+down_revision = '20250928_000009'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_tasks_parent', 'tasks', ['parent_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_tasks_parent', table_name='tasks')
@@ -0,0 +1,36 @@
+"""task_dependencies and tasks.is_at_risk
+
+Revision ID: 20251004_000011
+Revises: 20251001_000010
+Create Date: 2025-10-04 00:00:11
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '20251004_000011'
+down_revision = '20251001_000010'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'task_dependencies',
+        sa.Column('task_id', sa.String(), sa.ForeignKey('tasks.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('depends_on_id', sa.String(), sa.ForeignKey('tasks.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('lag_days', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+    )
+    op.create_index('ix_task_dependencies_depends_on', 'task_dependencies', ['depends_on_id', 'task_id'])
+    with op.batch_alter_table('tasks') as batch:
+        batch.add_column(sa.Column('is_at_risk', sa.Boolean(), nullable=False, server_default=sa.false()))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('tasks') as batch:
+        batch.drop_column('is_at_risk')
+    op.drop_index('ix_task_dependencies_depends_on', table_name='task_dependencies')
+    op.drop_table('task_dependencies')
@@ -0,0 +1,28 @@
+"""change_counters: version stamps for conditional GETs
+
+Revision ID: 20251007_000012
+Revises: 20251004_000011
+Create Date: 2025-10-07 00:00:12
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '20251007_000012'
+down_revision = '20251004_000011'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'change_counters',
+        sa.Column('key', sa.String(length=128), primary_key=True),
+        sa.Column('version', sa.BigInteger(), nullable=False, server_default='0'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('change_counters')
@@ -0,0 +1,35 @@
+"""change_log: per-workspace change feed for delta sync
+
+Revision ID: 20251010_000013
+Revises: 20251007_000012
+Create Date: 2025-10-10 00:00:13
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '20251010_000013'
+down_revision = '20251007_000012'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'change_log',
+        sa.Column('id', sa.BigInteger().with_variant(sa.Integer(), 'sqlite'), primary_key=True, autoincrement=True),
+        sa.Column('workspace_id', sa.String(), nullable=False),
+        sa.Column('seq', sa.BigInteger(), nullable=False),
+        sa.Column('entity', sa.String(length=16), nullable=False),
+        sa.Column('entity_id', sa.String(), nullable=False),
+        sa.Column('project_id', sa.String(), nullable=True),
+        sa.Column('deleted', sa.Boolean(), nullable=False, server_default=sa.false()),
+    )
+    op.create_index('ix_change_log_workspace_seq', 'change_log', ['workspace_id', 'seq'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_change_log_workspace_seq', table_name='change_log')
+    op.drop_table('change_log')
@@ -1,6 +1,6 @@
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
-from sqlalchemy import String, Text, Integer, Boolean, Date, DateTime, ForeignKey, UniqueConstraint
-from sqlalchemy import JSON
+from sqlalchemy import String, Text, Integer, BigInteger, Boolean, Date, DateTime, ForeignKey, UniqueConstraint, Index
+from sqlalchemy import JSON, event
 from datetime import datetime, date
 import uuid
 from typing import Optional, List
@@ -45,7 +45,11 @@ class User(Base):
 
 class OrgMembership(Base):
     __tablename__ = "org_memberships"
-    __table_args__ = (UniqueConstraint("org_id", "user_id", name="uq_org_user"),)
+    __table_args__ = (
+        UniqueConstraint("org_id", "user_id", name="uq_org_user"),
+        # get_current_org resolves the org by user
+        Index("ix_org_memberships_user_org", "user_id", "org_id"),
+    )
 
     id: Mapped[str] = mapped_column(String, primary_key=True, default=uuid4_str)
     org_id: Mapped[str] = mapped_column(ForeignKey("organizations.id", ondelete="CASCADE"))
@@ -59,6 +63,7 @@ class OrgMembership(Base):
 
 class Workspace(Base):
     __tablename__ = "workspaces"
+    __table_args__ = (Index("ix_workspaces_org", "org_id"),)
 
     id: Mapped[str] = mapped_column(String, primary_key=True, default=uuid4_str)
     org_id: Mapped[str] = mapped_column(ForeignKey("organizations.id", ondelete="CASCADE"))
@@ -73,7 +78,10 @@ class Workspace(Base):
 
 class WorkspaceMembership(Base):
     __tablename__ = "workspace_memberships"
-    __table_args__ = (UniqueConstraint("workspace_id", "user_id", name="uq_ws_user"),)
+    __table_args__ = (
+        UniqueConstraint("workspace_id", "user_id", name="uq_ws_user"),
+        Index("ix_workspace_memberships_user", "user_id"),
+    )
 
     id: Mapped[str] = mapped_column(String, primary_key=True, default=uuid4_str)
     workspace_id: Mapped[str] = mapped_column(ForeignKey("workspaces.id", ondelete="CASCADE"))
@@ -87,6 +95,7 @@ class WorkspaceMembership(Base):
 
 class Project(Base):
     __tablename__ = "projects"
+    __table_args__ = (Index("ix_projects_workspace", "workspace_id"),)
 
     id: Mapped[str] = mapped_column(String, primary_key=True, default=uuid4_str)
     org_id: Mapped[str] = mapped_column(ForeignKey("organizations.id", ondelete="CASCADE"))
@@ -119,6 +128,7 @@ class ProjectMembership(Base):
 
 class ProjectStatus(Base):
     __tablename__ = "project_statuses"
+    __table_args__ = (Index("ix_project_statuses_project_position", "project_id", "position"),)
 
     id: Mapped[str] = mapped_column(String, primary_key=True, default=uuid4_str)
     project_id: Mapped[str] = mapped_column(ForeignKey("projects.id", ondelete="CASCADE"))
@@ -143,6 +153,16 @@ class ProjectSection(Base):
 
 class Task(Base):
     __tablename__ = "tasks"
+    __table_args__ = (
+        # Keyset list pages: WHERE project_id/workspace_id = ? ORDER BY created_at DESC, id DESC
+        Index("ix_tasks_project_created", "project_id", "created_at", "id"),
+        Index("ix_tasks_workspace_created", "workspace_id", "created_at", "id"),
+        Index("ix_tasks_org_created", "org_id", "created_at", "id"),
+        # Subtask trees walk parent -> children
+        Index("ix_tasks_parent", "parent_id"),
+        # Postgres also carries a generated `search_vector` tsvector column with a
+        # GIN index and a pg_trgm index on name; both live in migration 20250925_000008.
+    )
 
     id: Mapped[str] = mapped_column(String, primary_key=True, default=uuid4_str)
     org_id: Mapped[str] = mapped_column(String)
@@ -151,12 +171,16 @@ class Task(Base):
     parent_id: Mapped[Optional[str]] = mapped_column(String, nullable=True)
     name: Mapped[str] = mapped_column(String(512))
     description: Mapped[Optional[dict]] = mapped_column(JSON, default=None)
+    # Plain text pulled out of `description` for search; kept in sync on flush
+    description_text: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
     status_id: Mapped[Optional[str]] = mapped_column(String, nullable=True)
     priority: Mapped[int] = mapped_column(Integer, default=2)  # 0..3
     due_date: Mapped[Optional[date]] = mapped_column(Date, nullable=True)
     start_date: Mapped[Optional[date]] = mapped_column(Date, nullable=True)
     end_date: Mapped[Optional[date]] = mapped_column(Date, nullable=True)
     is_completed: Mapped[bool] = mapped_column(Boolean, default=False)
+    # Set by the dependency scheduler: projected to miss due_date, or starts before a dependency allows
+    is_at_risk: Mapped[bool] = mapped_column(Boolean, default=False)
     created_by: Mapped[str] = mapped_column(String)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
     completed_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
@@ -165,6 +189,44 @@ class Task(Base):
     assignees: Mapped[List["TaskAssignee"]] = relationship(back_populates="task", cascade="all, delete-orphan")
 
 
+def plain_text(doc) -> str:
+    """Concatenate the `text` strings of a description/comment JSON document."""
+    out: List[str] = []
+
+    def walk(node):
+        if isinstance(node, dict):
+            text = node.get("text")
+            if isinstance(text, str):
+                out.append(text)
+            for key, value in node.items():
+                if key != "text":
+                    walk(value)
+        elif isinstance(node, list):
+            for item in node:
+                walk(item)
+
+    walk(doc)
+    return " ".join(t for t in out if t)
+
+
+@event.listens_for(Task, "before_insert")
+@event.listens_for(Task, "before_update")
+def _sync_description_text(mapper, connection, target: Task) -> None:
+    target.description_text = plain_text(target.description) or None
+
+
+# Finish-to-start: `task_id` can start `lag_days` after `depends_on_id` ends.
+class TaskDependency(Base):
+    __tablename__ = "task_dependencies"
+    # The primary key serves task -> prerequisites; roll-forward walks prerequisite -> dependents
+    __table_args__ = (Index("ix_task_dependencies_depends_on", "depends_on_id", "task_id"),)
+
+    task_id: Mapped[str] = mapped_column(ForeignKey("tasks.id", ondelete="CASCADE"), primary_key=True)
+    depends_on_id: Mapped[str] = mapped_column(ForeignKey("tasks.id", ondelete="CASCADE"), primary_key=True)
+    lag_days: Mapped[int] = mapped_column(Integer, default=0)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+
 class TaskAssignee(Base):
     __tablename__ = "task_assignees"
     __table_args__ = (UniqueConstraint("task_id", "user_id", name="uq_task_assignee"),)
@@ -178,15 +240,24 @@ class TaskAssignee(Base):
 
 class Comment(Base):
     __tablename__ = "comments"
+    __table_args__ = (Index("ix_comments_task_created", "task_id", "created_at"),)
 
     id: Mapped[str] = mapped_column(String, primary_key=True, default=uuid4_str)
     org_id: Mapped[str] = mapped_column(String)
     task_id: Mapped[str] = mapped_column(ForeignKey("tasks.id", ondelete="CASCADE"))
     author_id: Mapped[str] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"))
     body: Mapped[dict] = mapped_column(JSON)
+    # Plain-text copy of `body` so comment lists can return previews without loading the JSON
+    body_text: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
 
 
+@event.listens_for(Comment, "before_insert")
+@event.listens_for(Comment, "before_update")
+def _sync_body_text(mapper, connection, target: Comment) -> None:
+    target.body_text = plain_text(target.body) or None
+
+
 # Tags are shared per workspace and can be attached to tasks and projects.
 class Tag(Base):
     __tablename__ = "tags"
@@ -208,7 +279,11 @@ class Tag(Base):
 
 class TaskTag(Base):
     __tablename__ = "task_tags"
-    __table_args__ = (UniqueConstraint("task_id", "tag_id", name="uq_task_tag"),)
+    __table_args__ = (
+        UniqueConstraint("task_id", "tag_id", name="uq_task_tag"),
+        # The primary key leads with task_id; tag search goes tag -> tasks
+        Index("ix_task_tags_tag_task", "tag_id", "task_id"),
+    )
 
     task_id: Mapped[str] = mapped_column(ForeignKey("tasks.id", ondelete="CASCADE"), primary_key=True)
     tag_id: Mapped[str] = mapped_column(ForeignKey("tags.id", ondelete="CASCADE"), primary_key=True)
@@ -220,3 +295,26 @@ class ProjectTag(Base):
 
     project_id: Mapped[str] = mapped_column(ForeignKey("projects.id", ondelete="CASCADE"), primary_key=True)
     tag_id: Mapped[str] = mapped_column(ForeignKey("tags.id", ondelete="CASCADE"), primary_key=True)
+
+
+# Version stamps for cacheable reads (see versions.py); bumped once per commit per key.
+class ChangeCounter(Base):
+    __tablename__ = "change_counters"
+
+    key: Mapped[str] = mapped_column(String(128), primary_key=True)
+    version: Mapped[int] = mapped_column(BigInteger, default=0)
+
+
+# Per-workspace change feed for reconnecting clients (see changelog.py). Every
+# row written by one commit shares that commit's `seq`; only ids are stored.
+class ChangeLogEntry(Base):
+    __tablename__ = "change_log"
+    __table_args__ = (Index("ix_change_log_workspace_seq", "workspace_id", "seq"),)
+
+    id: Mapped[int] = mapped_column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)
+    workspace_id: Mapped[str] = mapped_column(String)
+    seq: Mapped[int] = mapped_column(BigInteger)
+    entity: Mapped[str] = mapped_column(String(16))  # task/project/tag/comment
+    entity_id: Mapped[str] = mapped_column(String)
+    project_id: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    deleted: Mapped[bool] = mapped_column(Boolean, default=False)
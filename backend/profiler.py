@@ -0,0 +1,178 @@
+import logging
+import re
+import time
+from contextvars import ContextVar
+from threading import Lock
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+
+from .config import settings
+from .metrics import Histogram
+
+
+# Opt-in request profiling (settings.profiling_enabled). The middleware opens a
+# RequestProfile per HTTP request; cursor hooks on the engines add each
+# statement's time to whichever profile is current (sync handlers run in a
+# threadpool and async sessions in a greenlet, both inheriting the request's
+# context). Each response gets a Server-Timing header and each route template
+# gets latency/DB-time histograms; statements over slow_query_ms are logged
+# with their route whether or not they ran inside a request.
+
+logger = logging.getLogger(__name__)
+
+SERVER_TIMING_HEADER = "Server-Timing"
+
+_current: ContextVar[Optional["RequestProfile"]] = ContextVar("request_profile", default=None)
+_START = "profiler_query_start"
+
+
+class RequestProfile:
+    def __init__(self, scope: dict, keep: int) -> None:
+        self.scope = scope
+        self.keep = keep
+        self.statements = 0
+        self.db_ms = 0.0
+        # (ms, statement), slowest first
+        self.slowest: List[Tuple[float, str]] = []
+
+    @property
+    def route(self) -> str:
+        # FastAPI puts the matched route in the scope once routing has run
+        route = self.scope.get("route")
+        path = getattr(route, "path_format", None) or "<unmatched>"
+        return f"{self.scope['method']} {path}"
+
+    def add(self, ms: float, statement: str) -> None:
+        self.statements += 1
+        self.db_ms += ms
+        if self.keep and (len(self.slowest) < self.keep or ms > self.slowest[-1][0]):
+            self.slowest.append((ms, statement))
+            self.slowest.sort(key=lambda s: s[0], reverse=True)
+            del self.slowest[self.keep:]
+
+    def server_timing(self, app_ms: float) -> str:
+        parts = [f"app;dur={app_ms:.1f}", f'db;dur={self.db_ms:.1f};desc="{self.statements} queries"']
+        for i, (ms, statement) in enumerate(self.slowest, 1):
+            parts.append(f'sql{i};dur={ms:.1f};desc="{_describe(statement)}"')
+        return ", ".join(parts)
+
+
+def _describe(statement: str, width: int = 80) -> str:
+    # Header-safe: one line, no quotes or backslashes
+    text = re.sub(r"\s+", " ", statement).strip().replace('"', "").replace("\\", "")
+    return text if len(text) <= width else text[:width - 3] + "..."
+
+
+class _RouteStats:
+    def __init__(self) -> None:
+        self.latency_ms = Histogram()
+        self.db_ms = Histogram()
+        self.statements = 0
+        self.max_statements = 0
+        self.errors = 0
+
+    def snapshot(self) -> dict:
+        def summary(h: Histogram) -> dict:
+            return {k: v for k, v in h.snapshot().items() if k != "buckets"}
+
+        count = self.latency_ms.count
+        return {
+            "requests": count,
+            "errors": self.errors,
+            "latency_ms": summary(self.latency_ms),
+            "db_ms": summary(self.db_ms),
+            "statements": {
+                "total": self.statements,
+                "mean": round(self.statements / count, 2) if count else 0,
+                "max": self.max_statements,
+            },
+        }
+
+
+_routes: Dict[str, _RouteStats] = {}
+_routes_lock = Lock()
+
+
+def _observe(profile: RequestProfile, ms: float, status: int) -> None:
+    key = profile.route
+    with _routes_lock:
+        stats = _routes.get(key)
+        if stats is None:
+            stats = _routes[key] = _RouteStats()
+        stats.statements += profile.statements
+        stats.max_statements = max(stats.max_statements, profile.statements)
+        if status >= 500:
+            stats.errors += 1
+    stats.latency_ms.observe(ms)
+    stats.db_ms.observe(profile.db_ms)
+
+
+def route_stats() -> dict:
+    """Per-route aggregates keyed by "METHOD /path/{template}", busiest first."""
+    with _routes_lock:
+        items = list(_routes.items())
+    items.sort(key=lambda kv: kv[1].latency_ms.count, reverse=True)
+    return {key: stats.snapshot() for key, stats in items}
+
+
+class ProfilerMiddleware:
+    """ASGI middleware timing each HTTP request and its SQL (add with app.add_middleware)."""
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        profile = RequestProfile(scope, settings.profile_slowest_statements)
+        token = _current.set(profile)
+        t0 = time.perf_counter()
+        status = 500
+
+        async def send_timed(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                # Covers the handler up to the first byte; SQL after this (background
+                # tasks, streamed bodies) still counts towards the route's stats.
+                timing = profile.server_timing((time.perf_counter() - t0) * 1000)
+                message["headers"] = [*message.get("headers", []), (b"server-timing", timing.encode("latin-1"))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_timed)
+        finally:
+            _current.reset(token)
+            _observe(profile, (time.perf_counter() - t0) * 1000, status)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault(_START, []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    ms = (time.perf_counter() - conn.info[_START].pop()) * 1000
+    profile = _current.get()
+    if profile is not None:
+        profile.add(ms, statement)
+    if ms >= settings.slow_query_ms:
+        # Statement text only: parameters can hold credentials
+        logger.warning("slow query (%.1f ms) in %s: %s", ms, profile.route if profile else "-", statement)
+
+
+def _handle_error(context):
+    # after_cursor_execute never runs for a failed statement
+    if context.connection is not None:
+        starts = context.connection.info.get(_START)
+        if starts:
+            starts.pop()
+
+
+def instrument(*engines) -> None:
+    """Attach the statement timers to each sync Engine (pass async_engine.sync_engine)."""
+    for eng in engines:
+        if not event.contains(eng, "before_cursor_execute", _before_cursor_execute):
+            event.listen(eng, "before_cursor_execute", _before_cursor_execute)
+            event.listen(eng, "after_cursor_execute", _after_cursor_execute)
+            event.listen(eng, "handle_error", _handle_error)
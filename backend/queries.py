@@ -0,0 +1,233 @@
+import base64
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Optional, List
+
+from fastapi import HTTPException, Query
+from sqlalchemy import Select, select, tuple_, exists, and_, func, case, literal_column
+from sqlalchemy.orm import aliased
+
+from .models import Task, TaskAssignee, TaskTag, User, Tag
+
+
+DEFAULT_PAGE_SIZE = 200
+MAX_PAGE_SIZE = 1000
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+# ----- Keyset pagination on (created_at, id) -----
+
+def encode_cursor(created_at: datetime, id: str) -> str:
+    raw = f"{created_at.isoformat()}|{id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, str]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        ts, _, id = base64.urlsafe_b64decode(padded.encode()).decode().partition("|")
+        if not id:
+            raise ValueError(cursor)
+        return datetime.fromisoformat(ts), id
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def keyset_select(stmt: Select, created_col, id_col, cursor: Optional[str], limit: int, oldest_first: bool = False) -> Select:
+    """Seek past `cursor` and order newest-first (or oldest-first) on (created_at, id).
+
+    Fetches one extra row so keyset_split() can tell whether another page
+    exists; the cursor encodes the last row's (created_at, id) so the next
+    page seeks instead of offsetting.
+    """
+    key = tuple_(created_col, id_col)
+    if cursor:
+        seek = tuple_(*decode_cursor(cursor))
+        stmt = stmt.where(key > seek if oldest_first else key < seek)
+    if oldest_first:
+        return stmt.order_by(created_col.asc(), id_col.asc()).limit(limit + 1)
+    return stmt.order_by(created_col.desc(), id_col.desc()).limit(limit + 1)
+
+
+def keyset_split(rows, limit: int):
+    """Trim the probe row from a keyset_select() result; returns (rows, next_cursor)."""
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(last.created_at, last.id)
+
+
+def page_params(
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+):
+    return cursor, limit
+
+
+# ----- Task list filters -----
+
+@dataclass
+class TaskFilters:
+    status_ids: Optional[List[str]] = None
+    assignee_id: Optional[str] = None
+    priority: Optional[int] = None
+    is_completed: Optional[bool] = None
+    due_after: Optional[date] = None
+    due_before: Optional[date] = None
+
+
+def task_filters(
+    status_id: Optional[str] = None,  # comma-separated
+    assignee_id: Optional[str] = None,
+    priority: Optional[int] = Query(None, ge=0, le=3),
+    is_completed: Optional[bool] = None,
+    due_after: Optional[date] = None,
+    due_before: Optional[date] = None,
+) -> TaskFilters:
+    ids = [x for x in (status_id.split(',') if status_id else []) if x]
+    return TaskFilters(
+        status_ids=ids or None,
+        assignee_id=assignee_id,
+        priority=priority,
+        is_completed=is_completed,
+        due_after=due_after,
+        due_before=due_before,
+    )
+
+
+def apply_task_filters(stmt: Select, f: TaskFilters) -> Select:
+    if f.status_ids:
+        stmt = stmt.where(Task.status_id.in_(f.status_ids))
+    if f.assignee_id:
+        stmt = stmt.where(exists().where(and_(TaskAssignee.task_id == Task.id, TaskAssignee.user_id == f.assignee_id)))
+    if f.priority is not None:
+        stmt = stmt.where(Task.priority == f.priority)
+    if f.is_completed is not None:
+        stmt = stmt.where(Task.is_completed == f.is_completed)
+    if f.due_after is not None:
+        stmt = stmt.where(Task.due_date >= f.due_after)
+    if f.due_before is not None:
+        stmt = stmt.where(Task.due_date <= f.due_before)
+    return stmt
+
+
+def has_any_tag(tag_ids: List[str]):
+    """EXISTS filter: the task carries at least one of `tag_ids`."""
+    return exists().where(and_(TaskTag.task_id == Task.id, TaskTag.tag_id.in_(tag_ids)))
+
+
+def has_all_tags(tag_ids: List[str]):
+    """Semi-join filter: the task carries every one of `tag_ids`.
+
+    The subquery only touches task_tags through its (tag_id, task_id) index,
+    so it never joins back to tasks.
+    """
+    ids = list(dict.fromkeys(tag_ids))
+    if len(ids) == 1:
+        return has_any_tag(ids)
+    tagged = (
+        select(TaskTag.task_id)
+        .where(TaskTag.tag_id.in_(ids))
+        .group_by(TaskTag.task_id)
+        .having(func.count() == len(ids))
+    )
+    return Task.id.in_(tagged)
+
+
+# ----- Task trees (parent_id) -----
+
+MAX_TREE_DEPTH = 50
+
+
+def select_subtree(root_criteria, max_depth: int) -> Select:
+    """Tasks under the roots matching `root_criteria`, in one recursive query.
+
+    Rows are (Task, depth, descendants, completed_descendants), shallowest first.
+    Rows stop at `max_depth`, but the rolled-up counts cover each node's whole
+    subtree (to MAX_TREE_DEPTH), so a collapsed node can still show "3/10 done".
+    """
+    # Children only count inside their root's project, so a stale parent_id
+    # pointing across projects can't pull foreign tasks into the tree.
+    child = aliased(Task)
+    tree = select(
+        Task.id.label("id"), literal_column("0").label("depth"), Task.project_id.label("project_id")
+    ).where(*root_criteria).cte("tree", recursive=True)
+    up = tree.alias("tree_up")
+    tree = tree.union_all(
+        select(child.id, up.c.depth + 1, up.c.project_id)
+        .where(child.parent_id == up.c.id, child.project_id.is_not_distinct_from(up.c.project_id), up.c.depth < max_depth)
+    )
+
+    # (ancestor, descendant) pairs for every node in the tree
+    child = aliased(Task)
+    closure = select(
+        tree.c.id.label("ancestor"), tree.c.id.label("id"), literal_column("0").label("lvl"), tree.c.project_id
+    ).cte("closure", recursive=True)
+    up = closure.alias("closure_up")
+    closure = closure.union_all(
+        select(up.c.ancestor, child.id, up.c.lvl + 1, up.c.project_id)
+        .where(child.parent_id == up.c.id, child.project_id.is_not_distinct_from(up.c.project_id), up.c.lvl < MAX_TREE_DEPTH)
+    )
+    desc = aliased(Task)
+    counts = (
+        select(
+            closure.c.ancestor,
+            func.count().label("descendants"),
+            func.sum(case((desc.is_completed, 1), else_=0)).label("completed_descendants"),
+        )
+        .join(desc, desc.id == closure.c.id)
+        .where(closure.c.id != closure.c.ancestor)
+        .group_by(closure.c.ancestor)
+        .subquery("counts")
+    )
+    return (
+        select(
+            Task,
+            tree.c.depth,
+            func.coalesce(counts.c.descendants, 0),
+            func.coalesce(counts.c.completed_descendants, 0),
+        )
+        .join(tree, tree.c.id == Task.id)
+        .outerjoin(counts, counts.c.ancestor == Task.id)
+        .order_by(tree.c.depth, Task.created_at, Task.id)
+    )
+
+
+def select_lineage(task_id: str) -> Select:
+    """Ids of `task_id` and all its ancestors (UNION, so a bad cycle still terminates)."""
+    parent = aliased(Task)
+    chain = select(Task.id.label("id"), Task.parent_id.label("parent_id")).where(Task.id == task_id).cte("lineage", recursive=True)
+    up = chain.alias("lineage_up")
+    chain = chain.union(select(parent.id, parent.parent_id).where(parent.id == up.c.parent_id))
+    return select(chain.c.id)
+
+
+# ----- Batched loaders (one joined query instead of a db.get per link row) -----
+# These return statements so both the sync and async routers can execute them.
+
+def select_users_via(link, *criteria) -> Select:
+    """Users reached through a join table with a `user_id` column."""
+    return select(User).join(link, link.user_id == User.id).where(*criteria)
+
+
+def select_members_via(membership, *criteria) -> Select:
+    """(User, role) rows for a membership table."""
+    return select(User, membership.role).join(membership, membership.user_id == User.id).where(*criteria)
+
+
+def select_tags_via(link, *criteria) -> Select:
+    """Tags reached through a join table with a `tag_id` column."""
+    return select(Tag).join(link, link.tag_id == Tag.id).where(*criteria).order_by(Tag.name)
+
+
+def insert_ignore(dialect_name: str, model, *conflict_columns: str):
+    """INSERT that skips rows hitting the unique key on `conflict_columns` (ON CONFLICT DO NOTHING).
+
+    Execute with a list of row dicts; a concurrent insert of the same key is not an error.
+    """
+    if dialect_name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(model).on_conflict_do_nothing(index_elements=list(conflict_columns))
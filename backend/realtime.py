@@ -1,16 +1,256 @@
-from typing import Dict, Set
+import asyncio
+import itertools
+import time
+from typing import Awaitable, Callable, Dict, Optional, Set
 from fastapi import WebSocket
 from asyncio import Lock
 
+import orjson
+
+from .config import settings
+
+
+# deliver(channel, text): `text` is the event already encoded as JSON, so a
+# message is serialized once per process no matter how many sockets watch it.
+Deliver = Callable[[str, str], Awaitable[None]]
+
+
+# Messages serialized by this process, reported by WSManager.stats(); it
+# should grow by one per broadcast however many sockets receive it.
+encoded_messages = 0
+
+
+def dumps(message: dict) -> bytes:
+    global encoded_messages
+    encoded_messages += 1
+    return orjson.dumps(message)
+
+
+def encode(message: dict) -> str:
+    return dumps(message).decode()
+
+
+class Broker:
+    """Carries broadcasts between processes.
+
+    publish() hands a message to every process; each process's manager gets it
+    back through the `deliver` callback and fans out to its own sockets.
+    subscribe/unsubscribe are called when a channel gains its first or loses
+    its last local socket, so brokers only receive channels someone watches.
+    """
+
+    async def start(self, deliver: Deliver) -> None:
+        self.deliver = deliver
+
+    async def stop(self) -> None:
+        pass
+
+    async def publish(self, channel: str, message: dict) -> None:
+        raise NotImplementedError
+
+    async def subscribe(self, channel: str) -> None:
+        pass
+
+    async def unsubscribe(self, channel: str) -> None:
+        pass
+
+
+class InMemoryBroker(Broker):
+    """Single-process delivery: publish goes straight to local sockets."""
+
+    async def publish(self, channel: str, message: dict) -> None:
+        await self.deliver(channel, encode(message))
+
+
+class RedisBroker(Broker):
+    """Redis pub/sub backplane for running several workers or nodes.
+
+    Pass `client` to use an already-configured redis.asyncio client (or a
+    compatible stand-in such as fakeredis in local testing).
+    """
+
+    prefix = "chronic:"
+    # Keeps the pubsub connection open before any socket subscribes
+    control_channel = "chronic:__control__"
+
+    def __init__(self, url: Optional[str] = None, client=None) -> None:
+        if client is None:
+            try:
+                import redis.asyncio as aioredis
+            except ImportError:  # pragma: no cover - optional dependency
+                raise RuntimeError("REALTIME_BROKER=redis requires the 'redis' package")
+            client = aioredis.from_url(url or settings.redis_url)
+        self.client = client
+        self.pubsub = None
+        self._reader: Optional[asyncio.Task] = None
+
+    async def start(self, deliver: Deliver) -> None:
+        await super().start(deliver)
+        self.pubsub = self.client.pubsub()
+        await self.pubsub.subscribe(self.control_channel)
+        self._reader = asyncio.create_task(self._read())
+
+    async def stop(self) -> None:
+        if self._reader:
+            self._reader.cancel()
+            try:
+                await self._reader
+            except asyncio.CancelledError:
+                pass
+            self._reader = None
+        if self.pubsub is not None:
+            await self.pubsub.aclose()
+            self.pubsub = None
+        await self.client.aclose()
+
+    async def publish(self, channel: str, message: dict) -> None:
+        await self.client.publish(self.prefix + channel, dumps(message))
+
+    async def subscribe(self, channel: str) -> None:
+        await self.pubsub.subscribe(self.prefix + channel)
+
+    async def unsubscribe(self, channel: str) -> None:
+        await self.pubsub.unsubscribe(self.prefix + channel)
+
+    async def _read(self) -> None:
+        while True:
+            try:
+                msg = await self.pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                if not msg or msg.get("type") != "message":
+                    continue
+                name = msg["channel"]
+                name = name.decode() if isinstance(name, bytes) else name
+                if name == self.control_channel:
+                    continue
+                data = msg["data"]
+                await self.deliver(name[len(self.prefix):], data.decode() if isinstance(data, bytes) else data)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # Keep reading; a bad payload or a blip on the connection must not end delivery
+                await asyncio.sleep(0.1)
+
+
+def make_broker() -> Broker:
+    if settings.realtime_broker == "redis":
+        return RedisBroker(settings.redis_url)
+    return InMemoryBroker()
+
+
+class Connection:
+    """One socket plus its bounded outbound queue, drained by a writer task.
+
+    Producers only enqueue, so a slow client backs up its own queue instead of
+    stalling delivery to everyone else on the channel.
+    """
+
+    _ids = itertools.count(1)
+
+    def __init__(self, ws: WebSocket, maxsize: int, on_error: Callable[[WebSocket], Awaitable[None]]) -> None:
+        self.id = next(self._ids)
+        self.ws = ws
+        self.queue: "asyncio.Queue[tuple[float, str]]" = asyncio.Queue(maxsize=maxsize)
+        self.on_error = on_error
+        self.sent = 0
+        self.dropped = 0
+        self.lag_ms = 0.0
+        self.max_lag_ms = 0.0
+        self.writer = asyncio.create_task(self._write())
+
+    def offer(self, text: str, policy: str) -> bool:
+        """Queue pre-encoded JSON; False means the queue is full and the policy is to disconnect."""
+        try:
+            self.queue.put_nowait((time.monotonic(), text))
+            return True
+        except asyncio.QueueFull:
+            if policy != "drop_oldest":
+                return False
+        self.queue.get_nowait()
+        self.dropped += 1
+        self.queue.put_nowait((time.monotonic(), text))
+        return True
+
+    async def _write(self) -> None:
+        try:
+            while True:
+                queued_at, text = await self.queue.get()
+                await self.ws.send_text(text)
+                self.sent += 1
+                # Lag = time the message spent waiting behind this client's backlog
+                self.lag_ms = (time.monotonic() - queued_at) * 1000
+                self.max_lag_ms = max(self.max_lag_ms, self.lag_ms)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            # Broken socket: drop it from every channel
+            await self.on_error(self.ws)
+
+    def stats(self) -> dict:
+        return {
+            "id": self.id,
+            "queued": self.queue.qsize(),
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "lag_ms": round(self.lag_ms, 3),
+            "max_lag_ms": round(self.max_lag_ms, 3),
+        }
+
 
 class WSManager:
-    def __init__(self) -> None:
+    def __init__(self, broker: Optional[Broker] = None) -> None:
         self.channels: Dict[str, Set[WebSocket]] = {}
+        self.connections: Dict[WebSocket, Connection] = {}
         self.lock = Lock()
+        self.broker = broker or InMemoryBroker()
+        self.queue_size = settings.ws_send_queue_size
+        self.overflow_policy = settings.ws_overflow_policy
+        self.disconnects_on_overflow = 0
+        self._started = False
+        self._start_lock = Lock()
+
+    async def start(self) -> None:
+        if self._started:
+            return
+        async with self._start_lock:
+            if not self._started:
+                await self.broker.start(self._deliver)
+                self._started = True
+
+    async def stop(self) -> None:
+        async with self._start_lock:
+            if self._started:
+                await self.broker.stop()
+                self._started = False
+
+    def connect(self, ws: WebSocket) -> Connection:
+        conn = self.connections.get(ws)
+        if conn is None:
+            conn = self.connections[ws] = Connection(ws, self.queue_size, self.disconnect)
+        return conn
+
+    async def disconnect(self, ws: WebSocket):
+        """Forget a socket: leave all its channels and stop its writer."""
+        for channel, conns in list(self.channels.items()):
+            if ws in conns:
+                await self.unsubscribe(channel, ws)
+        conn = self.connections.pop(ws, None)
+        if conn and conn.writer is not asyncio.current_task():
+            conn.writer.cancel()
+
+    async def send(self, ws: WebSocket, message: dict):
+        """Send to one socket through its queue (keeps writes ordered with broadcasts)."""
+        if not self.connect(ws).offer(encode(message), self.overflow_policy):
+            await self._overflowed(ws)
 
     async def subscribe(self, channel: str, ws: WebSocket):
+        await self.start()
+        self.connect(ws)
         async with self.lock:
-            self.channels.setdefault(channel, set()).add(ws)
+            conns = self.channels.setdefault(channel, set())
+            first = not conns
+            conns.add(ws)
+            if first:
+                await self.broker.subscribe(channel)
 
     async def unsubscribe(self, channel: str, ws: WebSocket):
         async with self.lock:
@@ -19,16 +259,44 @@ class WSManager:
                 conns.remove(ws)
                 if not conns:
                     self.channels.pop(channel, None)
+                    await self.broker.unsubscribe(channel)
 
     async def broadcast(self, channel: str, message: dict):
-        conns = list(self.channels.get(channel, set()))
-        for ws in conns:
-            try:
-                await ws.send_json(message)
-            except Exception:
-                # Drop broken sockets silently
-                await self.unsubscribe(channel, ws)
+        await self.start()
+        await self.broker.publish(channel, message)
+
+    async def _deliver(self, channel: str, text: str):
+        # Enqueue only; each connection's writer sends concurrently
+        overflowed = []
+        for ws in list(self.channels.get(channel, ())):
+            conn = self.connections.get(ws)
+            if conn and not conn.offer(text, self.overflow_policy):
+                overflowed.append(ws)
+        for ws in overflowed:
+            await self._overflowed(ws)
+
+    async def _overflowed(self, ws: WebSocket):
+        self.disconnects_on_overflow += 1
+        await self.disconnect(ws)
+        try:
+            # 1013: try again later; the client reconnects and refetches
+            await ws.close(code=1013)
+        except Exception:
+            pass
 
+    def stats(self) -> dict:
+        conns = [c.stats() for c in self.connections.values()]
+        return {
+            "broker": type(self.broker).__name__,
+            "channels": len(self.channels),
+            "connections": len(conns),
+            "overflow_policy": self.overflow_policy,
+            "disconnects_on_overflow": self.disconnects_on_overflow,
+            "encoded_messages": encoded_messages,
+            "dropped": sum(c["dropped"] for c in conns),
+            "max_lag_ms": max((c["max_lag_ms"] for c in conns), default=0.0),
+            "per_connection": conns,
+        }
 
-manager = WSManager()
 
+manager = WSManager(make_broker())
@@ -1,4 +1,4 @@
-from . import auth, orgs, projects, tasks, comments, realtime, tags
+from . import auth, orgs, projects, tasks, comments, realtime, tags, search, sync
 
 __all__ = [
     "auth",
@@ -8,4 +8,6 @@ __all__ = [
     "comments",
     "realtime",
     "tags",
+    "search",
+    "sync",
 ]
@@ -1,12 +1,13 @@
 from fastapi import APIRouter, Depends, Response, HTTPException
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
 from ..db import engine
 from ..models import Base, User, Organization, OrgMembership
 from ..schemas import AuthSignupIn, AuthLoginIn, UserOut, OrganizationOut, SessionOut, MeUpdateIn
-from ..auth import hash_password, verify_password, create_token
-from ..deps import get_db, get_current_user, get_current_org
+from ..auth import hash_password_async, verify_and_update_async, create_token
+from ..deps import get_db, get_async_db, get_current_user, get_current_org, invalidate_principal
 
 
 router = APIRouter(prefix="/auth", tags=["auth"])
@@ -16,15 +17,16 @@ router = APIRouter(prefix="/auth", tags=["auth"])
 
 
 @router.post("/signup", response_model=SessionOut)
-def signup(data: AuthSignupIn, response: Response, db: Session = Depends(get_db)):
-    exists = db.execute(select(User).where(User.email == data.email.lower())).scalar_one_or_none()
+async def signup(data: AuthSignupIn, response: Response, db: AsyncSession = Depends(get_async_db)):
+    exists = (await db.execute(select(User.id).where(User.email == data.email.lower()))).scalar_one_or_none()
     if exists:
+        # Invited accounts included: claiming one needs an invite token or email check, not just the address
         raise HTTPException(status_code=400, detail="Email already in use")
 
     display_name = f"{data.first_name} {data.last_name}".strip()
     user = User(
         email=data.email.lower(),
-        password_hash=hash_password(data.password),
+        password_hash=await hash_password_async(data.password),
         first_name=data.first_name,
         last_name=data.last_name,
         display_name=display_name or data.first_name or data.last_name or data.email.split('@')[0],
@@ -35,9 +37,10 @@ def signup(data: AuthSignupIn, response: Response, db: Session = Depends(get_db)
     org_label = (data.first_name or display_name or data.email.split('@')[0]).split(' ')[0]
     org = Organization(name=f"{org_label}'s Org", primary_domain=None)
     db.add(org)
-    db.flush()
+    await db.flush()
     db.add(OrgMembership(org_id=org.id, user_id=user.id, role="owner"))
-    db.commit()
+    await db.commit()
+    invalidate_principal(user.id)
 
     access = create_token(user.id, scope="access")
     response.set_cookie("access_token", access, httponly=True, samesite="lax")
@@ -45,15 +48,22 @@ def signup(data: AuthSignupIn, response: Response, db: Session = Depends(get_db)
 
 
 @router.post("/login", response_model=SessionOut)
-def login(data: AuthLoginIn, response: Response, db: Session = Depends(get_db)):
-    user = db.execute(select(User).where(User.email == data.email.lower())).scalar_one_or_none()
-    if not user or not verify_password(data.password, user.password_hash):
+async def login(data: AuthLoginIn, response: Response, db: AsyncSession = Depends(get_async_db)):
+    user = (await db.execute(select(User).where(User.email == data.email.lower()))).scalar_one_or_none()
+    if not user:
+        raise HTTPException(status_code=400, detail="Invalid credentials")
+    ok, new_hash = await verify_and_update_async(data.password, user.password_hash)
+    if not ok:
         raise HTTPException(status_code=400, detail="Invalid credentials")
     # pick first org membership
-    mem = db.execute(select(OrgMembership).where(OrgMembership.user_id == user.id)).scalar_one_or_none()
+    mem = (await db.execute(select(OrgMembership).where(OrgMembership.user_id == user.id).limit(1))).scalar_one_or_none()
     if not mem:
         raise HTTPException(status_code=400, detail="User not in org")
-    org = db.get(Organization, mem.org_id)
+    org = await db.get(Organization, mem.org_id)
+    if new_hash:
+        # Stored at an old cost factor: upgrade it while we have the plaintext
+        user.password_hash = new_hash
+        await db.commit()
     access = create_token(user.id, scope="access")
     response.set_cookie("access_token", access, httponly=True, samesite="lax")
     return SessionOut(user=user, org=org)
@@ -107,4 +117,5 @@ def update_me(
         db.add(user)
         db.commit()
         db.refresh(user)
+        invalidate_principal(user.id)
     return UserOut.model_validate(user)
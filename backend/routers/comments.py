@@ -1,29 +1,90 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from sqlalchemy import select
+from typing import Literal
 
-from ..deps import get_current_user, get_current_org, get_db
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func
+
+from ..deps import get_current_user, get_current_org, get_async_db
 from ..models import Comment, Task
-from ..schemas import CommentCreateIn, CommentOut
+from ..schemas import CommentCreateIn, CommentOut, CommentCountsIn
+from ..changelog import record
+from ..queries import page_params, keyset_select, keyset_split, NEXT_CURSOR_HEADER
 
 
 router = APIRouter(prefix="/comments", tags=["comments"])
 
+PREVIEW_CHARS = 280
+
+
+async def _check_task(db: AsyncSession, task_id: str, org_id: str):
+    # Only the scope columns; the task row's description isn't needed here
+    task = (await db.execute(select(Task.org_id, Task.workspace_id, Task.project_id).where(Task.id == task_id))).one_or_none()
+    if not task or task.org_id != org_id:
+        raise HTTPException(status_code=404, detail="Task not found")
+    return task
+
 
-@router.get("/task/{task_id}", response_model=list[CommentOut])
-def list_comments(task_id: str, db: Session = Depends(get_db)):
-    items = db.execute(select(Comment).where(Comment.task_id == task_id).order_by(Comment.created_at)).scalars().all()
+@router.get("/task/{task_id}", response_model=list[CommentOut], response_model_exclude_none=True)
+async def list_comments(
+    task_id: str,
+    response: Response,
+    order: Literal["oldest", "newest"] = "oldest",
+    body: Literal["full", "preview", "none"] = "full",
+    page: tuple = Depends(page_params),
+    db: AsyncSession = Depends(get_async_db),
+    org=Depends(get_current_org),
+):
+    await _check_task(db, task_id, org.id)
+    cursor, limit = page
+    cols = [Comment.id, Comment.task_id, Comment.author_id, Comment.created_at]
+    if body == "full":
+        cols.append(Comment.body)
+    elif body == "preview":
+        # One extra character tells us whether the text was cut
+        cols.append(func.substr(Comment.body_text, 1, PREVIEW_CHARS + 1).label("preview"))
+    stmt = keyset_select(
+        select(*cols).where(Comment.task_id == task_id), Comment.created_at, Comment.id, cursor, limit,
+        oldest_first=order == "oldest",
+    )
+    rows, next_cursor = keyset_split((await db.execute(stmt)).all(), limit)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    items = [r._asdict() for r in rows]
+    if body == "preview":
+        for item in items:
+            text = item["preview"]
+            if text and len(text) > PREVIEW_CHARS:
+                item["preview"] = text[:PREVIEW_CHARS].rstrip() + "…"
     return items
 
 
-@router.post("/task/{task_id}", response_model=CommentOut)
-def create_comment(task_id: str, data: CommentCreateIn, db: Session = Depends(get_db), user=Depends(get_current_user), org=Depends(get_current_org)):
-    task = db.get(Task, task_id)
-    if not task or task.org_id != org.id:
-        raise HTTPException(status_code=404, detail="Task not found")
+@router.post("/counts", response_model=dict[str, int])
+async def count_comments(body: CommentCountsIn, db: AsyncSession = Depends(get_async_db), org=Depends(get_current_org)):
+    if not body.task_ids:
+        return {}
+    # Grouped count over ix_comments_task_created; no comment rows are loaded
+    scoped = select(Task.id).where(Task.id.in_(body.task_ids), Task.org_id == org.id)
+    counts = dict((await db.execute(
+        select(Comment.task_id, func.count()).where(Comment.task_id.in_(scoped)).group_by(Comment.task_id)
+    )).all())
+    return {tid: counts.get(tid, 0) for tid in body.task_ids}
+
+
+@router.get("/{comment_id}", response_model=CommentOut, response_model_exclude_none=True)
+async def get_comment(comment_id: str, db: AsyncSession = Depends(get_async_db), org=Depends(get_current_org)):
+    c = await db.get(Comment, comment_id)
+    if not c or c.org_id != org.id:
+        raise HTTPException(status_code=404, detail="Comment not found")
+    return c
+
+
+@router.post("/task/{task_id}", response_model=CommentOut, response_model_exclude_none=True)
+async def create_comment(task_id: str, data: CommentCreateIn, db: AsyncSession = Depends(get_async_db), user=Depends(get_current_user), org=Depends(get_current_org)):
+    task = await _check_task(db, task_id, org.id)
     c = Comment(org_id=org.id, task_id=task_id, author_id=user.id, body=data.body)
     db.add(c)
-    db.commit()
-    db.refresh(c)
+    await db.flush()
+    record(db, "comment", [c.id], task.workspace_id, task.project_id)
+    await db.commit()
+    await db.refresh(c)
     return c
-
@@ -1,11 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.orm import Session
 from sqlalchemy import select
 
-from ..deps import get_current_user, get_current_org, get_db
+from ..deps import get_current_user, get_current_org, get_db, invalidate_principal
 from ..models import Workspace, WorkspaceMembership, User, OrgMembership
-from ..schemas import WorkspaceCreateIn, WorkspaceOut, WorkspaceMemberOut, WorkspaceMemberAddIn, UserOut
-from ..auth import hash_password
+from ..schemas import WorkspaceCreateIn, WorkspaceOut, WorkspaceMemberOut, WorkspaceMemberAddIn, WorkspaceMembersBulkIn, MembersBulkOut, UserOut
+from ..auth import UNUSABLE_PASSWORD
+from ..queries import select_members_via, insert_ignore
+from ..versions import check_etag_sync, touch
 
 
 router = APIRouter(prefix="/orgs", tags=["orgs"])
@@ -13,9 +15,14 @@ router = APIRouter(prefix="/orgs", tags=["orgs"])
 
 @router.get("/current/workspaces", response_model=list[WorkspaceOut])
 def list_workspaces(
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     org=Depends(get_current_org),
 ):
+    not_modified = check_etag_sync(db, request, response, f"workspaces:org:{org.id}")
+    if not_modified:
+        return not_modified
     wss = db.execute(select(Workspace).where(Workspace.org_id == org.id)).scalars().all()
     return wss
 
@@ -31,6 +38,7 @@ def create_workspace(
     db.add(ws)
     db.flush()
     db.add(WorkspaceMembership(workspace_id=ws.id, user_id=user.id, role="admin"))
+    touch(db, f"workspaces:org:{org.id}")
     db.commit()
     db.refresh(ws)
     return ws
@@ -41,13 +49,8 @@ def list_workspace_members(workspace_id: str, db: Session = Depends(get_db), org
     ws = db.get(Workspace, workspace_id)
     if not ws or ws.org_id != org.id:
         raise HTTPException(status_code=404, detail="Workspace not found")
-    memberships = db.execute(select(WorkspaceMembership).where(WorkspaceMembership.workspace_id == workspace_id)).scalars().all()
-    results: list[WorkspaceMemberOut] = []
-    for m in memberships:
-        u = db.get(User, m.user_id)
-        if u:
-            results.append(WorkspaceMemberOut(user=UserOut.model_validate(u), role=m.role))
-    return results
+    rows = db.execute(select_members_via(WorkspaceMembership, WorkspaceMembership.workspace_id == workspace_id)).all()
+    return [WorkspaceMemberOut(user=UserOut.model_validate(u), role=role) for u, role in rows]
 
 
 @router.post("/workspaces/{workspace_id}/members", response_model=WorkspaceMemberOut)
@@ -81,7 +84,8 @@ def add_workspace_member(
             last = ' '.join(parts[1:]) if len(parts) > 1 else None
             user = User(
                 email=data.email.lower(),
-                password_hash=hash_password("invite-" + workspace_id),
+                # Can't log in until a claim flow (invite token or email check) exists
+                password_hash=UNUSABLE_PASSWORD,
                 first_name=first,
                 last_name=last,
                 display_name=display_name,
@@ -91,7 +95,8 @@ def add_workspace_member(
 
     # Ensure user is in org
     om = db.execute(select(OrgMembership).where(OrgMembership.org_id == org.id, OrgMembership.user_id == user.id)).scalar_one_or_none()
-    if not om:
+    org_joined = om is None
+    if org_joined:
         db.add(OrgMembership(org_id=org.id, user_id=user.id, role="member"))
 
     # Ensure workspace membership
@@ -101,9 +106,84 @@ def add_workspace_member(
         db.add(existing)
 
     db.commit()
+    if org_joined:
+        invalidate_principal(user.id)
     return WorkspaceMemberOut(user=UserOut.model_validate(user), role=existing.role)
 
 
+def bulk_summary(results: list) -> dict:
+    """MembersBulkOut payload: per-row results plus a count per status."""
+    summary: dict = {}
+    for r in results:
+        summary[r["status"]] = summary.get(r["status"], 0) + 1
+    return {"results": results, "summary": summary}
+
+
+@router.post("/workspaces/{workspace_id}/members/bulk", response_model=MembersBulkOut)
+def add_workspace_members_bulk(
+    workspace_id: str,
+    data: WorkspaceMembersBulkIn,
+    db: Session = Depends(get_db),
+    org=Depends(get_current_org),
+):
+    """add_workspace_member for many rows: a fixed handful of set-based queries however many there are."""
+    ws = db.get(Workspace, workspace_id)
+    if not ws or ws.org_id != org.id:
+        raise HTTPException(status_code=404, detail="Workspace not found")
+    dialect = db.get_bind().dialect.name
+    rows = [(m.user_id, m.email.lower() if m.email else None, m) for m in data.members]
+
+    ids = {uid for uid, _, _ in rows if uid}
+    emails = {email for uid, email, _ in rows if email and not uid}
+    known_ids = set(db.execute(select(User.id).where(User.id.in_(ids))).scalars()) if ids else set()
+    by_email = dict(db.execute(select(User.email, User.id).where(User.email.in_(emails))).all()) if emails else {}
+    invited = {}
+    for uid, email, m in rows:
+        if email and not uid and email not in by_email and email not in invited:
+            name = m.display_name or email.split("@")[0]
+            parts = [p for p in name.split(" ") if p]
+            invited[email] = {
+                "email": email,
+                # Can't log in until a claim flow (invite token or email check) exists
+                "password_hash": UNUSABLE_PASSWORD,
+                "first_name": parts[0] if parts else name,
+                "last_name": " ".join(parts[1:]) or None,
+                "display_name": name,
+            }
+    if invited:
+        db.execute(insert_ignore(dialect, User.__table__, "email"), list(invited.values()))
+        # Re-read: a concurrent invite may have created some of them first
+        by_email.update(db.execute(select(User.email, User.id).where(User.email.in_(list(invited)))).all())
+
+    user_ids = known_ids | {by_email[e] for e in emails if e in by_email}
+    in_org = set(db.execute(select(OrgMembership.user_id).where(OrgMembership.org_id == org.id, OrgMembership.user_id.in_(user_ids))).scalars())
+    in_ws = set(db.execute(select(WorkspaceMembership.user_id).where(WorkspaceMembership.workspace_id == workspace_id, WorkspaceMembership.user_id.in_(user_ids))).scalars())
+    if user_ids - in_org:
+        db.execute(insert_ignore(dialect, OrgMembership.__table__, "org_id", "user_id"),
+                   [{"org_id": org.id, "user_id": u, "role": "member"} for u in sorted(user_ids - in_org)])
+    if user_ids - in_ws:
+        db.execute(insert_ignore(dialect, WorkspaceMembership.__table__, "workspace_id", "user_id"),
+                   [{"workspace_id": workspace_id, "user_id": u, "role": data.role} for u in sorted(user_ids - in_ws)])
+    db.commit()
+    for u in user_ids - in_org:
+        invalidate_principal(u)
+
+    results, seen = [], set()
+    for uid, email, _ in rows:
+        user_id = uid if uid else by_email.get(email)
+        if not uid and not email:
+            status = "invalid"
+        elif uid and uid not in known_ids:
+            status = "not_found"
+        elif user_id in seen:
+            status = "duplicate"
+        else:
+            seen.add(user_id)
+            status = "already_member" if user_id in in_ws else "invited" if email in invited and not uid else "added"
+        results.append({"user_id": user_id, "email": email, "status": status})
+    return bulk_summary(results)
+
+
 @router.delete("/workspaces/{workspace_id}/members/{user_id}")
 def remove_workspace_member(workspace_id: str, user_id: str, db: Session = Depends(get_db), org=Depends(get_current_org)):
     ws = db.get(Workspace, workspace_id)
@@ -1,11 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
-from ..deps import get_current_user, get_current_org, get_db
-from ..models import Project, Workspace, ProjectStatus, ProjectMembership, WorkspaceMembership, User, Tag, ProjectTag
-from ..schemas import ProjectCreateIn, ProjectOut, ProjectStatusOut, ProjectMemberOut, ProjectMemberAddIn, UserOut, TagOut
-from ..realtime import manager
+from ..deps import get_current_user, get_current_org, get_async_db
+from ..models import Project, Task, TaskTag, TaskAssignee, Workspace, ProjectStatus, ProjectMembership, WorkspaceMembership, User, Tag, ProjectTag
+from ..schemas import ProjectCreateIn, ProjectOut, ProjectStatusOut, ProjectMemberOut, ProjectMemberRefOut, ProjectMemberAddIn, ProjectMembersBulkIn, MembersBulkOut, ProjectSnapshotOut, UserOut, TagOut
+from ..events import emit
+from ..queries import TaskFilters, task_filters, apply_task_filters, page_params, keyset_select, keyset_split, NEXT_CURSOR_HEADER, select_members_via, select_tags_via, insert_ignore
+from ..versions import check_etag, touch, touch_tasks
+from ..changelog import current_seq, record
+from .orgs import bulk_summary
 
 
 router = APIRouter(prefix="/projects", tags=["projects"])
@@ -21,183 +25,256 @@ def default_statuses(project_id: str):
 
 
 @router.get("/workspace/{workspace_id}", response_model=list[ProjectOut])
-def list_projects(workspace_id: str, db: Session = Depends(get_db), org=Depends(get_current_org)):
+async def list_projects(workspace_id: str, db: AsyncSession = Depends(get_async_db), org=Depends(get_current_org)):
     # org guard implicit in dev
-    projects = db.execute(select(Project).where(Project.workspace_id == workspace_id)).scalars().all()
+    projects = (await db.execute(select(Project).where(Project.workspace_id == workspace_id))).scalars().all()
     return projects
 
 
 @router.post("/workspace/{workspace_id}", response_model=ProjectOut)
-def create_project(
+async def create_project(
     workspace_id: str,
     data: ProjectCreateIn,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user=Depends(get_current_user),
     org=Depends(get_current_org),
 ):
-    ws = db.get(Workspace, workspace_id)
+    ws = await db.get(Workspace, workspace_id)
     if not ws or ws.org_id != org.id:
         raise HTTPException(status_code=404, detail="Workspace not found")
 
     prj = Project(org_id=org.id, workspace_id=workspace_id, name=data.name, visibility=data.visibility, created_by=user.id)
     db.add(prj)
-    db.flush()
+    await db.flush()
     for st in default_statuses(prj.id):
         db.add(st)
-    db.commit()
-    db.refresh(prj)
+    touch(db, f"statuses:project:{prj.id}")
+    record(db, "project", [prj.id], workspace_id, prj.id)
     # Notify
-    try:
-        import anyio
-        anyio.from_thread.run(manager.broadcast, f"workspace:{workspace_id}", {"type": "project.created", "project": ProjectOut.model_validate(prj).model_dump()})
-    except Exception:
-        pass
+    emit(db, f"workspace:{workspace_id}", {"type": "project.created", "project": ProjectOut.model_validate(prj).model_dump()})
+    await db.commit()
+    await db.refresh(prj)
     return prj
 
 
 @router.get("/{project_id}/statuses", response_model=list[ProjectStatusOut])
-def get_statuses(project_id: str, db: Session = Depends(get_db)):
-    sts = db.execute(select(ProjectStatus).where(ProjectStatus.project_id == project_id).order_by(ProjectStatus.position)).scalars().all()
+async def get_statuses(project_id: str, request: Request, response: Response, db: AsyncSession = Depends(get_async_db), org=Depends(get_current_org)):
+    prj = await db.get(Project, project_id)
+    if not prj or prj.org_id != org.id:
+        raise HTTPException(status_code=404, detail="Project not found")
+    not_modified = await check_etag(db, request, response, f"statuses:project:{project_id}")
+    if not_modified:
+        return not_modified
+    sts = (await db.execute(select(ProjectStatus).where(ProjectStatus.project_id == project_id).order_by(ProjectStatus.position))).scalars().all()
     return sts
 
 
+@router.get("/{project_id}/snapshot", response_model=ProjectSnapshotOut, response_model_exclude_unset=True)
+async def get_project_snapshot(
+    project_id: str,
+    response: Response,
+    filters: TaskFilters = Depends(task_filters),
+    page: tuple = Depends(page_params),
+    db: AsyncSession = Depends(get_async_db),
+    org=Depends(get_current_org),
+):
+    """Everything a board needs to render, in one request per page of tasks."""
+    prj = await db.get(Project, project_id)
+    if not prj or prj.org_id != org.id:
+        raise HTTPException(status_code=404, detail="Project not found")
+    cursor, limit = page
+    out: dict = {}
+    tags: dict = {}
+    users: dict = {}
+    if cursor is None:
+        # Read before the tasks so replaying from it can only repeat changes, never skip them
+        out["seq"] = await current_seq(db, prj.workspace_id)
+        out["project"] = prj
+        out["statuses"] = (await db.execute(select(ProjectStatus).where(ProjectStatus.project_id == project_id).order_by(ProjectStatus.position))).scalars().all()
+        members = (await db.execute(select_members_via(ProjectMembership, ProjectMembership.project_id == project_id))).all()
+        out["members"] = [ProjectMemberRefOut(user_id=u.id, role=role) for u, role in members]
+        users.update((u.id, u) for u, _ in members)
+        project_tags = (await db.execute(select_tags_via(ProjectTag, ProjectTag.project_id == project_id))).scalars().all()
+        out["project_tag_ids"] = [t.id for t in project_tags]
+        tags.update((t.id, t) for t in project_tags)
+
+    stmt = keyset_select(
+        apply_task_filters(select(Task).where(Task.project_id == project_id, Task.org_id == org.id), filters),
+        Task.created_at, Task.id, cursor, limit,
+    )
+    tasks, next_cursor = keyset_split((await db.execute(stmt)).scalars().all(), limit)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    ids = [t.id for t in tasks]
+    task_tags: dict = {i: [] for i in ids}
+    task_assignees: dict = {i: [] for i in ids}
+    if ids:
+        for task_id, tag in (await db.execute(
+            select(TaskTag.task_id, Tag).join(Tag, Tag.id == TaskTag.tag_id).where(TaskTag.task_id.in_(ids)).order_by(Tag.name)
+        )).all():
+            task_tags[task_id].append(tag.id)
+            tags[tag.id] = tag
+        for task_id, user in (await db.execute(
+            select(TaskAssignee.task_id, User).join(User, User.id == TaskAssignee.user_id).where(TaskAssignee.task_id.in_(ids))
+        )).all():
+            task_assignees[task_id].append(user.id)
+            users[user.id] = user
+    out.update(tasks=tasks, task_tags=task_tags, task_assignees=task_assignees, tags=list(tags.values()), users=list(users.values()))
+    return out
+
+
 @router.get("/{project_id}/members", response_model=list[ProjectMemberOut])
-def list_project_members(project_id: str, db: Session = Depends(get_db), org=Depends(get_current_org)):
-    prj = db.get(Project, project_id)
+async def list_project_members(project_id: str, db: AsyncSession = Depends(get_async_db), org=Depends(get_current_org)):
+    prj = await db.get(Project, project_id)
     if not prj or prj.org_id != org.id:
         raise HTTPException(status_code=404, detail="Project not found")
-    memberships = db.execute(select(ProjectMembership).where(ProjectMembership.project_id == project_id)).scalars().all()
-    results: list[ProjectMemberOut] = []
-    for m in memberships:
-        u = db.get(User, m.user_id)
-        if u:
-            results.append(ProjectMemberOut(user=UserOut.model_validate(u), role=m.role))
-    return results
+    rows = (await db.execute(select_members_via(ProjectMembership, ProjectMembership.project_id == project_id))).all()
+    return [ProjectMemberOut(user=UserOut.model_validate(u), role=role) for u, role in rows]
 
 
 @router.post("/{project_id}/members", response_model=ProjectMemberOut)
-def add_project_member(
+async def add_project_member(
     project_id: str,
     data: ProjectMemberAddIn,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     org=Depends(get_current_org),
 ):
-    prj = db.get(Project, project_id)
+    prj = await db.get(Project, project_id)
     if not prj or prj.org_id != org.id:
         raise HTTPException(status_code=404, detail="Project not found")
-    user = db.get(User, data.user_id)
+    user = await db.get(User, data.user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
     # Ensure workspace membership so they’re discoverable for tagging
-    ws_mem = db.execute(select(WorkspaceMembership).where(WorkspaceMembership.workspace_id == prj.workspace_id, WorkspaceMembership.user_id == user.id)).scalar_one_or_none()
+    ws_mem = (await db.execute(select(WorkspaceMembership).where(WorkspaceMembership.workspace_id == prj.workspace_id, WorkspaceMembership.user_id == user.id))).scalar_one_or_none()
     if not ws_mem:
         ws_mem = WorkspaceMembership(workspace_id=prj.workspace_id, user_id=user.id, role="member")
         db.add(ws_mem)
 
     # Ensure project membership
-    existing = db.execute(select(ProjectMembership).where(ProjectMembership.project_id == project_id, ProjectMembership.user_id == user.id)).scalar_one_or_none()
+    existing = (await db.execute(select(ProjectMembership).where(ProjectMembership.project_id == project_id, ProjectMembership.user_id == user.id))).scalar_one_or_none()
     if not existing:
         existing = ProjectMembership(project_id=project_id, user_id=user.id, role="editor")
         db.add(existing)
 
-    db.commit()
+    await db.commit()
     return ProjectMemberOut(user=UserOut.model_validate(user), role=existing.role)
 
 
+@router.post("/{project_id}/members/bulk", response_model=MembersBulkOut)
+async def add_project_members_bulk(
+    project_id: str,
+    data: ProjectMembersBulkIn,
+    db: AsyncSession = Depends(get_async_db),
+    org=Depends(get_current_org),
+):
+    prj = await db.get(Project, project_id)
+    if not prj or prj.org_id != org.id:
+        raise HTTPException(status_code=404, detail="Project not found")
+    dialect = db.get_bind().dialect.name
+    ids = set(data.user_ids)
+    known = set((await db.execute(select(User.id).where(User.id.in_(ids)))).scalars())
+    in_prj = set((await db.execute(
+        select(ProjectMembership.user_id).where(ProjectMembership.project_id == project_id, ProjectMembership.user_id.in_(known))
+    )).scalars())
+    # Same side effect as adding one member: they must be able to see the workspace
+    if known:
+        await db.execute(insert_ignore(dialect, WorkspaceMembership.__table__, "workspace_id", "user_id"),
+                         [{"workspace_id": prj.workspace_id, "user_id": u, "role": "member"} for u in sorted(known)])
+    if known - in_prj:
+        await db.execute(insert_ignore(dialect, ProjectMembership.__table__, "project_id", "user_id"),
+                         [{"project_id": project_id, "user_id": u, "role": data.role} for u in sorted(known - in_prj)])
+    await db.commit()
+
+    results, seen = [], set()
+    for uid in data.user_ids:
+        if uid not in known:
+            status = "not_found"
+        elif uid in seen:
+            status = "duplicate"
+        else:
+            seen.add(uid)
+            status = "already_member" if uid in in_prj else "added"
+        results.append({"user_id": uid, "status": status})
+    return bulk_summary(results)
+
+
 @router.delete("/{project_id}/members/{user_id}")
-def remove_project_member(project_id: str, user_id: str, db: Session = Depends(get_db), org=Depends(get_current_org)):
-    prj = db.get(Project, project_id)
+async def remove_project_member(project_id: str, user_id: str, db: AsyncSession = Depends(get_async_db), org=Depends(get_current_org)):
+    prj = await db.get(Project, project_id)
     if not prj or prj.org_id != org.id:
         raise HTTPException(status_code=404, detail="Project not found")
-    mem = db.execute(select(ProjectMembership).where(ProjectMembership.project_id == project_id, ProjectMembership.user_id == user_id)).scalar_one_or_none()
+    mem = (await db.execute(select(ProjectMembership).where(ProjectMembership.project_id == project_id, ProjectMembership.user_id == user_id))).scalar_one_or_none()
     if not mem:
         raise HTTPException(status_code=404, detail="Membership not found")
-    db.delete(mem)
-    db.commit()
+    await db.delete(mem)
+    await db.commit()
     return {"ok": True}
 
 
 # ----- Project Tags -----
 
 @router.get("/{project_id}/tags", response_model=list[TagOut])
-def list_project_tags(project_id: str, db: Session = Depends(get_db), org=Depends(get_current_org)):
-    prj = db.get(Project, project_id)
+async def list_project_tags(project_id: str, db: AsyncSession = Depends(get_async_db), org=Depends(get_current_org)):
+    prj = await db.get(Project, project_id)
     if not prj or prj.org_id != org.id:
         raise HTTPException(status_code=404, detail="Project not found")
-    joins = db.execute(select(ProjectTag).where(ProjectTag.project_id == project_id)).scalars().all()
-    tags: list[Tag] = []
-    for j in joins:
-        t = db.get(Tag, j.tag_id)
-        if t:
-            tags.append(t)
-    return tags
+    return (await db.execute(select_tags_via(ProjectTag, ProjectTag.project_id == project_id))).scalars().all()
 
 
 @router.post("/{project_id}/tags", response_model=list[TagOut])
-def add_project_tag(project_id: str, body: dict, db: Session = Depends(get_db), org=Depends(get_current_org)):
-    prj = db.get(Project, project_id)
+async def add_project_tag(project_id: str, body: dict, db: AsyncSession = Depends(get_async_db), org=Depends(get_current_org)):
+    prj = await db.get(Project, project_id)
     if not prj or prj.org_id != org.id:
         raise HTTPException(status_code=404, detail="Project not found")
     tag_id = body.get("tag_id")
     if not tag_id:
         raise HTTPException(status_code=400, detail="tag_id required")
-    tag = db.get(Tag, tag_id)
+    tag = await db.get(Tag, tag_id)
     if not tag or tag.org_id != org.id or tag.workspace_id != prj.workspace_id:
         raise HTTPException(status_code=404, detail="Tag not found in this workspace")
-    existing = db.execute(select(ProjectTag).where(ProjectTag.project_id == project_id, ProjectTag.tag_id == tag.id)).scalar_one_or_none()
+    existing = (await db.execute(select(ProjectTag).where(ProjectTag.project_id == project_id, ProjectTag.tag_id == tag.id))).scalar_one_or_none()
     if not existing:
         db.add(ProjectTag(project_id=project_id, tag_id=tag.id))
-        db.commit()
         # Notify project subscribers
-        try:
-            import anyio
-            anyio.from_thread.run(manager.broadcast, f"project:{project_id}", {"type": "project.tag.added", "tag": TagOut.model_validate(tag).model_dump()})
-        except Exception:
-            pass
-    joins = db.execute(select(ProjectTag).where(ProjectTag.project_id == project_id)).scalars().all()
-    out: list[Tag] = []
-    for j in joins:
-        t = db.get(Tag, j.tag_id)
-        if t:
-            out.append(t)
-    return out
+        emit(db, f"project:{project_id}", {"type": "project.tag.added", "tag": TagOut.model_validate(tag).model_dump()})
+        await db.commit()
+    return (await db.execute(select_tags_via(ProjectTag, ProjectTag.project_id == project_id))).scalars().all()
 
 
 @router.delete("/{project_id}/tags/{tag_id}")
-def remove_project_tag(project_id: str, tag_id: str, db: Session = Depends(get_db), org=Depends(get_current_org)):
-    prj = db.get(Project, project_id)
+async def remove_project_tag(project_id: str, tag_id: str, db: AsyncSession = Depends(get_async_db), org=Depends(get_current_org)):
+    prj = await db.get(Project, project_id)
     if not prj or prj.org_id != org.id:
         raise HTTPException(status_code=404, detail="Project not found")
-    assoc = db.execute(select(ProjectTag).where(ProjectTag.project_id == project_id, ProjectTag.tag_id == tag_id)).scalar_one_or_none()
+    assoc = (await db.execute(select(ProjectTag).where(ProjectTag.project_id == project_id, ProjectTag.tag_id == tag_id))).scalar_one_or_none()
     if not assoc:
         raise HTTPException(status_code=404, detail="Tag not attached")
-    db.delete(assoc)
-    db.commit()
-    try:
-        import anyio
-        anyio.from_thread.run(manager.broadcast, f"project:{project_id}", {"type": "project.tag.removed", "id": tag_id})
-    except Exception:
-        pass
+    await db.delete(assoc)
+    emit(db, f"project:{project_id}", {"type": "project.tag.removed", "id": tag_id})
+    await db.commit()
     return {"ok": True}
 
 
 @router.delete("/{project_id}")
-def delete_project(project_id: str, db: Session = Depends(get_db), org=Depends(get_current_org)):
-    prj = db.get(Project, project_id)
+async def delete_project(project_id: str, db: AsyncSession = Depends(get_async_db), org=Depends(get_current_org)):
+    prj = await db.get(Project, project_id)
     if not prj or prj.org_id != org.id:
         raise HTTPException(status_code=404, detail="Project not found")
     workspace_id = prj.workspace_id
-    db.delete(prj)
-    db.commit()
+    task_ids = (await db.execute(select(Task.id).where(Task.project_id == project_id))).scalars().all()
+    await db.delete(prj)
+    # Its tasks go with it (ON DELETE CASCADE)
+    touch_tasks(db, workspace_id, project_id)
+    touch(db, f"statuses:project:{project_id}")
+    record(db, "task", task_ids, workspace_id, project_id, deleted=True)
+    record(db, "project", [project_id], workspace_id, project_id, deleted=True)
     # Notify interested clients
-    try:
-        import anyio
-        payload = {"type": "project.deleted", "id": project_id}
-        # Broadcast to the workspace channel so lists can update
-        anyio.from_thread.run(manager.broadcast, f"workspace:{workspace_id}", payload)
-        # Broadcast to the project channel so open views can react
-        anyio.from_thread.run(manager.broadcast, f"project:{project_id}", payload)
-    except Exception:
-        pass
+    payload = {"type": "project.deleted", "id": project_id}
+    # Broadcast to the workspace channel so lists can update
+    emit(db, f"workspace:{workspace_id}", payload)
+    # Broadcast to the project channel so open views can react
+    emit(db, f"project:{project_id}", payload)
+    await db.commit()
     return {"ok": True}
@@ -1,25 +1,55 @@
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect
 from ..realtime import manager
+from ..db import AsyncSessionLocal
+from ..deps import get_current_user, get_current_org
+from ..changelog import changes_since
+from ..schemas import SyncOut
+from .sync import resolve_scope
 
 
 router = APIRouter(tags=["realtime"]) 
 
 
+async def _resume(ws: WebSocket, channel: str, since) -> None:
+    """Replay what a reconnecting client missed on `channel` as `sync` messages."""
+    kind, _, ident = channel.partition(":")
+    try:
+        if kind not in ("workspace", "project") or not isinstance(since, int) or since < 0:
+            raise HTTPException(status_code=400, detail="Can't resume this channel")
+        async with AsyncSessionLocal() as db:
+            user = await get_current_user(db, ws.cookies.get("access_token"))
+            org = await get_current_org(db, user)
+            workspace_id, project_id = await resolve_scope(
+                db, org.id, ident if kind == "workspace" else None, ident if kind == "project" else None,
+            )
+            while True:
+                delta = await changes_since(db, workspace_id, since, project_id)
+                await manager.send(ws, {"type": "sync", "channel": channel, **SyncOut.model_validate(delta).model_dump()})
+                if not delta["has_more"]:
+                    break
+                since = delta["seq"]
+    except HTTPException as e:
+        await manager.send(ws, {"type": "sync.error", "channel": channel, "detail": e.detail})
+
+
 @router.websocket("/ws")
 async def ws_endpoint(ws: WebSocket):
     await ws.accept()
+    manager.connect(ws)
     try:
         while True:
             data = await ws.receive_json()
             if "subscribe" in data:
+                # Subscribe first so nothing committed while replaying falls in the gap
                 await manager.subscribe(data["subscribe"], ws)
-                await ws.send_json({"type": "subscribed", "channel": data["subscribe"]})
+                await manager.send(ws, {"type": "subscribed", "channel": data["subscribe"]})
+                if data.get("resume_from") is not None:
+                    await _resume(ws, data["subscribe"], data["resume_from"])
             elif "unsubscribe" in data:
                 await manager.unsubscribe(data["unsubscribe"], ws)
-                await ws.send_json({"type": "unsubscribed", "channel": data["unsubscribe"]})
+                await manager.send(ws, {"type": "unsubscribed", "channel": data["unsubscribe"]})
     except WebSocketDisconnect:
-        # Clean up: remove from all channels
-        for channel, conns in list(manager.channels.items()):
-            if ws in conns:
-                await manager.unsubscribe(channel, ws)
-
+        pass
+    finally:
+        # Clean up: remove from all channels and stop the writer
+        await manager.disconnect(ws)
@@ -0,0 +1,100 @@
+import base64
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func, or_, and_, case, cast, literal, literal_column, tuple_, BigInteger
+
+from ..deps import get_current_org, get_async_db
+from ..models import Task
+from ..schemas import TaskOut
+from ..queries import TaskFilters, task_filters, apply_task_filters, has_any_tag, page_params, keyset_select, keyset_split, NEXT_CURSOR_HEADER
+
+
+router = APIRouter(prefix="/search", tags=["search"])
+
+
+def _encode_rank_cursor(rank: int, created_at: datetime, id: str) -> str:
+    raw = f"{rank}|{created_at.isoformat()}|{id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_rank_cursor(cursor: str) -> tuple[int, datetime, str]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        rank, ts, id = base64.urlsafe_b64decode(padded.encode()).decode().split("|", 2)
+        return int(rank), datetime.fromisoformat(ts), id
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _match_and_rank(dialect: str, q: str):
+    """WHERE clause and integer relevance score for query text `q`."""
+    if dialect == "postgresql":
+        # Full-text over the generated search_vector (name weighted above
+        # description) plus pg_trgm similarity so typos in names still hit.
+        vec = literal_column("tasks.search_vector")
+        tsq = func.websearch_to_tsquery("simple", q)
+        match = or_(vec.op("@@")(tsq), Task.name.op("%")(q))
+        score = func.ts_rank_cd(vec, tsq) + func.similarity(Task.name, q)
+        # Integer rank keeps keyset comparisons exact
+        return match, cast(func.round(score * 1_000_000), BigInteger)
+    # Portable fallback (SQLite): every term must appear in name or description;
+    # name hits rank above description hits.
+    name = func.lower(Task.name)
+    desc = func.lower(func.coalesce(Task.description_text, ""))
+    terms = q.lower().split()
+    match = and_(*[or_(name.contains(t, autoescape=True), desc.contains(t, autoescape=True)) for t in terms])
+    score = literal(0)
+    for t in terms:
+        score = score + case((name.contains(t, autoescape=True), 2), else_=0) + case((desc.contains(t, autoescape=True), 1), else_=0)
+    return match, score
+
+
+@router.get("", response_model=list[TaskOut])
+async def search_tasks(
+    response: Response,
+    q: Optional[str] = None,
+    workspace_id: Optional[str] = None,
+    project_id: Optional[str] = None,
+    tag_ids: Optional[str] = None,  # comma-separated, any-of
+    filters: TaskFilters = Depends(task_filters),
+    page: tuple = Depends(page_params),
+    db: AsyncSession = Depends(get_async_db),
+    org=Depends(get_current_org),
+):
+    """Ranked task search across the org; without `q` it lists matches newest first.
+
+    Paginate by passing the X-Next-Cursor response header back as ?cursor=.
+    """
+    cursor, limit = page
+    conds = [Task.org_id == org.id]
+    if workspace_id:
+        conds.append(Task.workspace_id == workspace_id)
+    if project_id:
+        conds.append(Task.project_id == project_id)
+    tags = [x for x in (tag_ids.split(',') if tag_ids else []) if x]
+    if tags:
+        conds.append(has_any_tag(tags))
+    q = (q or "").strip()
+
+    if not q:
+        stmt = keyset_select(apply_task_filters(select(Task).where(*conds), filters), Task.created_at, Task.id, cursor, limit)
+        items, next_cursor = keyset_split((await db.execute(stmt)).scalars().all(), limit)
+    else:
+        match, rank = _match_and_rank(db.bind.dialect.name, q)
+        stmt = apply_task_filters(select(Task, rank.label("rank")).where(*conds, match), filters)
+        if cursor:
+            c_rank, c_at, c_id = _decode_rank_cursor(cursor)
+            stmt = stmt.where(tuple_(rank, Task.created_at, Task.id) < tuple_(c_rank, c_at, c_id))
+        stmt = stmt.order_by(rank.desc(), Task.created_at.desc(), Task.id.desc()).limit(limit + 1)
+        rows = (await db.execute(stmt)).all()
+        items = [t for t, _ in rows[:limit]]
+        next_cursor = None
+        if len(rows) > limit:
+            last, last_rank = rows[limit - 1]
+            next_cursor = _encode_rank_cursor(last_rank, last.created_at, last.id)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return items
@@ -0,0 +1,39 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..deps import get_current_org, get_async_db
+from ..models import Project, Workspace
+from ..schemas import SyncOut
+from ..changelog import DEFAULT_LIMIT, changes_since
+
+
+router = APIRouter(prefix="/sync", tags=["sync"])
+
+
+async def resolve_scope(db: AsyncSession, org_id: str, workspace_id: Optional[str], project_id: Optional[str]) -> tuple:
+    """(workspace_id, project_id) after checking both belong to the org; 404 otherwise."""
+    if project_id:
+        prj = await db.get(Project, project_id)
+        if not prj or prj.org_id != org_id or (workspace_id and prj.workspace_id != workspace_id):
+            raise HTTPException(status_code=404, detail="Project not found")
+        return prj.workspace_id, prj.id
+    ws = await db.get(Workspace, workspace_id) if workspace_id else None
+    if not ws or ws.org_id != org_id:
+        raise HTTPException(status_code=404, detail="Workspace not found")
+    return ws.id, None
+
+
+@router.get("", response_model=SyncOut)
+async def sync(
+    workspace_id: Optional[str] = None,
+    project_id: Optional[str] = None,
+    since: Optional[int] = Query(None, ge=0),
+    limit: int = Query(DEFAULT_LIMIT, ge=1, le=5000),
+    db: AsyncSession = Depends(get_async_db),
+    org=Depends(get_current_org),
+):
+    """Changes in a workspace (or one project) after `since`; omit `since` to get the current position."""
+    workspace_id, project_id = await resolve_scope(db, org.id, workspace_id, project_id)
+    return await changes_since(db, workspace_id, since, project_id, limit)
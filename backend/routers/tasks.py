@@ -1,39 +1,79 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, UploadFile, File
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import select, func
+from sqlalchemy import select, update, delete, insert, or_
 from datetime import datetime
+from typing import Literal, Optional
 
-from ..deps import get_current_user, get_current_org, get_db
-from ..models import Task, Project, ProjectStatus, Workspace, TaskAssignee, User, ProjectMembership, WorkspaceMembership, Tag, TaskTag, ProjectTag
-from ..schemas import TaskCreateIn, TaskUpdateIn, TaskOut, TaskAssigneeOut, TaskAssigneeAddIn, UserOut, TagOut, TaskTagsBatchIn
-from ..realtime import manager
+from ..deps import get_current_user, get_current_org, get_db, get_async_db
+from ..models import Task, Project, ProjectStatus, Workspace, TaskAssignee, TaskDependency, User, ProjectMembership, WorkspaceMembership, Tag, TaskTag, ProjectTag
+from ..schemas import TaskCreateIn, TaskUpdateIn, TaskBulkIn, TaskBulkOut, TaskImportOut, TaskOut, TaskTreeNodeOut, TaskDependencyIn, TaskDependencyOut, TaskAssigneeOut, TaskAssigneeAddIn, UserOut, TagOut, TaskTagsBatchIn
+from ..events import Event, dispatcher, emit
+from ..exporter import MEDIA_TYPES as EXPORT_MEDIA_TYPES, export_tasks
+from ..scheduler import Schedule, creates_cycle, roll_forward
+from ..versions import check_etag, touch_tasks
+from ..changelog import record, record_task_move
+from ..importer import ImportFileError, ImportReport, detect_format, import_tasks
+from ..queries import TaskFilters, task_filters, apply_task_filters, page_params, keyset_select, keyset_split, NEXT_CURSOR_HEADER, select_users_via, select_tags_via, has_any_tag, has_all_tags, select_subtree, select_lineage, MAX_TREE_DEPTH
 
 
 router = APIRouter(prefix="/tasks", tags=["tasks"])
 
 
+async def _list_page(db: AsyncSession, stmt, filters: TaskFilters, page: tuple, response: Response):
+    cursor, limit = page
+    stmt = keyset_select(apply_task_filters(stmt, filters), Task.created_at, Task.id, cursor, limit)
+    items, next_cursor = keyset_split((await db.execute(stmt)).scalars().all(), limit)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return items
+
+
 @router.get("/project/{project_id}", response_model=list[TaskOut])
-def list_tasks(project_id: str, db: Session = Depends(get_db)):
-    tasks = db.execute(select(Task).where(Task.project_id == project_id).order_by(Task.created_at.desc())).scalars().all()
-    return tasks
+async def list_tasks(
+    project_id: str,
+    request: Request,
+    response: Response,
+    filters: TaskFilters = Depends(task_filters),
+    page: tuple = Depends(page_params),
+    db: AsyncSession = Depends(get_async_db),
+    org=Depends(get_current_org),
+):
+    # Newest first; pass the X-Next-Cursor header back as ?cursor= for the next page
+    not_modified = await check_etag(db, request, response, f"tasks:project:{project_id}")
+    if not_modified:
+        return not_modified
+    stmt = select(Task).where(Task.project_id == project_id, Task.org_id == org.id)
+    return await _list_page(db, stmt, filters, page, response)
+
+
+async def _check_parent(db: AsyncSession, parent_id: str, org_id: str, workspace_id: str, project_id: Optional[str]) -> None:
+    # Subtasks live next to their parent: same org, workspace and project
+    parent = (await db.execute(select(Task.org_id, Task.workspace_id, Task.project_id).where(Task.id == parent_id))).one_or_none()
+    if not parent or tuple(parent) != (org_id, workspace_id, project_id):
+        raise HTTPException(status_code=404, detail="Parent task not found in this project")
 
 
 @router.post("/project/{project_id}", response_model=TaskOut)
-def create_task(
+async def create_task(
     project_id: str,
     data: TaskCreateIn,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user=Depends(get_current_user),
     org=Depends(get_current_org),
 ):
-    prj = db.get(Project, project_id)
+    prj = await db.get(Project, project_id)
     if not prj or prj.org_id != org.id:
         raise HTTPException(status_code=404, detail="Project not found")
+    if data.parent_id:
+        await _check_parent(db, data.parent_id, org.id, prj.workspace_id, prj.id)
     task = Task(
         id=None,
         org_id=org.id,
         workspace_id=prj.workspace_id,
         project_id=project_id,
+        parent_id=data.parent_id,
         name=data.name,
         status_id=data.status_id,
         priority=data.priority,
@@ -41,43 +81,117 @@ def create_task(
         created_by=user.id,
     )
     db.add(task)
-    db.commit()
-    db.refresh(task)
-    # Broadcast
-    try:
-        import anyio
-        payload = {"type": "task.created", "task": TaskOut.model_validate(task).model_dump()}
-        anyio.from_thread.run(manager.broadcast, f"project:{project_id}", payload)
-    except Exception:
-        pass
+    await db.flush()
+    touch_tasks(db, prj.workspace_id, project_id)
+    record(db, "task", [task.id], prj.workspace_id, project_id)
+    emit(db, f"project:{project_id}", {"type": "task.created", "task": TaskOut.model_validate(task).model_dump()})
+    await db.commit()
+    await db.refresh(task)
     return task
 
 
+@router.post("/project/{project_id}/import", response_model=TaskImportOut)
+def import_project_tasks(
+    project_id: str,
+    file: UploadFile = File(...),
+    format: Optional[Literal["csv", "jsonl"]] = None,
+    db: Session = Depends(get_db),
+    user=Depends(get_current_user),
+    org=Depends(get_current_org),
+):
+    # Sync on purpose: parsing and batched inserts run in the threadpool, off the event loop
+    prj = db.get(Project, project_id)
+    if not prj or prj.org_id != org.id:
+        raise HTTPException(status_code=404, detail="Project not found")
+    channel = f"project:{project_id}"
+
+    def progress(report: ImportReport) -> None:
+        # Not tied to the transaction: this only tells watchers how far along the import is
+        dispatcher.submit([Event(channel, {"type": "import.progress", "imported": report.imported, "skipped": report.skipped})])
+
+    try:
+        report = import_tasks(db, prj, user.id, file.file, format or detect_format(file.filename), on_progress=progress)
+    except ImportFileError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    emit(db, channel, {"type": "tasks.imported", "count": report.imported})
+    db.commit()
+    return report.as_dict()
+
+
 @router.get("/workspace/{workspace_id}", response_model=list[TaskOut])
-def list_workspace_tasks(workspace_id: str, db: Session = Depends(get_db), org=Depends(get_current_org)):
-    items = db.execute(select(Task).where(Task.workspace_id == workspace_id).order_by(Task.created_at.desc())).scalars().all()
-    return items
+async def list_workspace_tasks(
+    workspace_id: str,
+    request: Request,
+    response: Response,
+    filters: TaskFilters = Depends(task_filters),
+    page: tuple = Depends(page_params),
+    db: AsyncSession = Depends(get_async_db),
+    org=Depends(get_current_org),
+):
+    not_modified = await check_etag(db, request, response, f"tasks:workspace:{workspace_id}")
+    if not_modified:
+        return not_modified
+    stmt = select(Task).where(Task.workspace_id == workspace_id, Task.org_id == org.id)
+    return await _list_page(db, stmt, filters, page, response)
+
+
+def _export_response(name: str, format: str, **scope) -> StreamingResponse:
+    fmt = "jsonl" if format == "ndjson" else format
+    return StreamingResponse(
+        export_tasks(fmt=fmt, **scope),
+        media_type=EXPORT_MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{name}.{fmt}"'},
+    )
+
+
+@router.get("/workspace/{workspace_id}/export")
+async def export_workspace_tasks(
+    workspace_id: str,
+    format: Literal["csv", "jsonl", "ndjson"] = "jsonl",
+    db: AsyncSession = Depends(get_async_db),
+    org=Depends(get_current_org),
+):
+    ws = await db.get(Workspace, workspace_id)
+    if not ws or ws.org_id != org.id:
+        raise HTTPException(status_code=404, detail="Workspace not found")
+    return _export_response(f"workspace-{workspace_id}", format, org_id=org.id, workspace_id=workspace_id)
+
+
+@router.get("/project/{project_id}/export")
+async def export_project_tasks(
+    project_id: str,
+    format: Literal["csv", "jsonl", "ndjson"] = "jsonl",
+    db: AsyncSession = Depends(get_async_db),
+    org=Depends(get_current_org),
+):
+    prj = await db.get(Project, project_id)
+    if not prj or prj.org_id != org.id:
+        raise HTTPException(status_code=404, detail="Project not found")
+    return _export_response(f"project-{project_id}", format, org_id=org.id, project_id=project_id)
 
 
 @router.post("/workspace/{workspace_id}", response_model=TaskOut)
-def create_workspace_task(
+async def create_workspace_task(
     workspace_id: str,
     data: TaskCreateIn,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user=Depends(get_current_user),
     org=Depends(get_current_org),
 ):
-    ws = db.get(Workspace, workspace_id)
+    ws = await db.get(Workspace, workspace_id)
     if not ws or ws.org_id != org.id:
         raise HTTPException(status_code=404, detail="Workspace not found")
-    prj = db.get(Project, data.project_id) if data.project_id else None
+    prj = await db.get(Project, data.project_id) if data.project_id else None
     if prj and prj.org_id != org.id:
         raise HTTPException(status_code=404, detail="Project not found")
+    if data.parent_id:
+        await _check_parent(db, data.parent_id, org.id, workspace_id, prj.id if prj else None)
     task = Task(
         id=None,
         org_id=org.id,
         workspace_id=workspace_id,
         project_id=prj.id if prj else None,
+        parent_id=data.parent_id,
         name=data.name,
         status_id=data.status_id,
         priority=data.priority,
@@ -85,38 +199,55 @@ def create_workspace_task(
         created_by=user.id,
     )
     db.add(task)
-    db.commit()
-    db.refresh(task)
-    try:
-        import anyio
-        if task.project_id:
-            anyio.from_thread.run(manager.broadcast, f"project:{task.project_id}", {"type": "task.created", "task": TaskOut.model_validate(task).model_dump()})
-    except Exception:
-        pass
+    await db.flush()
+    touch_tasks(db, workspace_id, task.project_id)
+    record(db, "task", [task.id], workspace_id, task.project_id)
+    if task.project_id:
+        emit(db, f"project:{task.project_id}", {"type": "task.created", "task": TaskOut.model_validate(task).model_dump()})
+    await db.commit()
+    await db.refresh(task)
     return task
 
 
+async def _detach_children(db: AsyncSession, parent_ids, keep=()) -> None:
+    """Make the subtasks of `parent_ids` top-level in one UPDATE (moved or deleted parents).
+
+    `keep` are tasks moving along with their parent; they stay nested.
+    """
+    stmt = update(Task).where(Task.parent_id.in_(list(parent_ids)))
+    if keep:
+        stmt = stmt.where(Task.id.not_in(list(keep)))
+    ids = (await db.execute(stmt.values(parent_id=None).returning(Task.id).execution_options(synchronize_session=False))).scalars().all()
+    if not ids:
+        return
+    children = (await db.execute(select(Task).where(Task.id.in_(ids)).execution_options(populate_existing=True))).scalars().all()
+    for c in children:
+        touch_tasks(db, c.workspace_id, c.project_id)
+        record(db, "task", [c.id], c.workspace_id, c.project_id)
+        emit(db, f"project:{c.project_id}", {"type": "task.updated", "task": TaskOut.model_validate(c).model_dump()}, key=f"task:{c.id}")
+
+
 @router.patch("/{task_id}", response_model=TaskOut)
-def update_task(
+async def update_task(
     task_id: str,
     data: TaskUpdateIn,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user=Depends(get_current_user),
     org=Depends(get_current_org),
 ):
-    task = db.get(Task, task_id)
+    task = await db.get(Task, task_id)
     if not task or task.org_id != org.id:
         raise HTTPException(status_code=404, detail="Task not found")
-    old_project_id = task.project_id
+    old_project_id, old_workspace_id = task.project_id, task.workspace_id
     # Handle project move
     if data.project_id is not None and data.project_id != task.project_id:
-        new_prj = db.get(Project, data.project_id)
+        new_prj = await db.get(Project, data.project_id)
         if not new_prj or new_prj.org_id != org.id:
             raise HTTPException(status_code=404, detail="Project not found")
         task.project_id = new_prj.id
         task.workspace_id = new_prj.workspace_id
         # Ensure status is valid in target project
-        target_statuses = db.execute(select(ProjectStatus).where(ProjectStatus.project_id == new_prj.id).order_by(ProjectStatus.position)).scalars().all()
+        target_statuses = (await db.execute(select(ProjectStatus).where(ProjectStatus.project_id == new_prj.id).order_by(ProjectStatus.position))).scalars().all()
         target_ids = {s.id for s in target_statuses}
         if data.status_id is not None and data.status_id in target_ids:
             task.status_id = data.status_id
@@ -124,6 +255,20 @@ def update_task(
             # default to first status if current status invalid for new project
             if target_statuses:
                 task.status_id = target_statuses[0].id
+    if data.parent_id is not None:
+        if data.parent_id == "":
+            task.parent_id = None
+        elif data.parent_id != task.parent_id:
+            await _check_parent(db, data.parent_id, org.id, task.workspace_id, task.project_id)
+            if task.id in (await db.execute(select_lineage(data.parent_id))).scalars().all():
+                raise HTTPException(status_code=400, detail="A task can't be nested under itself or its subtasks")
+            task.parent_id = data.parent_id
+    elif data.project_id is not None and data.project_id != old_project_id:
+        # The parent stays behind in the old project
+        task.parent_id = None
+    if data.project_id is not None and data.project_id != old_project_id:
+        # ...and so do this task's subtasks
+        await _detach_children(db, [task.id])
     if data.name is not None:
         task.name = data.name
     if data.status_id is not None:
@@ -135,200 +280,423 @@ def update_task(
         task.completed_at = datetime.utcnow() if data.is_completed else None
     if data.due_date is not None:
         task.due_date = data.due_date
+    if data.start_date is not None:
+        task.start_date = data.start_date
+    if data.end_date is not None:
+        task.end_date = data.end_date
     if data.description is not None:
         task.description = data.description
-    db.commit()
-    db.refresh(task)
+    if any(v is not None for v in (data.start_date, data.end_date, data.due_date, data.is_completed)):
+        await db.flush()
+        result = await _reschedule(db, [task.id], skip={task.id})
+        if task.id in result.updated:
+            await db.refresh(task)
+    touch_tasks(db, task.workspace_id, old_project_id, task.project_id)
+    if old_workspace_id != task.workspace_id:
+        touch_tasks(db, old_workspace_id)
+    record_task_move(db, task.id, old_workspace_id, old_project_id, task.workspace_id, task.project_id)
+    # If moved, notify old project as deletion and new as creation for simpler client handling
+    if data.project_id is not None and data.project_id != old_project_id:
+        emit(db, f"project:{old_project_id}", {"type": "task.deleted", "id": task_id})
+        emit(db, f"project:{task.project_id}", {"type": "task.created", "task": TaskOut.model_validate(task).model_dump()})
+    else:
+        emit(db, f"project:{task.project_id}", {"type": "task.updated", "task": TaskOut.model_validate(task).model_dump()}, key=f"task:{task.id}")
+    await db.commit()
+    await db.refresh(task)
     # If moved into a project, grant existing assignees access to the project and workspace
     if data.project_id is not None and data.project_id != old_project_id and task.project_id:
-        assignees = db.execute(select(TaskAssignee).where(TaskAssignee.task_id == task.id)).scalars().all()
+        assignees = (await db.execute(select(TaskAssignee).where(TaskAssignee.task_id == task.id))).scalars().all()
         for a in assignees:
             # Ensure workspace membership
-            ws_mem = db.execute(select(WorkspaceMembership).where(WorkspaceMembership.workspace_id == task.workspace_id, WorkspaceMembership.user_id == a.user_id)).scalar_one_or_none()
+            ws_mem = (await db.execute(select(WorkspaceMembership).where(WorkspaceMembership.workspace_id == task.workspace_id, WorkspaceMembership.user_id == a.user_id))).scalar_one_or_none()
             if not ws_mem:
                 db.add(WorkspaceMembership(workspace_id=task.workspace_id, user_id=a.user_id, role="member"))
             # Ensure project membership
-            pm = db.execute(select(ProjectMembership).where(ProjectMembership.project_id == task.project_id, ProjectMembership.user_id == a.user_id)).scalar_one_or_none()
+            pm = (await db.execute(select(ProjectMembership).where(ProjectMembership.project_id == task.project_id, ProjectMembership.user_id == a.user_id))).scalar_one_or_none()
             if not pm:
                 db.add(ProjectMembership(project_id=task.project_id, user_id=a.user_id, role="editor"))
-        db.commit()
-    # Broadcast
-    try:
-        import anyio
-        # If moved, notify old project as deletion and new as creation for simpler client handling
-        if data.project_id is not None and data.project_id != old_project_id:
-            anyio.from_thread.run(manager.broadcast, f"project:{old_project_id}", {"type": "task.deleted", "id": task_id})
-            anyio.from_thread.run(manager.broadcast, f"project:{task.project_id}", {"type": "task.created", "task": TaskOut.model_validate(task).model_dump()})
-        else:
-            payload = {"type": "task.updated", "task": TaskOut.model_validate(task).model_dump()}
-            anyio.from_thread.run(manager.broadcast, f"project:{task.project_id}", payload)
-    except Exception:
-        pass
+        await db.commit()
     return task
 
 
+async def _insert_missing(db: AsyncSession, model, a: str, b: str, pairs: set, **extra) -> set:
+    """Insert link rows for the (a, b) `pairs` not already present; returns the pairs inserted."""
+    if not pairs:
+        return set()
+    col_a, col_b = getattr(model, a), getattr(model, b)
+    # Filter on each column separately to keep the bind count small, then intersect in Python
+    found = (await db.execute(
+        select(col_a, col_b).where(col_a.in_({x for x, _ in pairs}), col_b.in_({y for _, y in pairs}))
+    )).all()
+    missing = pairs - {tuple(r) for r in found}
+    if missing:
+        await db.execute(insert(model), [{a: x, b: y, **extra} for x, y in sorted(missing)])
+    return missing
+
+
+@router.post("/bulk", response_model=TaskBulkOut)
+async def bulk_update_tasks(
+    data: TaskBulkIn,
+    db: AsyncSession = Depends(get_async_db),
+    org=Depends(get_current_org),
+):
+    ids = list(dict.fromkeys(data.task_ids))
+    # Scope check for every task in one query; like PATCH, any miss fails the whole request
+    rows = (await db.execute(select(Task.id, Task.project_id, Task.workspace_id).where(Task.id.in_(ids), Task.org_id == org.id))).all()
+    if len(rows) != len(ids):
+        raise HTTPException(status_code=404, detail="Task not found")
+    old_project = {r.id: r.project_id for r in rows}
+    old_workspace = {r.id: r.workspace_id for r in rows}
+    project = dict(old_project)
+    workspace = {r.id: r.workspace_id for r in rows}
+
+    values: dict = {}
+    target = None
+    if data.project_id is not None:
+        target = await db.get(Project, data.project_id)
+        if not target or target.org_id != org.id:
+            raise HTTPException(status_code=404, detail="Project not found")
+        values.update(project_id=target.id, workspace_id=target.workspace_id)
+        project = dict.fromkeys(ids, target.id)
+        workspace = dict.fromkeys(ids, target.workspace_id)
+    if data.status_id is not None:
+        st = await db.get(ProjectStatus, data.status_id)
+        if not st or any(p != st.project_id for p in project.values()):
+            raise HTTPException(status_code=400, detail="Status not in project")
+        values["status_id"] = st.id
+    if data.priority is not None:
+        values["priority"] = data.priority
+    if data.is_completed is not None:
+        values["is_completed"] = data.is_completed
+        values["completed_at"] = datetime.utcnow() if data.is_completed else None
+    if data.due_date is not None:
+        values["due_date"] = data.due_date
+    if values:
+        await db.execute(update(Task).where(Task.id.in_(ids)).values(**values).execution_options(synchronize_session=False))
+    if target is not None:
+        # Subtasks moved without their parent become top-level in the target project
+        await db.execute(
+            update(Task)
+            .where(Task.id.in_(ids), Task.parent_id.is_not(None), Task.parent_id.not_in(ids))
+            .values(parent_id=None)
+            .execution_options(synchronize_session=False)
+        )
+    if target is not None:
+        # Subtasks left behind by a moving parent become top-level where they are
+        moved = [t for t in ids if project[t] != old_project[t]]
+        if moved:
+            await _detach_children(db, moved, keep=ids)
+    if target is not None and data.status_id is None:
+        # Moved tasks whose status doesn't exist in the target project get its first status
+        target_statuses = select(ProjectStatus.id).where(ProjectStatus.project_id == target.id)
+        first = (await db.execute(target_statuses.order_by(ProjectStatus.position).limit(1))).scalar_one_or_none()
+        if first:
+            await db.execute(
+                update(Task)
+                .where(Task.id.in_(ids), or_(Task.status_id.is_(None), Task.status_id.not_in(target_statuses)))
+                .values(status_id=first)
+                .execution_options(synchronize_session=False)
+            )
+
+    # Assignees
+    if data.remove_assignee_ids:
+        await db.execute(delete(TaskAssignee).where(TaskAssignee.task_id.in_(ids), TaskAssignee.user_id.in_(data.remove_assignee_ids)))
+    add_users = list(dict.fromkeys(data.add_assignee_ids))
+    if add_users:
+        if len((await db.execute(select(User.id).where(User.id.in_(add_users)))).all()) != len(add_users):
+            raise HTTPException(status_code=404, detail="User not found")
+        await _insert_missing(db, TaskAssignee, "task_id", "user_id", {(t, u) for t in ids for u in add_users})
+    # New assignees, and every assignee of a moved task, need access to the task's workspace and project
+    grants = {(t, u) for t in ids for u in add_users}
+    if target is not None:
+        grants |= {tuple(r) for r in (await db.execute(select(TaskAssignee.task_id, TaskAssignee.user_id).where(TaskAssignee.task_id.in_(ids)))).all()}
+    if grants:
+        await _insert_missing(db, WorkspaceMembership, "workspace_id", "user_id", {(workspace[t], u) for t, u in grants}, role="member")
+        await _insert_missing(db, ProjectMembership, "project_id", "user_id", {(project[t], u) for t, u in grants if project[t]}, role="editor")
+
+    # Tags
+    if data.remove_tag_ids:
+        await db.execute(delete(TaskTag).where(TaskTag.task_id.in_(ids), TaskTag.tag_id.in_(data.remove_tag_ids)))
+    new_project_tags: dict = {}
+    add_tags = list(dict.fromkeys(data.add_tag_ids))
+    if add_tags:
+        tags = (await db.execute(select(Tag).where(Tag.id.in_(add_tags), Tag.org_id == org.id))).scalars().all()
+        # Tags are per-workspace, so every task must sit in the tags' workspace
+        if len(tags) != len(add_tags) or len({t.workspace_id for t in tags} | set(workspace.values())) != 1:
+            raise HTTPException(status_code=404, detail="Tag not found in this workspace")
+        tags_by_id = {t.id: t for t in tags}
+        await _insert_missing(db, TaskTag, "task_id", "tag_id", {(t, g) for t in ids for g in add_tags})
+        added = await _insert_missing(db, ProjectTag, "project_id", "tag_id", {(project[t], g) for t in ids for g in add_tags if project[t]})
+        for p, g in sorted(added):
+            new_project_tags.setdefault(p, []).append(TagOut.model_validate(tags_by_id[g]).model_dump())
+
+    if data.due_date is not None or data.is_completed is not None:
+        await _reschedule(db, ids, skip=set(ids))
+
+    for w in {*old_workspace.values(), *workspace.values()}:
+        touch_tasks(db, w)
+    touch_tasks(db, None, *old_project.values(), *project.values())
+    for t in ids:
+        record_task_move(db, t, old_workspace[t], old_project[t], workspace[t], project[t])
+
+    # One event per affected project instead of one per task
+    tasks = (await db.execute(select(Task).where(Task.id.in_(ids)).execution_options(populate_existing=True))).scalars().all()
+    by_project: dict = {}
+    for t in tasks:
+        by_project.setdefault(t.project_id, []).append(TaskOut.model_validate(t).model_dump())
+    for p in sorted({p for p in [*old_project.values(), *project.values()] if p}):
+        emit(db, f"project:{p}", {
+            "type": "tasks.bulk_updated",
+            "tasks": by_project.get(p, []),
+            "removed": [t for t in ids if old_project[t] == p and project[t] != p],
+            "project_tags": new_project_tags.get(p, []),
+        })
+    await db.commit()
+    return {"updated": len(ids)}
+
+
 @router.delete("/{task_id}")
-def delete_task(task_id: str, db: Session = Depends(get_db), org=Depends(get_current_org)):
-    task = db.get(Task, task_id)
+async def delete_task(task_id: str, db: AsyncSession = Depends(get_async_db), org=Depends(get_current_org)):
+    task = await db.get(Task, task_id)
     if not task or task.org_id != org.id:
         raise HTTPException(status_code=404, detail="Task not found")
     project_id = task.project_id
-    db.delete(task)
-    db.commit()
-    try:
-        import anyio
-        anyio.from_thread.run(manager.broadcast, f"project:{project_id}", {"type": "task.deleted", "id": task_id})
-    except Exception:
-        pass
+    await _detach_children(db, [task.id])
+    await db.delete(task)
+    touch_tasks(db, task.workspace_id, project_id)
+    record(db, "task", [task_id], task.workspace_id, project_id, deleted=True)
+    emit(db, f"project:{project_id}", {"type": "task.deleted", "id": task_id})
+    await db.commit()
     return {"ok": True}
 
 
 @router.get("/{task_id}/assignees", response_model=list[UserOut])
-def list_task_assignees(task_id: str, db: Session = Depends(get_db), org=Depends(get_current_org)):
-    task = db.get(Task, task_id)
+async def list_task_assignees(task_id: str, db: AsyncSession = Depends(get_async_db), org=Depends(get_current_org)):
+    task = await db.get(Task, task_id)
     if not task or task.org_id != org.id:
         raise HTTPException(status_code=404, detail="Task not found")
-    assocs = db.execute(select(TaskAssignee).where(TaskAssignee.task_id == task_id)).scalars().all()
-    users: list[UserOut] = []
-    for a in assocs:
-        u = db.get(User, a.user_id)
-        if u:
-            users.append(UserOut.model_validate(u))
-    return users
+    return (await db.execute(select_users_via(TaskAssignee, TaskAssignee.task_id == task_id))).scalars().all()
 
 
 @router.post("/{task_id}/assignees", response_model=list[UserOut])
-def add_task_assignee(
+async def add_task_assignee(
     task_id: str,
     data: TaskAssigneeAddIn,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     org=Depends(get_current_org),
 ):
-    task = db.get(Task, task_id)
+    task = await db.get(Task, task_id)
     if not task or task.org_id != org.id:
         raise HTTPException(status_code=404, detail="Task not found")
-    user = db.get(User, data.user_id)
+    user = await db.get(User, data.user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
     # Ensure workspace membership so tasks show up for them
-    ws_mem = db.execute(select(WorkspaceMembership).where(WorkspaceMembership.workspace_id == task.workspace_id, WorkspaceMembership.user_id == user.id)).scalar_one_or_none()
+    ws_mem = (await db.execute(select(WorkspaceMembership).where(WorkspaceMembership.workspace_id == task.workspace_id, WorkspaceMembership.user_id == user.id))).scalar_one_or_none()
     if not ws_mem:
         db.add(WorkspaceMembership(workspace_id=task.workspace_id, user_id=user.id, role="member"))
 
     # Add assignee link if missing
-    existing = db.execute(select(TaskAssignee).where(TaskAssignee.task_id == task_id, TaskAssignee.user_id == user.id)).scalar_one_or_none()
+    existing = (await db.execute(select(TaskAssignee).where(TaskAssignee.task_id == task_id, TaskAssignee.user_id == user.id))).scalar_one_or_none()
     if not existing:
         db.add(TaskAssignee(task_id=task_id, user_id=user.id))
+        record(db, "task", [task.id], task.workspace_id, task.project_id)
 
     # If task is in a project, ensure project access
     if task.project_id:
-        pm = db.execute(select(ProjectMembership).where(ProjectMembership.project_id == task.project_id, ProjectMembership.user_id == user.id)).scalar_one_or_none()
+        pm = (await db.execute(select(ProjectMembership).where(ProjectMembership.project_id == task.project_id, ProjectMembership.user_id == user.id))).scalar_one_or_none()
         if not pm:
             db.add(ProjectMembership(project_id=task.project_id, user_id=user.id, role="editor"))
 
-    db.commit()
+    # Lists filtered by assignee change with the link
+    touch_tasks(db, task.workspace_id, task.project_id)
+    await db.commit()
     # Return full list of assignees
-    assocs = db.execute(select(TaskAssignee).where(TaskAssignee.task_id == task_id)).scalars().all()
-    users: list[UserOut] = []
-    for a in assocs:
-        u = db.get(User, a.user_id)
-        if u:
-            users.append(UserOut.model_validate(u))
-    return users
+    return (await db.execute(select_users_via(TaskAssignee, TaskAssignee.task_id == task_id))).scalars().all()
 
 
 @router.delete("/{task_id}/assignees/{user_id}")
-def remove_task_assignee(task_id: str, user_id: str, db: Session = Depends(get_db), org=Depends(get_current_org)):
-    task = db.get(Task, task_id)
+async def remove_task_assignee(task_id: str, user_id: str, db: AsyncSession = Depends(get_async_db), org=Depends(get_current_org)):
+    task = await db.get(Task, task_id)
     if not task or task.org_id != org.id:
         raise HTTPException(status_code=404, detail="Task not found")
-    assoc = db.execute(select(TaskAssignee).where(TaskAssignee.task_id == task_id, TaskAssignee.user_id == user_id)).scalar_one_or_none()
+    assoc = (await db.execute(select(TaskAssignee).where(TaskAssignee.task_id == task_id, TaskAssignee.user_id == user_id))).scalar_one_or_none()
     if not assoc:
         raise HTTPException(status_code=404, detail="Assignee not found")
-    db.delete(assoc)
-    db.commit()
+    await db.delete(assoc)
+    touch_tasks(db, task.workspace_id, task.project_id)
+    record(db, "task", [task.id], task.workspace_id, task.project_id)
+    await db.commit()
+    return {"ok": True}
+
+
+# ----- Dependencies -----
+
+async def _reschedule(db: AsyncSession, task_ids, skip=frozenset()) -> Schedule:
+    """Roll dependents of `task_ids` forward and tell their projects (except about `skip`)."""
+    result = await roll_forward(db, task_ids)
+    changed = [t for t in result.updated if t not in skip]
+    if changed:
+        tasks = (await db.execute(select(Task).where(Task.id.in_(changed)).execution_options(populate_existing=True))).scalars().all()
+        by_project: dict = {}
+        for t in tasks:
+            by_project.setdefault(t.project_id, []).append(TaskOut.model_validate(t).model_dump())
+            touch_tasks(db, t.workspace_id, t.project_id)
+            record(db, "task", [t.id], t.workspace_id, t.project_id)
+        for p, items in by_project.items():
+            if p:
+                emit(db, f"project:{p}", {"type": "tasks.bulk_updated", "tasks": items, "removed": [], "project_tags": []})
+    return result
+
+
+@router.get("/{task_id}/dependencies", response_model=list[TaskDependencyOut])
+async def list_task_dependencies(task_id: str, db: AsyncSession = Depends(get_async_db), org=Depends(get_current_org)):
+    """Edges in both directions: what this task waits on and what waits on it."""
+    task = await db.get(Task, task_id)
+    if not task or task.org_id != org.id:
+        raise HTTPException(status_code=404, detail="Task not found")
+    return (await db.execute(
+        select(TaskDependency).where(or_(TaskDependency.task_id == task_id, TaskDependency.depends_on_id == task_id))
+    )).scalars().all()
+
+
+@router.post("/{task_id}/dependencies", response_model=TaskDependencyOut)
+async def add_task_dependency(task_id: str, data: TaskDependencyIn, db: AsyncSession = Depends(get_async_db), org=Depends(get_current_org)):
+    task = await db.get(Task, task_id)
+    if not task or task.org_id != org.id:
+        raise HTTPException(status_code=404, detail="Task not found")
+    other = await db.get(Task, data.depends_on_id)
+    if not other or other.org_id != org.id or other.workspace_id != task.workspace_id:
+        raise HTTPException(status_code=404, detail="Task not found in this workspace")
+    if await creates_cycle(db, task_id, other.id):
+        raise HTTPException(status_code=400, detail="Dependency would create a cycle")
+    dep = await db.get(TaskDependency, (task_id, other.id))
+    if dep:
+        dep.lag_days = data.lag_days
+    else:
+        dep = TaskDependency(task_id=task_id, depends_on_id=other.id, lag_days=data.lag_days)
+        db.add(dep)
+    await db.flush()
+    # The prerequisite is the source, so this task and its dependents move
+    await _reschedule(db, [other.id], skip={other.id})
+    await db.commit()
+    return dep
+
+
+@router.delete("/{task_id}/dependencies/{depends_on_id}")
+async def remove_task_dependency(task_id: str, depends_on_id: str, db: AsyncSession = Depends(get_async_db), org=Depends(get_current_org)):
+    task = await db.get(Task, task_id)
+    if not task or task.org_id != org.id:
+        raise HTTPException(status_code=404, detail="Task not found")
+    dep = await db.get(TaskDependency, (task_id, depends_on_id))
+    if not dep:
+        raise HTTPException(status_code=404, detail="Dependency not found")
+    await db.delete(dep)
+    await db.flush()
+    # Nothing moves back, but at-risk flags may clear
+    await _reschedule(db, [task_id])
+    await db.commit()
     return {"ok": True}
 
 
+# ----- Subtask trees -----
+
+@router.get("/{task_id}/subtree", response_model=list[TaskTreeNodeOut])
+async def get_task_subtree(
+    task_id: str,
+    max_depth: int = Query(10, ge=0, le=MAX_TREE_DEPTH),
+    db: AsyncSession = Depends(get_async_db),
+    org=Depends(get_current_org),
+):
+    rows = (await db.execute(select_subtree([Task.id == task_id, Task.org_id == org.id], max_depth))).all()
+    if not rows:
+        raise HTTPException(status_code=404, detail="Task not found")
+    return [_tree_node(*r) for r in rows]
+
+
+@router.get("/project/{project_id}/tree", response_model=list[TaskTreeNodeOut])
+async def get_project_tree(
+    project_id: str,
+    max_depth: int = Query(10, ge=0, le=MAX_TREE_DEPTH),
+    db: AsyncSession = Depends(get_async_db),
+    org=Depends(get_current_org),
+):
+    prj = await db.get(Project, project_id)
+    if not prj or prj.org_id != org.id:
+        raise HTTPException(status_code=404, detail="Project not found")
+    rows = (await db.execute(select_subtree([Task.project_id == project_id, Task.parent_id.is_(None)], max_depth))).all()
+    return [_tree_node(*r) for r in rows]
+
+
+def _tree_node(task: Task, depth: int, descendants: int, completed: int) -> dict:
+    return {**TaskOut.model_validate(task).model_dump(), "depth": depth, "descendants": descendants, "completed_descendants": completed}
+
+
 # ----- Task Tags -----
 
 @router.get("/{task_id}/tags", response_model=list[TagOut])
-def list_task_tags(task_id: str, db: Session = Depends(get_db), org=Depends(get_current_org)):
-    task = db.get(Task, task_id)
+async def list_task_tags(task_id: str, db: AsyncSession = Depends(get_async_db), org=Depends(get_current_org)):
+    task = await db.get(Task, task_id)
     if not task or task.org_id != org.id:
         raise HTTPException(status_code=404, detail="Task not found")
-    joins = db.execute(select(TaskTag).where(TaskTag.task_id == task_id)).scalars().all()
-    tags: list[Tag] = []
-    for j in joins:
-        t = db.get(Tag, j.tag_id)
-        if t:
-            tags.append(t)
-    return tags
+    return (await db.execute(select_tags_via(TaskTag, TaskTag.task_id == task_id))).scalars().all()
 
 
 @router.post("/{task_id}/tags", response_model=list[TagOut])
-def add_task_tag(task_id: str, body: dict, db: Session = Depends(get_db), org=Depends(get_current_org)):
-    task = db.get(Task, task_id)
+async def add_task_tag(task_id: str, body: dict, db: AsyncSession = Depends(get_async_db), org=Depends(get_current_org)):
+    task = await db.get(Task, task_id)
     if not task or task.org_id != org.id:
         raise HTTPException(status_code=404, detail="Task not found")
     tag_id = body.get("tag_id")
     if not tag_id:
         raise HTTPException(status_code=400, detail="tag_id required")
-    tag = db.get(Tag, tag_id)
+    tag = await db.get(Tag, tag_id)
     if not tag or tag.org_id != org.id or tag.workspace_id != task.workspace_id:
         raise HTTPException(status_code=404, detail="Tag not found in this workspace")
-    existing = db.execute(select(TaskTag).where(TaskTag.task_id == task.id, TaskTag.tag_id == tag.id)).scalar_one_or_none()
+    existing = (await db.execute(select(TaskTag).where(TaskTag.task_id == task.id, TaskTag.tag_id == tag.id))).scalar_one_or_none()
     if not existing:
         db.add(TaskTag(task_id=task.id, tag_id=tag.id))
-        db.commit()
+        record(db, "task", [task.id], task.workspace_id, task.project_id)
+        await db.commit()
         # If the task belongs to a project, ensure tag appears in project tag set
         if task.project_id:
-            pt = db.execute(select(ProjectTag).where(ProjectTag.project_id == task.project_id, ProjectTag.tag_id == tag.id)).scalar_one_or_none()
+            pt = (await db.execute(select(ProjectTag).where(ProjectTag.project_id == task.project_id, ProjectTag.tag_id == tag.id))).scalar_one_or_none()
             if not pt:
                 db.add(ProjectTag(project_id=task.project_id, tag_id=tag.id))
-                db.commit()
                 # Broadcast to the project channel so filters update
-                try:
-                    import anyio
-                    anyio.from_thread.run(manager.broadcast, f"project:{task.project_id}", {"type": "project.tag.added", "tag": TagOut.model_validate(tag).model_dump()})
-                except Exception:
-                    pass
+                emit(db, f"project:{task.project_id}", {"type": "project.tag.added", "tag": TagOut.model_validate(tag).model_dump()})
+                await db.commit()
     # return list
-    joins = db.execute(select(TaskTag).where(TaskTag.task_id == task.id)).scalars().all()
-    out: list[Tag] = []
-    for j in joins:
-        t = db.get(Tag, j.tag_id)
-        if t:
-            out.append(t)
-    return out
+    return (await db.execute(select_tags_via(TaskTag, TaskTag.task_id == task.id))).scalars().all()
 
 
 @router.delete("/{task_id}/tags/{tag_id}")
-def remove_task_tag(task_id: str, tag_id: str, db: Session = Depends(get_db), org=Depends(get_current_org)):
-    task = db.get(Task, task_id)
+async def remove_task_tag(task_id: str, tag_id: str, db: AsyncSession = Depends(get_async_db), org=Depends(get_current_org)):
+    task = await db.get(Task, task_id)
     if not task or task.org_id != org.id:
         raise HTTPException(status_code=404, detail="Task not found")
-    assoc = db.execute(select(TaskTag).where(TaskTag.task_id == task.id, TaskTag.tag_id == tag_id)).scalar_one_or_none()
+    assoc = (await db.execute(select(TaskTag).where(TaskTag.task_id == task.id, TaskTag.tag_id == tag_id))).scalar_one_or_none()
     if not assoc:
         raise HTTPException(status_code=404, detail="Tag not attached")
-    db.delete(assoc)
-    db.commit()
+    await db.delete(assoc)
+    record(db, "task", [task.id], task.workspace_id, task.project_id)
+    await db.commit()
     return {"ok": True}
 
 
 @router.post("/tags/batch", response_model=dict[str, list[TagOut]])
-def list_tags_for_tasks(body: TaskTagsBatchIn, db: Session = Depends(get_db), org=Depends(get_current_org)):
+async def list_tags_for_tasks(body: TaskTagsBatchIn, db: AsyncSession = Depends(get_async_db), org=Depends(get_current_org)):
     if not body.task_ids:
         return {}
     # Fetch tasks to enforce org scope
-    tasks = db.execute(select(Task.id, Task.org_id).where(Task.id.in_(body.task_ids))).all()
+    tasks = (await db.execute(select(Task.id, Task.org_id).where(Task.id.in_(body.task_ids)))).all()
     allowed_ids = {tid for (tid, o) in tasks if o == org.id}
     if not allowed_ids:
         return {}
-    joins = db.execute(select(TaskTag).where(TaskTag.task_id.in_(allowed_ids))).scalars().all()
+    joins = (await db.execute(select(TaskTag).where(TaskTag.task_id.in_(allowed_ids)))).scalars().all()
     tag_ids = {j.tag_id for j in joins}
-    tags = db.execute(select(Tag).where(Tag.id.in_(tag_ids))).scalars().all() if tag_ids else []
+    tags = (await db.execute(select(Tag).where(Tag.id.in_(tag_ids)))).scalars().all() if tag_ids else []
     tags_by_id = {t.id: t for t in tags}
     out: dict[str, list[Tag]] = {tid: [] for tid in allowed_ids}
     for j in joins:
@@ -339,25 +707,22 @@ def list_tags_for_tasks(body: TaskTagsBatchIn, db: Session = Depends(get_db), or
 
 
 @router.get("/search", response_model=list[TaskOut])
-def search_tasks_by_tags(
+async def search_tasks_by_tags(
     workspace_id: str,
+    response: Response,
     tag_ids: str | None = None,  # comma-separated
     mode: str = "and",  # 'and' or 'or'
-    db: Session = Depends(get_db),
+    filters: TaskFilters = Depends(task_filters),
+    page: tuple = Depends(page_params),
+    db: AsyncSession = Depends(get_async_db),
     org=Depends(get_current_org),
 ):
     # Ensure workspace belongs to org
-    ws = db.get(Workspace, workspace_id)
+    ws = await db.get(Workspace, workspace_id)
     if not ws or ws.org_id != org.id:
         raise HTTPException(status_code=404, detail="Workspace not found")
     ids = [x for x in (tag_ids.split(',') if tag_ids else []) if x]
-    base = select(Task).where(Task.workspace_id == workspace_id)
-    if not ids:
-        return db.execute(base.order_by(Task.created_at.desc())).scalars().all()
-    jt = select(Task.id.label('tid')).join_from(Task, TaskTag, Task.id == TaskTag.task_id).where(Task.workspace_id == workspace_id, TaskTag.tag_id.in_(ids)).group_by(Task.id)
-    if mode.lower() == 'and':
-        jt = jt.having(func.count(func.distinct(TaskTag.tag_id)) == len(ids))
-    # Join to tasks from subquery
-    q = select(Task).join(jt.subquery(), jt.subquery().c.tid == Task.id).order_by(Task.created_at.desc())
-    items = db.execute(q).scalars().all()
-    return items
+    stmt = select(Task).where(Task.workspace_id == workspace_id)
+    if ids:
+        stmt = stmt.where(has_all_tags(ids) if mode.lower() == 'and' else has_any_tag(ids))
+    return await _list_page(db, stmt, filters, page, response)
@@ -0,0 +1,127 @@
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import select, update, bindparam, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .models import Task, TaskDependency
+
+
+# Dependency roll-forward. When tasks' dates change, only what lies downstream
+# of them is rescheduled: one recursive query finds that subgraph, a topological
+# pass (Kahn) pushes start/end dates forward where a prerequisite now finishes
+# later and flags at-risk tasks, and the changes go out as one executemany UPDATE.
+# Dates only ever move forward; the changed tasks themselves keep the dates the
+# user gave them.
+
+# id -> (start_date, end_date, due_date, is_completed, is_at_risk)
+Node = Tuple[Optional[date], Optional[date], Optional[date], bool, bool]
+
+
+@dataclass
+class Schedule:
+    updated: List[str] = field(default_factory=list)
+    # Tasks left unscheduled because they sit on a dependency cycle
+    cyclic: List[str] = field(default_factory=list)
+
+
+def select_downstream(task_ids: Iterable[str]):
+    """Recursive CTE: `task_ids` plus every task that transitively depends on them.
+
+    UNION (not UNION ALL) so a cycle in existing data still terminates.
+    """
+    reach = select(Task.id.label("id")).where(Task.id.in_(list(task_ids))).cte("downstream", recursive=True)
+    prev = reach.alias("downstream_prev")
+    return reach.union(select(TaskDependency.task_id).where(TaskDependency.depends_on_id == prev.c.id))
+
+
+def plan(nodes: Dict[str, Node], edges: List[Tuple[str, str, int]], sources: Set[str]) -> Tuple[Dict[str, tuple], List[str]]:
+    """Topologically propagate dates over the subgraph downstream of `sources`.
+
+    `edges` are (task_id, depends_on_id, lag_days) for every task in the subgraph;
+    `nodes` must cover those tasks and their prerequisites. Returns
+    ({id: (start, end, at_risk)} for tasks that changed, [ids on a cycle]).
+    """
+    down = set(sources) | {t for t, _, _ in edges}
+    down &= nodes.keys()
+    preds: Dict[str, list] = {n: [] for n in down}
+    succs: Dict[str, list] = {n: [] for n in down}
+    indegree = dict.fromkeys(down, 0)
+    for t, p, lag in edges:
+        if t not in down or p not in nodes:
+            continue
+        preds[t].append((p, lag))
+        if p in down:
+            succs[p].append(t)
+            indegree[t] += 1
+
+    dates = {n: (v[0], v[1]) for n, v in nodes.items()}
+    changes: Dict[str, tuple] = {}
+    queue = deque(n for n, d in indegree.items() if d == 0)
+    while queue:
+        n = queue.popleft()
+        start, end, due, done, was_at_risk = nodes[n]
+        earliest = None
+        for p, lag in preds[n]:
+            finish = dates[p][1] or nodes[p][2]
+            if finish is not None:
+                ready = finish + timedelta(days=1 + lag)
+                if earliest is None or ready > earliest:
+                    earliest = ready
+        if earliest is not None and start is not None and start < earliest and n not in sources and not done:
+            shift = earliest - start
+            start += shift
+            end = end + shift if end is not None else None
+            dates[n] = (start, end)
+        begin, finish = start or end, end or start
+        at_risk = not done and bool(
+            (earliest is not None and begin is not None and begin < earliest)
+            or (due is not None and finish is not None and finish > due)
+        )
+        if (start, end, at_risk) != (nodes[n][0], nodes[n][1], was_at_risk):
+            changes[n] = (start, end, at_risk)
+        for s in succs[n]:
+            indegree[s] -= 1
+            if indegree[s] == 0:
+                queue.append(s)
+    return changes, [n for n, d in indegree.items() if d > 0]
+
+
+async def roll_forward(db: AsyncSession, task_ids: Iterable[str]) -> Schedule:
+    """Reschedule everything downstream of `task_ids` (call after their dates are flushed)."""
+    sources = set(task_ids)
+    if not sources:
+        return Schedule()
+    down = select_downstream(sources)
+    edges = (await db.execute(
+        select(TaskDependency.task_id, TaskDependency.depends_on_id, TaskDependency.lag_days)
+        .where(TaskDependency.task_id.in_(select(down.c.id)))
+    )).all()
+    # The subgraph plus the prerequisites feeding into it
+    rows = (await db.execute(
+        select(Task.id, Task.start_date, Task.end_date, Task.due_date, Task.is_completed, Task.is_at_risk).where(or_(
+            Task.id.in_(select(down.c.id)),
+            Task.id.in_(select(TaskDependency.depends_on_id).where(TaskDependency.task_id.in_(select(down.c.id)))),
+        ))
+    )).all()
+    nodes = {r[0]: tuple(r[1:]) for r in rows}
+    changes, cyclic = plan(nodes, [tuple(e) for e in edges], sources)
+    if changes:
+        tasks = Task.__table__
+        await db.execute(
+            update(tasks)
+            .where(tasks.c.id == bindparam("b_id"))
+            .values(start_date=bindparam("b_start"), end_date=bindparam("b_end"), is_at_risk=bindparam("b_risk")),
+            [{"b_id": k, "b_start": s, "b_end": e, "b_risk": r} for k, (s, e, r) in changes.items()],
+        )
+    return Schedule(updated=list(changes), cyclic=cyclic)
+
+
+async def creates_cycle(db: AsyncSession, task_id: str, depends_on_id: str) -> bool:
+    """Would making `task_id` depend on `depends_on_id` close a loop?"""
+    if task_id == depends_on_id:
+        return True
+    down = select_downstream([task_id])
+    return (await db.execute(select(down.c.id).where(down.c.id == depends_on_id).limit(1))).first() is not None
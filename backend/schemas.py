@@ -77,6 +77,7 @@ class TaskCreateIn(BaseModel):
     due_date: Optional[date] = None
     project_id: Optional[str] = None
     workspace_id: Optional[str] = None
+    parent_id: Optional[str] = None
 
 
 class TaskUpdateIn(BaseModel):
@@ -85,8 +86,37 @@ class TaskUpdateIn(BaseModel):
     priority: Optional[int] = None
     is_completed: Optional[bool] = None
     due_date: Optional[date] = None
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
     project_id: Optional[str] = None
     description: Optional[dict] = None
+    # "" detaches the task from its parent
+    parent_id: Optional[str] = None
+
+
+class TaskBulkIn(BaseModel):
+    task_ids: List[str] = Field(min_length=1, max_length=5000)
+    project_id: Optional[str] = None
+    status_id: Optional[str] = None
+    priority: Optional[int] = None
+    is_completed: Optional[bool] = None
+    due_date: Optional[date] = None
+    add_assignee_ids: List[str] = []
+    remove_assignee_ids: List[str] = []
+    add_tag_ids: List[str] = []
+    remove_tag_ids: List[str] = []
+
+
+class TaskBulkOut(BaseModel):
+    updated: int
+
+
+class TaskImportOut(BaseModel):
+    imported: int
+    skipped: int
+    tags_created: int
+    errors: List[dict]
+    seconds: float
 
 
 class TaskOut(BaseModel):
@@ -94,14 +124,36 @@ class TaskOut(BaseModel):
     id: str
     name: str
     project_id: Optional[str]
+    parent_id: Optional[str] = None
     status_id: Optional[str]
     priority: int
     is_completed: bool
     due_date: Optional[date]
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+    is_at_risk: bool = False
     created_at: datetime
     description: Optional[dict]
 
 
+class TaskDependencyIn(BaseModel):
+    depends_on_id: str
+    lag_days: int = Field(default=0, ge=0)
+
+
+class TaskDependencyOut(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    task_id: str
+    depends_on_id: str
+    lag_days: int
+
+
+class TaskTreeNodeOut(TaskOut):
+    depth: int
+    descendants: int
+    completed_descendants: int
+
+
 class CommentCreateIn(BaseModel):
     body: dict
 
@@ -111,10 +163,16 @@ class CommentOut(BaseModel):
     id: str
     task_id: str
     author_id: str
-    body: dict
+    # Lightweight listings leave out `body` and may carry a truncated `preview` instead
+    body: Optional[dict] = None
+    preview: Optional[str] = None
     created_at: datetime
 
 
+class CommentCountsIn(BaseModel):
+    task_ids: List[str] = Field(max_length=5000)
+
+
 class SessionOut(BaseModel):
     user: UserOut
     org: OrganizationOut
@@ -142,6 +200,25 @@ class WorkspaceMemberAddIn(BaseModel):
     display_name: Optional[str] = None
 
 
+class WorkspaceMembersBulkIn(BaseModel):
+    members: List[WorkspaceMemberAddIn] = Field(min_length=1, max_length=5000)
+    role: Literal["admin", "member"] = "member"
+
+
+# One per input row, in order. status: added, already_member, invited (user created
+# and added), not_found (unknown user_id), duplicate (repeats an earlier row), invalid
+class MemberBulkResultOut(BaseModel):
+    user_id: Optional[str] = None
+    email: Optional[str] = None
+    status: str
+
+
+class MembersBulkOut(BaseModel):
+    results: List[MemberBulkResultOut]
+    # status -> count
+    summary: dict[str, int]
+
+
 # Project members
 class ProjectMemberOut(BaseModel):
     model_config = ConfigDict(from_attributes=True)
@@ -153,6 +230,16 @@ class ProjectMemberAddIn(BaseModel):
     user_id: str
 
 
+class ProjectMembersBulkIn(BaseModel):
+    user_ids: List[str] = Field(min_length=1, max_length=5000)
+    role: Literal["editor", "viewer"] = "editor"
+
+
+class ProjectMemberRefOut(BaseModel):
+    user_id: str
+    role: str
+
+
 # Task assignees
 class TaskAssigneeAddIn(BaseModel):
     user_id: str
@@ -185,3 +272,39 @@ class TagUpdateIn(BaseModel):
 
 class TaskTagsBatchIn(BaseModel):
     task_ids: List[str]
+
+
+class SyncOut(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    # Position to pass back as ?since= (or WS resume_from) next time
+    seq: int
+    # The client's position is unknown here; refetch everything
+    reset: bool = False
+    has_more: bool = False
+    tasks: List[TaskOut] = []
+    projects: List[ProjectOut] = []
+    tags: List[TagOut] = []
+    comments: List[CommentOut] = []
+    # task id -> tag ids / user ids for every task in `tasks`
+    task_tags: dict[str, List[str]] = {}
+    task_assignees: dict[str, List[str]] = {}
+    # Ids removed since, keyed like the lists above
+    deleted: dict[str, List[str]] = {}
+
+
+# Board initial load: ids in the maps and lists refer to `tags` and `users`.
+# Project-level parts come with the first page only; later pages (?cursor=)
+# carry just their tasks and what those tasks reference. The endpoint drops
+# unset fields (not None ones), so nulls inside tasks and users survive.
+class ProjectSnapshotOut(BaseModel):
+    project: Optional[ProjectOut] = None
+    statuses: Optional[List[ProjectStatusOut]] = None
+    members: Optional[List[ProjectMemberRefOut]] = None
+    project_tag_ids: Optional[List[str]] = None
+    # Sync position (GET /sync, WS resume_from) as of this snapshot
+    seq: Optional[int] = None
+    tasks: List[TaskOut]
+    task_tags: dict[str, List[str]]
+    task_assignees: dict[str, List[str]]
+    tags: List[TagOut]
+    users: List[UserOut]
@@ -0,0 +1,86 @@
+import hashlib
+from typing import Iterable, Optional
+
+from fastapi import Request, Response
+from sqlalchemy import bindparam, event, select
+from sqlalchemy.orm import Session
+
+from .models import ChangeCounter
+
+
+# Version stamps for conditional GETs. Writers call touch(db, key) for each
+# cached list their change affects; every touched key is bumped once when the
+# transaction commits (nothing on rollback). Readers turn the current versions
+# into an ETag and answer If-None-Match with a 304 after one primary-key
+# lookup, skipping the list query and serialization.
+#
+# Keys name the list, not the entity, so unrelated reads stay cached:
+#   tasks:project:<id>  tasks:workspace:<id>  tags:workspace:<id>
+#   statuses:project:<id>  workspaces:org:<id>
+
+_TOUCHED = "touched_versions"
+
+
+def touch(db, *keys: str) -> None:
+    """Mark `keys` to be bumped when `db` commits (Session or AsyncSession)."""
+    db.info.setdefault(_TOUCHED, set()).update(keys)
+
+
+def touch_tasks(db, workspace_id: Optional[str], *project_ids: Optional[str]) -> None:
+    """Task lists affected by a task change: the workspace's and each project's."""
+    keys = [f"tasks:project:{p}" for p in project_ids if p]
+    if workspace_id:
+        keys.append(f"tasks:workspace:{workspace_id}")
+    touch(db, *keys)
+
+
+def bump_statement(dialect_name: str):
+    """Upsert adding 1 to the counter bound as `k` (created at 1)."""
+    if dialect_name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    table = ChangeCounter.__table__
+    stmt = insert(table).values(key=bindparam("k"), version=1)
+    return stmt.on_conflict_do_update(index_elements=[table.c.key], set_={"version": table.c.version + 1})
+
+
+@event.listens_for(Session, "before_commit")
+def _bump(session: Session) -> None:
+    keys = session.info.pop(_TOUCHED, None)
+    if keys:
+        conn = session.connection()
+        # Sorted so concurrent writers lock counter rows in the same order
+        conn.execute(bump_statement(conn.dialect.name), [{"k": k} for k in sorted(keys)])
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard(session: Session) -> None:
+    session.info.pop(_TOUCHED, None)
+
+
+def _etag(request: Request, keys: Iterable[str], versions: dict) -> str:
+    # The query string is part of the tag: filters and cursors select different pages
+    raw = "|".join(f"{k}={versions.get(k, 0)}" for k in keys) + "?" + request.url.query
+    return 'W/"' + hashlib.sha1(raw.encode()).hexdigest()[:20] + '"'
+
+
+def _conditional(request: Request, response: Response, etag: str) -> Optional[Response]:
+    response.headers["ETag"] = etag
+    # Let browsers keep the body but revalidate every time
+    response.headers["Cache-Control"] = "private, no-cache"
+    match = request.headers.get("if-none-match")
+    if match and etag in [t.strip() for t in match.split(",")]:
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "private, no-cache"})
+    return None
+
+
+async def check_etag(db, request: Request, response: Response, *keys: str) -> Optional[Response]:
+    """Set the ETag for `keys`; returns a 304 response to send instead if the client is current."""
+    versions = dict((await db.execute(select(ChangeCounter.key, ChangeCounter.version).where(ChangeCounter.key.in_(keys)))).all())
+    return _conditional(request, response, _etag(request, keys, versions))
+
+
+def check_etag_sync(db: Session, request: Request, response: Response, *keys: str) -> Optional[Response]:
+    versions = dict(db.execute(select(ChangeCounter.key, ChangeCounter.version).where(ChangeCounter.key.in_(keys))).all())
+    return _conditional(request, response, _etag(request, keys, versions))
@@ -43,10 +43,18 @@ function ProjectTasksInner() {
   const [selectedTags, setSelectedTags] = useState<string[]>([]);
   const [viewMode, setViewMode] = useTaskViewMode();
 
-  useEffect(() => { if (!id) return; (async()=>{ const ts:any = await api.listTasks(id); setTasks(ts); setStatuses(await api.getStatuses(id) as any); try{ const entries = await Promise.all((ts as any[]).map(async (t:any)=> [t.id, await api.listTaskAssignees(t.id)])); setAssigneesByTask(Object.fromEntries(entries)); } catch {} try{ const ids = (ts as any[]).map((t:any)=>t.id); const batch:any = ids.length ? await api.listTagsForTasks(ids) : {}; setTagsByTask(batch); } catch {} })(); }, [id]);
-  useEffect(() => { if (!id || !workspaceId) return; (async()=>{ try { const prjs = await api.listProjects(workspaceId); setProject(prjs.find((p:any)=>p.id===id) || null); } catch {} })(); }, [id, workspaceId]);
-  useEffect(() => { if (!id) return; api.listProjectTags(id).then((ts:any)=>setProjectTags(ts)).catch(()=>{}); }, [id]);
-  useEffect(() => { if (!id) return; api.listProjectMembers(id).then((ms:any)=>setMembers(ms.map((m:any)=>m.user))).catch(()=>{}); }, [id]);
+  useEffect(() => { if (!id) return; (async()=>{
+    const snap:any = await api.getProjectSnapshot(id);
+    const tagsById = Object.fromEntries(snap.tags.map((t:any)=>[t.id, t]));
+    const usersById = Object.fromEntries(snap.users.map((u:any)=>[u.id, u]));
+    setProject(snap.project);
+    setTasks(snap.tasks);
+    setStatuses(snap.statuses);
+    setMembers(snap.members.map((m:any)=>usersById[m.user_id]));
+    setProjectTags(snap.project_tag_ids.map((tid:string)=>tagsById[tid]));
+    setTagsByTask(Object.fromEntries(Object.entries(snap.task_tags).map(([tid, ids]:any)=>[tid, ids.map((g:string)=>tagsById[g])])));
+    setAssigneesByTask(Object.fromEntries(Object.entries(snap.task_assignees).map(([tid, ids]:any)=>[tid, ids.map((u:string)=>usersById[u])])));
+  })().catch(()=>{}); }, [id]);
 
   // WebSocket subscribe for live updates
   useEffect(() => {
@@ -62,6 +70,16 @@ function ProjectTasksInner() {
       if (msg.type === 'task.created') { setTasks(prev => [msg.task, ...prev]); setAssigneesByTask(prev=>({ ...prev, [msg.task.id]: [] })); setTagsByTask(prev=>({ ...prev, [msg.task.id]: [] })); }
       if (msg.type === 'task.updated') setTasks(prev => prev.map(t => t.id === msg.task.id ? msg.task : t));
       if (msg.type === 'task.deleted') { setTasks(prev => prev.filter(t => t.id !== msg.id)); setAssigneesByTask(prev=>{ const { [msg.id]:_, ...rest } = prev; return rest; }); setTagsByTask(prev=>{ const { [msg.id]:_, ...rest } = prev; return rest; }); }
+      if (msg.type === 'tasks.bulk_updated') {
+        const byId = Object.fromEntries(msg.tasks.map((t:any)=>[t.id, t]));
+        setTasks(prev => {
+          const kept = prev.filter(t => !msg.removed.includes(t.id)).map(t => byId[t.id] || t);
+          const known = new Set(kept.map(t => t.id));
+          return [...msg.tasks.filter((t:any)=>!known.has(t.id)), ...kept];
+        });
+        if (msg.project_tags.length) setProjectTags(prev => [...prev, ...msg.project_tags.filter((t:any)=>!prev.some((p:any)=>p.id===t.id))]);
+      }
+      if (msg.type === 'tasks.imported') api.listTasks(id).then((ts:any)=>setTasks(ts)).catch(()=>{});
       if (msg.type === 'project.tag.added') setProjectTags(prev => {
         if (prev.some((t:any)=>t.id===msg.tag.id)) return prev;
         return [...prev, msg.tag];
@@ -13,6 +13,51 @@ async function request<T>(path: string, opts: { method?: HTTPMethod, body?: any
   return res.json();
 }
 
+// Follows keyset pagination (X-Next-Cursor) until the list is exhausted.
+async function requestAll<T>(path: string): Promise<T[]> {
+  const out: T[] = [];
+  let cursor: string | null = null;
+  do {
+    const sep = path.includes('?') ? '&' : '?';
+    const url = cursor ? `${path}${sep}cursor=${encodeURIComponent(cursor)}` : path;
+    const res = await fetch(`${API_BASE}${url}`, { credentials: 'include' });
+    if (!res.ok) throw new Error(await res.text());
+    out.push(...(await res.json()));
+    cursor = res.headers.get('X-Next-Cursor');
+  } while (cursor);
+  return out;
+}
+
+// Project board snapshot: merges the pages of tasks (and what they reference) into one payload.
+async function requestSnapshot(path: string): Promise<any> {
+  let out: any = null;
+  let cursor: string | null = null;
+  do {
+    const url = cursor ? `${path}?cursor=${encodeURIComponent(cursor)}` : path;
+    const res = await fetch(`${API_BASE}${url}`, { credentials: 'include' });
+    if (!res.ok) throw new Error(await res.text());
+    const page = await res.json();
+    if (!out) out = page;
+    else {
+      out.tasks.push(...page.tasks);
+      Object.assign(out.task_tags, page.task_tags);
+      Object.assign(out.task_assignees, page.task_assignees);
+      out.tags.push(...page.tags.filter((t: any) => !out.tags.some((x: any) => x.id === t.id)));
+      out.users.push(...page.users.filter((u: any) => !out.users.some((x: any) => x.id === u.id)));
+    }
+    cursor = res.headers.get('X-Next-Cursor');
+  } while (cursor);
+  return out;
+}
+
+async function upload<T>(path: string, file: File): Promise<T> {
+  const form = new FormData();
+  form.append('file', file);
+  const res = await fetch(`${API_BASE}${path}`, { method: 'POST', credentials: 'include', body: form });
+  if (!res.ok) throw new Error(await res.text());
+  return res.json();
+}
+
 export const api = {
   me: () => request('/auth/me'),
   updateMe: (body: { first_name?: string, last_name?: string, theme?: 'nord'|'dust'|'forest'|'sunset' }) => request('/auth/me', { method: 'PATCH', body }),
@@ -24,11 +69,16 @@ export const api = {
   createProject: (workspaceId: string, name: string, visibility: string='private') => request(`/projects/workspace/${workspaceId}`, { method: 'POST', body: { name, visibility } }),
   deleteProject: (projectId: string) => request(`/projects/${projectId}`, { method: 'DELETE' }),
   getStatuses: (projectId: string) => request(`/projects/${projectId}/statuses`),
-  listTasks: (projectId: string) => request(`/tasks/project/${projectId}`),
+  getProjectSnapshot: (projectId: string) => requestSnapshot(`/projects/${projectId}/snapshot`),
+  listTasks: (projectId: string) => requestAll(`/tasks/project/${projectId}`),
   createTask: (projectId: string, name: string, status_id?: string) => request(`/tasks/project/${projectId}`, { method: 'POST', body: { name, status_id } }),
-  listWorkspaceTasks: (workspaceId: string) => request(`/tasks/workspace/${workspaceId}`),
+  listWorkspaceTasks: (workspaceId: string) => requestAll(`/tasks/workspace/${workspaceId}`),
   createWorkspaceTask: (workspaceId: string, name: string, project_id?: string | null, status_id?: string | null) => request(`/tasks/workspace/${workspaceId}`, { method: 'POST', body: { name, project_id, status_id } }),
   updateTask: (taskId: string, body: any) => request(`/tasks/${taskId}`, { method: 'PATCH', body }),
+  importTasks: (projectId: string, file: File) => upload(`/tasks/project/${projectId}/import`, file),
+  // Streaming download; use as a link href rather than fetching into memory
+  exportTasksUrl: (scope: 'project'|'workspace', id: string, format: 'csv'|'jsonl'='csv') => `${API_BASE}/tasks/${scope}/${id}/export?format=${format}`,
+  bulkUpdateTasks: (body: any) => request(`/tasks/bulk`, { method: 'POST', body }),
   deleteTask: (taskId: string) => request(`/tasks/${taskId}`, { method: 'DELETE' }),
   // Workspace members
   listWorkspaceMembers: (workspaceId: string) => request(`/orgs/workspaces/${workspaceId}/members`),
@@ -51,7 +101,7 @@ export const api = {
   addTaskTag: (taskId: string, tag_id: string) => request(`/tasks/${taskId}/tags`, { method: 'POST', body: { tag_id } }),
   removeTaskTag: (taskId: string, tagId: string) => request(`/tasks/${taskId}/tags/${tagId}`, { method: 'DELETE' }),
   listTagsForTasks: (taskIds: string[]) => request(`/tasks/tags/batch`, { method: 'POST', body: { task_ids: taskIds } }),
-  searchTasksByTags: (workspaceId: string, tagIds: string[], mode: 'and'|'or'='and') => request(`/tasks/search?workspace_id=${encodeURIComponent(workspaceId)}&tag_ids=${encodeURIComponent(tagIds.join(','))}&mode=${mode}`),
+  searchTasksByTags: (workspaceId: string, tagIds: string[], mode: 'and'|'or'='and') => requestAll(`/tasks/search?workspace_id=${encodeURIComponent(workspaceId)}&tag_ids=${encodeURIComponent(tagIds.join(','))}&mode=${mode}`),
   listProjectTags: (projectId: string) => request(`/projects/${projectId}/tags`),
   addProjectTag: (projectId: string, tag_id: string) => request(`/projects/${projectId}/tags`, { method: 'POST', body: { tag_id } }),
   removeProjectTag: (projectId: string, tagId: string) => request(`/projects/${projectId}/tags/${tagId}`, { method: 'DELETE' }),
@@ -0,0 +1,77 @@
+import asyncio
+import os
+import sys
+import tempfile
+from contextlib import contextmanager
+
+import pytest
+
+# Ensure repo root is importable
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT not in sys.path:
+    sys.path.append(ROOT)
+
+# Settings are read at import time: point them at a scratch database first.
+# TEST_DATABASE_URL selects an (empty) Postgres database instead of a temp SQLite file.
+os.environ["DATABASE_URL"] = os.environ.get("TEST_DATABASE_URL") or f"sqlite:///{tempfile.mkdtemp()}/test.db"
+os.environ.setdefault("PASSWORD_HASH_ROUNDS", "4")
+os.environ.setdefault("PASSWORD_HASH_WORKERS", "0")
+
+from sqlalchemy import event  # noqa: E402
+
+from backend.bench.seed import Shape, ensure_schema, load_fixture, seed  # noqa: E402
+from backend.db import SessionLocal, async_engine, engine  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def loop():
+    # One loop for the whole run: the async engine's pooled connections belong to it
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.run_until_complete(async_engine.dispose())
+    loop.close()
+
+
+@pytest.fixture(scope="session")
+def seeded():
+    """The bench seeder's data (100k tasks) in the test database; returns its Fixture."""
+    ensure_schema(engine)
+    with SessionLocal() as db:
+        fixture = load_fixture(db)
+    if fixture is None:
+        seed(engine, Shape(tasks=100_000, comments_per_task=0.5))
+        if engine.dialect.name == "postgresql":
+            with engine.connect() as conn:
+                conn.exec_driver_sql("ANALYZE")
+        with SessionLocal() as db:
+            fixture = load_fixture(db)
+    return fixture
+
+
+class StatementCounter:
+    def __init__(self) -> None:
+        self.statements = []
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+
+@pytest.fixture
+def count_queries():
+    """Context manager counting SQL statements sent on either engine inside it."""
+    @contextmanager
+    def counting():
+        counter = StatementCounter()
+        engines = (engine, async_engine.sync_engine)
+        for eng in engines:
+            event.listen(eng, "before_cursor_execute", counter)
+        try:
+            yield counter
+        finally:
+            for eng in engines:
+                event.remove(eng, "before_cursor_execute", counter)
+    return counting
@@ -0,0 +1,9 @@
+from backend.bench.encode import run_encode
+
+
+def test_encode_once_per_event(loop):
+    # Serialization must not scale with the audience: one encode per broadcast
+    sweep = loop.run_until_complete(run_encode(events=20, subscribers=(1, 100, 1000)))
+    for n, result in sweep.items():
+        assert result["encode_calls"] == 20, n
+        assert result["messages"] == 20 * int(n), n
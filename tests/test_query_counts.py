@@ -0,0 +1,76 @@
+import httpx
+import pytest
+from sqlalchemy import select
+
+from backend.app import app
+from backend.bench.seed import BENCH_PASSWORD
+from backend.db import engine
+from backend.models import OrgMembership, User
+
+
+# List endpoints over join tables must cost the same number of statements
+# however many rows they return: each is built twice, with 2 and with 30
+# linked rows, and the statements sent while serving it are counted.
+
+SIZES = (2, 30)
+
+
+async def _board(c: httpx.AsyncClient, user_ids: list, n: int) -> dict:
+    """A fresh workspace, project and task with `n` members, tags and assignees."""
+    ws = (await c.post("/api/orgs/current/workspaces", json={"name": f"Counts {n}"})).json()
+    prj = (await c.post(f"/api/projects/workspace/{ws['id']}", json={"name": f"Counts {n}"})).json()
+    task = (await c.post(f"/api/tasks/project/{prj['id']}", json={"name": "counted"})).json()
+    users = user_ids[:n]
+    r = await c.post(f"/api/orgs/workspaces/{ws['id']}/members/bulk", json={"members": [{"user_id": u} for u in users]})
+    assert r.status_code == 200, r.text
+    r = await c.post(f"/api/projects/{prj['id']}/members/bulk", json={"user_ids": users})
+    assert r.status_code == 200, r.text
+    for i, u in enumerate(users):
+        tag = (await c.post(f"/api/tags/workspace/{ws['id']}", json={"name": f"count-{i}"})).json()
+        assert (await c.post(f"/api/tasks/{task['id']}/tags", json={"tag_id": tag["id"]})).status_code == 200
+        assert (await c.post(f"/api/tasks/{task['id']}/assignees", json={"user_id": u})).status_code == 200
+    return {
+        "list_task_assignees": f"/api/tasks/{task['id']}/assignees",
+        "list_task_tags": f"/api/tasks/{task['id']}/tags",
+        "list_project_members": f"/api/projects/{prj['id']}/members",
+        "list_project_tags": f"/api/projects/{prj['id']}/tags",
+        "list_workspace_members": f"/api/orgs/workspaces/{ws['id']}/members",
+    }
+
+
+@pytest.fixture(scope="module")
+def boards(seeded, loop):
+    with engine.connect() as conn:
+        user_ids = conn.execute(
+            select(User.id).join(OrgMembership, OrgMembership.user_id == User.id)
+            .where(OrgMembership.org_id == seeded.org_id).order_by(User.email)
+        ).scalars().all()
+
+    async def build():
+        c = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+        r = await c.post("/api/auth/login", json={"email": seeded.emails[0], "password": BENCH_PASSWORD})
+        assert r.status_code == 200, r.text
+        return c, {n: await _board(c, user_ids, n) for n in SIZES}
+
+    client, boards = loop.run_until_complete(build())
+    yield client, boards
+    loop.run_until_complete(client.aclose())
+
+
+@pytest.mark.parametrize("endpoint", [
+    "list_task_assignees", "list_task_tags", "list_project_members", "list_project_tags", "list_workspace_members",
+])
+def test_constant_statements(boards, loop, count_queries, endpoint):
+    client, by_size = boards
+    counts, lengths = {}, {}
+    for n, paths in by_size.items():
+        # Warm the principal cache so only the endpoint's own statements are counted
+        loop.run_until_complete(client.get(paths[endpoint]))
+        with count_queries() as counter:
+            r = loop.run_until_complete(client.get(paths[endpoint]))
+        assert r.status_code == 200, r.text
+        counts[n], lengths[n] = counter.count, len(r.json())
+    # The owner is a member too
+    assert lengths[SIZES[0]] < lengths[SIZES[1]]
+    # The scope check plus one joined select, whatever the cardinality
+    assert counts == {n: 2 for n in SIZES}, f"{endpoint}: {counts}"